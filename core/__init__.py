@@ -1,109 +1,167 @@
-"""Core system monitoring logic - macOS specific."""
+"""Core system monitoring logic (macOS, with a Linux backend)."""
 
 import time
 import psutil
 import logging
-import subprocess
 import gc
 
-from core.config import CPU_LIMIT, MEM_LIMIT, SWAP_LIMIT, COOLDOWN
+from core.config import (
+    CPU_LIMIT, MEM_LIMIT, SWAP_LIMIT, COOLDOWN, DISK_IO_LIMIT, NET_IO_LIMIT, THRASH_LIMIT,
+    LATENCY_PROBE_HZ, LAG_LIMIT_MS, COLLECTOR_TTL,
+)
+from core.snapshot import MemoryBreakdown, Stats, ProcessRow
+from core.classify import get_classifier
+from core.backends import get_backend
+from core.backends.darwin import get_page_size
+from core.throughput import IOCollector, format_rate
+from core.paging import PagingMonitor
+from core.collectors import CollectorRunner, COST_CHEAP, COST_TOOL
+from core.footprint import FootprintCache
+from core.latency import LatencyProbe
 
 _last_gc_time = 0
+_io_collector = None
+_paging_monitor = None
+_runner = None
+_latency_probe = None
 
 logger = logging.getLogger('macmonitor.core')
 
-# Cache constant values to avoid repeated subprocess calls
-_PAGE_SIZE = None
 
-def get_page_size():
-    global _PAGE_SIZE
-    if _PAGE_SIZE is None:
-        try:
-            _PAGE_SIZE = int(subprocess.check_output(['pagesize']).strip())
-        except Exception:
-            _PAGE_SIZE = 4096  # Fallback
-    return _PAGE_SIZE
+def get_memory_breakdown():
+    """Get the platform memory breakdown (``MemoryBreakdown`` in GB, or None).
+
+    Raises if the backend's read fails (the collector runner backs off on it);
+    ``get_macos_memory_info()`` is the non-raising form.
+    """
+    return get_backend().memory_breakdown()
+
 
 def get_macos_memory_info():
-    """Get detailed macOS memory breakdown."""
+    """Kept for existing callers: the memory breakdown, or ``None`` if it can't be read."""
     try:
-        page_size = get_page_size()
-        
-        # Get vm_stat - fast call
-        vm_stat = subprocess.check_output(['vm_stat']).decode('utf-8')
-        stats = {}
-        for line in vm_stat.split('\n'):
-            if ':' in line:
-                try:
-                    key, val = line.split(':')
-                    if 'Mach Virtual Memory Statistics' in key:
-                        continue
-                    stats[key.strip()] = int(val.strip().strip('.')) * page_size
-                except (ValueError, IndexError):
-                    continue
-        
-        # Get memory_pressure for compressed info
-        try:
-            mp_output = subprocess.check_output(['memory_pressure'], stderr=subprocess.STDOUT).decode('utf-8')
-            compressed_bytes = 0
-            for line in mp_output.split('\n'):
-                if 'Pages used by compressor:' in line:
-                    compressed_bytes = int(line.split(':')[1].strip()) * page_size
-                    break
-        except Exception:
-            compressed_bytes = 0
-
-        wired = stats.get('Pages wired down', 0)
-        active = stats.get('Pages active', 0)
-        inactive = stats.get('Pages inactive', 0)
-        speculative = stats.get('Pages speculative', 0)
-        
-        return {
-            'wired': wired / (1024**3),
-            'active': active / (1024**3),
-            'compressed': compressed_bytes / (1024**3),
-            'cached': (inactive + speculative) / (1024**3)
-        }
+        return get_memory_breakdown()
     except Exception as e:
-        logger.error(f"Error getting macOS memory breakdown: {e}")
+        logger.error(f"Error getting memory breakdown: {e}")
         return None
 
+
 def get_memory_pressure():
-    """Get macOS memory pressure level - very fast sysctl call."""
+    """Get the memory pressure level as ``(status, value)`` (``("UNKNOWN", 0)`` on failure)."""
     try:
-        pressure_val = int(subprocess.check_output(['sysctl', '-n', 'vm.memory_pressure']).strip())
-        status = "OK"
-        if pressure_val == 1:
-            status = "WARN"
-        elif pressure_val >= 2:
-            status = "HIGH"
-        return status, pressure_val
+        backend = get_backend()
+        return backend.memory_pressure(backend.pressure_stall())
     except Exception as e:
         logger.error(f"Error getting memory pressure: {e}")
         return "UNKNOWN", 0
 
-def get_stats():
-    """Get current CPU, memory, and swap usage."""
+
+def get_io_rates():
+    """Get disk/network throughput since the previous call (``IORates`` or None)."""
+    global _io_collector
+    if _io_collector is None:
+        _io_collector = IOCollector()
+    return _io_collector.sample()
+
+
+def get_paging_rates():
+    """Paging/swap rates and thrash score since the last call (``None`` at first)."""
+    global _paging_monitor
+    if _paging_monitor is None:
+        _paging_monitor = PagingMonitor()
+    return _paging_monitor.update(get_backend().paging_counters())
+
+
+def start_latency_probe(hz=LATENCY_PROBE_HZ):
+    """Start the scheduler-latency probe thread (``None`` if ``hz`` is 0).
+
+    The probe is never started implicitly; callers that start it also
+    call ``stop_latency_probe()``.
+    """
+    global _latency_probe
+    if not hz:
+        return None
+    if _latency_probe is None:
+        _latency_probe = LatencyProbe(hz).start()
+    return _latency_probe
+
+
+def stop_latency_probe():
+    global _latency_probe
+    if _latency_probe is not None:
+        _latency_probe.stop()
+        _latency_probe = None
+
+
+def get_sched_latency():
+    """Measured scheduler latency (``SchedLatency``).
+
+    ``None`` while the probe is not running or has no samples yet.
+    """
+    probe = _latency_probe
+    return probe.summary() if probe is not None else None
+
+
+def _pressure():
+    backend = get_backend()
+    psi = backend.pressure_stall()
+    return (psi,) + tuple(backend.memory_pressure(psi))
+
+
+def get_collector_runner():
+    """The shared runner for the platform collectors behind ``get_stats()``."""
+    global _runner
+    if _runner is None:
+        _runner = (CollectorRunner()
+                   .add('memory', get_memory_breakdown, ttl=COLLECTOR_TTL, cost=COST_TOOL)
+                   .add('pressure', _pressure, default=(None, "UNKNOWN", 0),
+                        ttl=COLLECTOR_TTL, cost=COST_TOOL)
+                   .add('paging', get_paging_rates, ttl=COLLECTOR_TTL, cost=COST_TOOL)
+                   .add('io', get_io_rates, ttl=COLLECTOR_TTL, cost=COST_CHEAP)
+                   .add('lag', get_sched_latency, cost=COST_CHEAP))
+    return _runner
+
+
+def get_stats(force=False):
+    """Get current CPU, memory, and swap usage.
+
+    The result has the same shape on every platform; ``psi`` is only set
+    where the kernel reports pressure stall information (Linux). The
+    platform collectors run concurrently; any that timed out or failed
+    this tick keep their previous value and are listed in ``stale``.
+    Collector values younger than ``COLLECTOR_TTL`` are reused unless
+    ``force`` is set.
+    """
+    values, stale = get_collector_runner().run(force)
     vm = psutil.virtual_memory()
     swap = psutil.swap_memory()
-    
-    stats = {
-        'cpu': psutil.cpu_percent(interval=None), 
-        'mem': vm.percent,
-        'swap': swap.percent,
-        'mem_total_gb': vm.total / (1024**3),
-    }
-    
-    stats['macos_mem'] = get_macos_memory_info()
-    stats['pressure_status'], stats['pressure_val'] = get_memory_pressure()
-    
-    # Simple lag risk check
-    if stats['macos_mem']:
-        m = stats['macos_mem']
-        stats['lag_risk'] = m['compressed'] > m['active'] or stats['pressure_val'] > 0
-    else:
-        stats['lag_risk'] = False
-            
+
+    macos_mem = values['memory']
+    psi, pressure_status, pressure_val = values['pressure']
+
+    # Lag risk: the kernel reports pressure, pages are thrashing in and out,
+    # or wakeups are measurably late.
+    paging = values['paging']
+    lag = values['lag']
+    lag_risk = (pressure_val > 0 or (paging is not None and paging.thrash >= THRASH_LIMIT)
+                or (lag is not None and lag.p95 >= LAG_LIMIT_MS))
+
+    stats = Stats(
+        cpu=psutil.cpu_percent(interval=None),
+        mem=vm.percent,
+        swap=swap.percent,
+        mem_total_gb=vm.total / (1024**3),
+        macos_mem=macos_mem,
+        pressure_status=pressure_status,
+        pressure_val=pressure_val,
+        lag_risk=lag_risk,
+        psi=psi,
+        io=values['io'],
+        paging=paging,
+        stale=stale,
+        lag=lag,
+    )
+
     # Trigger lightweight GC every ~60 seconds
     global _last_gc_time
     now = time.time()
@@ -113,43 +171,84 @@ def get_stats():
 
     return stats
 
+# Consumers that want every process from each scan (not just the top rows)
+# register here; see add_scan_observer().
+_scan_observers = []
+_SCAN_ATTRS = ['pid', 'name', 'cpu_percent', 'memory_percent']
+_scan_attrs = list(_SCAN_ATTRS)
+
+
+def add_scan_observer(observer, attrs=()):
+    """Call ``observer(infos)`` after every process scan.
+
+    ``infos`` is the list of psutil ``proc.info`` dicts for every process in
+    the scan; ``attrs`` names extra psutil fields the observer needs in them.
+    """
+    _scan_observers.append(observer)
+    for attr in attrs:
+        if attr not in _scan_attrs:
+            _scan_attrs.append(attr)
+
+
+def remove_scan_observer(observer):
+    """Stop calling ``observer`` (extra attrs stay requested)."""
+    if observer in _scan_observers:
+        _scan_observers.remove(observer)
+
+
+# Set by set_accurate_memory(); refines the memory ranking of every scan.
+_footprints = None
+
+
+def set_accurate_memory(enabled, **kwargs):
+    """Rank memory by USS/PSS for the top candidates (``FootprintCache`` kwargs)."""
+    global _footprints
+    _footprints = FootprintCache(**kwargs) if enabled else None
+
+
+def _by_cpu(row):
+    return row.cpu
+
+
+def _by_mem(row):
+    return row.mem
+
+
 def get_combined_process_info(limit=5):
     """
     Combined pass to get top CPU, Top Memory, and GPU-heavy processes.
+
+    Returns three lists of ``ProcessRow``. Idle processes are skipped without
+    allocating a row, and display names are only formatted for rows that are
+    actually shown.
     """
     cpu_procs = []
     mem_procs = []
-    gpu_heavy_names = {'Electron', 'WebKit', 'Google Chrome', 'Slack', 'Discord', 'WindowServer', 'Helper'}
     gpu_found = []
+    classify = get_classifier().classify
+    infos = [] if _scan_observers else None
 
     try:
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+        for proc in psutil.process_iter(_scan_attrs):
             try:
                 info = proc.info
+                if infos is not None:
+                    infos.append(info)
+                cpu = info['cpu_percent'] or 0.0
+                mem = info['memory_percent'] or 0.0
                 name = info['name']
-                pid = info['pid']
-                cpu = info.get('cpu_percent')
-                mem = info.get('memory_percent')
-
-                if cpu is None: cpu = 0.0
-                if mem is None: mem = 0.0
-
-                labels = []
-                if name and any(s in name.lower() for s in ['mds', 'mdworker']):
-                    labels.append("Spotlight")
-                
-                is_gpu_heavy = name and any(h in name for h in gpu_heavy_names)
-                if is_gpu_heavy:
-                    labels.append("GPU")
-
-                label_str = f" [{', '.join(labels)}]" if labels else ""
-                proc_data = {
-                    'name': f"{name}{label_str}" if name else f"PID {pid}",
-                    'raw_name': name or f"PID {pid}",
-                    'pid': pid,
-                    'cpu': cpu,
-                    'mem': mem
-                }
+
+                # Classification is memoized per name, so this is a dict hit
+                # for every process seen in an earlier scan.
+                labels = classify(name)
+                is_gpu_heavy = 'GPU' in labels
+
+                # Most processes are idle and not GPU-heavy; skip them before
+                # building anything.
+                if cpu <= 0.1 and mem <= 0.1 and not (is_gpu_heavy and len(gpu_found) < 3):
+                    continue
+
+                proc_data = ProcessRow(info['pid'], name, cpu, mem, labels)
 
                 if cpu > 0.1:
                     cpu_procs.append(proc_data)
@@ -161,8 +260,16 @@ def get_combined_process_info(limit=5):
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
 
-        cpu_procs.sort(key=lambda x: x['cpu'], reverse=True)
-        mem_procs.sort(key=lambda x: x['mem'], reverse=True)
+        for observer in _scan_observers:
+            try:
+                observer(infos)
+            except Exception as e:
+                logger.error(f"Scan observer {observer!r} failed: {e}")
+
+        cpu_procs.sort(key=_by_cpu, reverse=True)
+        mem_procs.sort(key=_by_mem, reverse=True)
+        if _footprints is not None:
+            mem_procs = _footprints.rank(mem_procs)
         
         return cpu_procs[:limit], mem_procs[:limit], gpu_found[:3]
 
@@ -190,7 +297,8 @@ def can_notify(key):
         return True
     return False
 
-def check_thresholds(stats, cpu_limit=CPU_LIMIT, mem_limit=MEM_LIMIT, swap_limit=SWAP_LIMIT):
+def check_thresholds(stats, cpu_limit=CPU_LIMIT, mem_limit=MEM_LIMIT, swap_limit=SWAP_LIMIT,
+                     disk_io_limit=DISK_IO_LIMIT, net_io_limit=NET_IO_LIMIT):
     """Check if any thresholds are exceeded. Returns list of alerts."""
     alerts = []
     
@@ -207,7 +315,24 @@ def check_thresholds(stats, cpu_limit=CPU_LIMIT, mem_limit=MEM_LIMIT, swap_limit
         alerts.append(("Memory Pressure", f"Status: {stats['pressure_status']}"))
             
     if stats.get('lag_risk') and can_notify('lag_risk'):
-        alerts.append(("Lag Risk Detected", "Compressed Memory > Active Memory"))
+        paging = stats.get('paging')
+        lag = stats.get('lag')
+        if paging is not None and paging.thrash >= THRASH_LIMIT:
+            detail = f"Memory thrashing (score {paging.thrash:.0f}, swap-ins {format_rate(paging.swapins)})"
+        elif lag is not None and lag.p95 >= LAG_LIMIT_MS:
+            detail = f"Wakeups running late (p95 {lag.p95:.0f} ms, worst {lag.max:.0f} ms)"
+        else:
+            detail = f"Memory pressure {stats.get('pressure_status')}"
+        alerts.append(("Lag Risk Detected", detail))
+
+    io = stats.get('io')
+    if io:
+        disk_bps = io.disk_read_bps + io.disk_write_bps
+        if disk_bps >= disk_io_limit * 1024 ** 2 and can_notify('disk_io'):
+            alerts.append(("High Disk I/O", f"Disk at {format_rate(disk_bps)}"))
+        net_bps = io.net_recv_bps + io.net_sent_bps
+        if net_bps >= net_io_limit * 1024 ** 2 and can_notify('net_io'):
+            alerts.append(("High Network I/O", f"Network at {format_rate(net_bps)}"))
 
     return alerts
 
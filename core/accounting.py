@@ -0,0 +1,128 @@
+"""Cumulative per-process CPU-time accounting.
+
+``cpu_percent`` in the top-CPU list is a point-in-time reading, so a process
+that bursts between ticks never shows up. This module instead charges each
+scan's ``cpu_times()`` delta to the process name. Processes are keyed by
+``(pid, create_time)``, so a reused pid is never billed for its predecessor.
+A process that exits leaves its CPU time in the per-name totals.
+
+Totals are kept in one-minute buckets. Running sums for the 5-minute and
+1-hour windows are updated as buckets enter and leave each window, so a
+"top consumers" query never walks history.
+"""
+
+import heapq
+import time
+from collections import deque
+
+WINDOWS = {'5m': 5, '1h': 60}
+BUCKET_S = 60
+
+
+def _cpu_total(cpu_times):
+    return cpu_times.user + cpu_times.system
+
+
+def _add(totals, name, seconds):
+    totals[name] = totals.get(name, 0.0) + seconds
+
+
+def _subtract(totals, bucket):
+    for name, seconds in bucket.items():
+        left = totals.get(name, 0.0) - seconds
+        if left > 1e-9:
+            totals[name] = left
+        else:
+            totals.pop(name, None)
+
+
+class CpuAccountant:
+    """Per-name CPU seconds over the last 5 minutes, hour and day.
+
+    Feed it with ``observe(infos)`` (psutil ``proc.info`` dicts that include
+    ``create_time`` and ``cpu_times``), e.g. via ``core.add_scan_observer``.
+
+    Args:
+        clock: Wall-clock source; "today" follows the local calendar day.
+    """
+
+    ATTRS = ('create_time', 'cpu_times')
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._started = clock()
+        self._seen = {}                    # (pid, create_time) -> cpu seconds at last scan
+        self._minute = None
+        self._bucket = None
+        self._windows = {key: (deque(), {}) for key in WINDOWS}   # key -> (buckets, totals)
+        self._day = None
+        self._today = {}
+
+    def observe(self, infos, now=None):
+        """Charge the CPU time used since the previous scan to each process name."""
+        now = self._clock() if now is None else now
+        self._roll(now)
+        sums = [self._bucket, self._today]
+        sums.extend(totals for _, totals in self._windows.values())
+        seen = self._seen
+        current = {}
+
+        for info in infos:
+            cpu_times = info.get('cpu_times')
+            if cpu_times is None:
+                continue
+            key = (info['pid'], info.get('create_time'))
+            total = _cpu_total(cpu_times)
+            current[key] = total
+            previous = seen.get(key)
+            if previous is None:
+                # Only processes born while we were watching are charged for
+                # their whole lifetime; older ones start from this baseline.
+                created = key[1]
+                if created is None or created < self._started:
+                    continue
+                previous = 0.0
+            delta = total - previous
+            if delta > 0:
+                name = info['name'] or f"PID {key[0]}"
+                for totals in sums:
+                    _add(totals, name, delta)
+
+        # Exited processes drop out here; what they used stays in the buckets.
+        self._seen = current
+
+    def _roll(self, now):
+        """Start a new minute bucket and expire those that left each window."""
+        minute = int(now // BUCKET_S)
+        if minute != self._minute:
+            self._minute = minute
+            self._bucket = {}
+            for key, (buckets, totals) in self._windows.items():
+                buckets.append((minute, self._bucket))
+                while buckets[0][0] <= minute - WINDOWS[key]:
+                    _subtract(totals, buckets.popleft()[1])
+
+        day = time.localtime(now)[:3]
+        if day != self._day:
+            self._day = day
+            self._today = {}
+
+    def totals(self, window='5m', now=None):
+        """``{name: cpu_seconds}`` for ``window`` ('5m', '1h' or 'today')."""
+        self._roll(self._clock() if now is None else now)
+        if window == 'today':
+            return dict(self._today)
+        try:
+            return dict(self._windows[window][1])
+        except KeyError:
+            raise ValueError(f"Unknown accounting window: {window}") from None
+
+    def top(self, window='5m', n=5, now=None):
+        """The ``n`` heaviest ``(name, cpu_seconds)`` pairs for ``window``."""
+        totals = self.totals(window, now)
+        return heapq.nlargest(n, totals.items(), key=lambda item: item[1])
+
+    @property
+    def tracked(self):
+        """Number of live processes being tracked."""
+        return len(self._seen)
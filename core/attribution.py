@@ -0,0 +1,189 @@
+"""Memory-pressure attribution: who grew before pressure went up.
+
+The biggest process is often not the one that caused pressure. A 3 GB
+browser that has been 3 GB all day did not; a build that grew by 4 GB in
+the last five minutes did. ``PressureAttribution`` keeps, for every
+process in the scan, a small ring of RSS readings spanning ``window``
+seconds. Readings are downsampled to one per ``window / slots`` seconds,
+so the ring covers the window whatever the scan cadence (every tick while
+the menu is open, once a minute when idle). State per process is fixed,
+and processes leave the table when they leave the scan.
+
+System memory (used plus compressed) is tracked the same way. When
+``pressure_status`` rises (OK to WARN/HIGH, or WARN to HIGH), each
+process's growth over the window is summed by name and compared with the
+system-level growth. The names that grew the most become the episode's
+"likely culprits". They are attached to the pressure and lag alerts
+until pressure returns to OK.
+
+Per-process compressed or swapped memory is not exposed by psutil on
+macOS, so pages a process lost to the compressor do not count as growth.
+The system-level compressed delta is still in the denominator.
+"""
+
+import time
+from collections import deque
+
+from core.config import ATTRIBUTION_WINDOW, ATTRIBUTION_MIN_GROWTH_MB
+from core.snapshot import _SlotRecord
+
+_GB = 1024 ** 3
+_LEVELS = {'OK': 0, 'UNKNOWN': 0, 'WARN': 1, 'HIGH': 2}
+# Alerts that get the culprit list appended during a pressure episode.
+ANNOTATED_ALERTS = ("Memory Pressure", "Lag Risk Detected", "High Memory", "High Swap")
+
+
+def format_size(n):
+    """``"512 MB"`` / ``"1.2 GB"``."""
+    if abs(n) >= _GB:
+        return f"{n / _GB:.1f} GB"
+    return f"{n / 1024 ** 2:.0f} MB"
+
+
+class Culprit(_SlotRecord):
+    """One name's RSS growth over the window (bytes), and its share of the system growth."""
+
+    __slots__ = ('name', 'growth', 'share', 'processes')
+    _fields = __slots__
+
+    def __init__(self, name, growth, share=None, processes=1):
+        self.name = name
+        self.growth = growth
+        self.share = share
+        self.processes = processes
+
+    def __str__(self):
+        text = f"{self.name} +{format_size(self.growth)}"
+        if self.processes > 1:
+            text = f"{self.name} (×{self.processes}) +{format_size(self.growth)}"
+        if self.share is not None:
+            text += f" ({self.share:.0%})"
+        return text
+
+
+class _Ring:
+    """Readings ``(time, value)`` at most one per ``step`` seconds, plus the latest."""
+
+    __slots__ = ('readings', 'latest')
+
+    def __init__(self, slots):
+        self.readings = deque(maxlen=slots)
+        self.latest = None
+
+    def add(self, now, value, step):
+        readings = self.readings
+        if not readings or now - readings[-1][0] >= step:
+            readings.append((now, value))
+        self.latest = value
+
+    def growth(self, since):
+        """Latest value minus the oldest reading at or after ``since`` (or the oldest kept)."""
+        for t, value in self.readings:
+            if t >= since:
+                return self.latest - value
+        return 0 if self.readings else None
+
+
+class PressureAttribution:
+    """Ranks processes by memory growth leading up to a pressure rise.
+
+    Feed it with ``observe(infos)`` (scan observer; needs ``create_time``
+    and ``memory_info``) and ``observe_stats(stats)`` every tick.
+
+    Args:
+        window:     Seconds of history behind each growth figure.
+        slots:      Readings kept per process.
+        top:        Culprits reported.
+        min_growth: Bytes a name must have grown by to be listed.
+    """
+
+    ATTRS = ('create_time', 'memory_info')
+
+    def __init__(self, window=ATTRIBUTION_WINDOW, slots=10, top=3,
+                 min_growth=ATTRIBUTION_MIN_GROWTH_MB * 1024 ** 2, clock=time.monotonic):
+        self.window = window
+        self.slots = slots
+        self.top = top
+        self.min_growth = min_growth
+        self._clock = clock
+        self._step = window / slots
+        self._procs = {}           # (pid, create_time) -> [name, _Ring]
+        self._system = _Ring(slots)
+        self._level = 0
+        self.culprits = []         # this pressure episode's culprits
+
+    def observe(self, infos, now=None):
+        """Record each process's RSS from one scan; processes that left are dropped."""
+        now = self._clock() if now is None else now
+        step = self._step
+        old = self._procs
+        procs = {}
+        for info in infos:
+            mem = info.get('memory_info')
+            if mem is None:
+                continue
+            key = (info['pid'], info.get('create_time'))
+            entry = old.get(key)
+            if entry is None:
+                # Born inside the window: all of its memory is growth.
+                entry = [info['name'] or f"PID {info['pid']}", _Ring(self.slots)]
+                if old:
+                    entry[1].add(now - step, 0, step)
+            entry[1].add(now, mem.rss, step)
+            procs[key] = entry
+        self._procs = procs
+
+    def observe_stats(self, stats, now=None):
+        """Track system memory; on a pressure rise, compute this episode's culprits.
+
+        Returns the new culprit list on a rise, else ``None``.
+        """
+        now = self._clock() if now is None else now
+        used = stats.mem_total_gb * stats.mem / 100.0 * _GB
+        if stats.macos_mem is not None:
+            used += stats.macos_mem.compressed * _GB
+        self._system.add(now, used, self._step)
+
+        level = _LEVELS.get(stats.pressure_status, 0)
+        rose = level > self._level
+        self._level = level
+        if level == 0:
+            self.culprits = []
+        elif rose:
+            self.culprits = self.rank(now)
+            return self.culprits
+        return None
+
+    def under_pressure(self):
+        """Whether the last ``observe_stats()`` saw pressure above OK."""
+        return self._level > 0
+
+    def rank(self, now=None):
+        """Names ranked by RSS growth over the window, with their share of the system growth."""
+        now = self._clock() if now is None else now
+        since = now - self.window
+        by_name = {}
+        for name, ring in self._procs.values():
+            growth = ring.growth(since)
+            if growth:
+                total, count = by_name.get(name, (0, 0))
+                by_name[name] = (total + growth, count + 1)
+        system = self._system.growth(since)
+        culprits = []
+        for name, (growth, count) in sorted(by_name.items(), key=lambda kv: kv[1][0], reverse=True):
+            if growth < self.min_growth or len(culprits) >= self.top:
+                break
+            share = min(1.0, growth / system) if system and system > 0 else None
+            culprits.append(Culprit(name, growth, share, count))
+        return culprits
+
+    def annotate(self, alerts):
+        """Append the episode's culprits to pressure-related alert messages."""
+        if not self.culprits:
+            return alerts
+        note = "Likely culprits: " + ", ".join(str(c) for c in self.culprits)
+        return [(title, f"{message}. {note}" if title in ANNOTATED_ALERTS else message)
+                for title, message in alerts]
+
+    def __len__(self):
+        return len(self._procs)
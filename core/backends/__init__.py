@@ -0,0 +1,39 @@
+"""Platform backends for the memory breakdown and pressure signal."""
+
+import sys
+
+from core.backends.base import Backend
+
+_backend = None
+
+
+def create_backend(platform=None):
+    """Create the backend for ``platform`` (defaults to ``sys.platform``)."""
+    platform = platform or sys.platform
+    if platform == 'darwin':
+        from core.backends.darwin import DarwinBackend
+        return DarwinBackend()
+    if platform.startswith('linux'):
+        from core.backends.linux import LinuxBackend
+        return LinuxBackend()
+    return Backend()
+
+
+def get_backend():
+    """Return the shared backend for this platform."""
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Replace the shared backend (closing the previous one)."""
+    global _backend
+    if _backend is not None:
+        _backend.close()
+    _backend = backend
+    return backend
+
+
+__all__ = ['Backend', 'create_backend', 'get_backend', 'set_backend']
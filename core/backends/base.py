@@ -0,0 +1,38 @@
+"""Platform backend interface."""
+
+
+class Backend:
+    """Source of the platform-specific parts of a ``get_stats()`` sample.
+
+    CPU, RAM and swap percentages come from psutil on every platform; a
+    backend only supplies the memory breakdown and the pressure signal.
+
+    ``None`` (or ``UNKNOWN``) means the platform does not provide a value. A
+    read that fails raises, so the collector runner keeps the last good
+    value and backs off (see ``core.collectors``).
+    """
+
+    name = "generic"
+
+    def memory_breakdown(self):
+        """Return a ``MemoryBreakdown`` (GB) or ``None`` if unavailable."""
+        return None
+
+    def memory_pressure(self, psi=None):
+        """Return ``(status, value)`` with status OK/WARN/HIGH/UNKNOWN and value 0-2.
+
+        ``psi`` is an already-read ``pressure_stall()`` result that backends
+        deriving pressure from PSI can reuse instead of reading it again.
+        """
+        return "UNKNOWN", 0
+
+    def pressure_stall(self):
+        """Return a ``PressureStall`` record, or ``None`` if the platform has no PSI."""
+        return None
+
+    def paging_counters(self):
+        """Return cumulative ``core.paging.VmCounters`` (bytes), or ``None``."""
+        return None
+
+    def close(self):
+        """Release any resources (open file handles) held by the backend."""
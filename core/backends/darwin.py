@@ -0,0 +1,98 @@
+"""macOS backend: vm_stat, memory_pressure and sysctl."""
+
+import logging
+import subprocess
+import threading
+import time
+
+from core.backends.base import Backend
+from core.paging import parse_vm_stat, vm_stat_counters
+from core.snapshot import MemoryBreakdown
+
+logger = logging.getLogger('macmonitor.core')
+
+# Cache constant values to avoid repeated subprocess calls
+_PAGE_SIZE = None
+
+
+def get_page_size():
+    global _PAGE_SIZE
+    if _PAGE_SIZE is None:
+        try:
+            _PAGE_SIZE = int(subprocess.check_output(['pagesize']).strip())
+        except Exception:
+            _PAGE_SIZE = 4096  # Fallback
+    return _PAGE_SIZE
+
+
+class DarwinBackend(Backend):
+    name = "darwin"
+
+    # memory_breakdown() and paging_counters() run in the same tick (possibly
+    # on different collector threads); one vm_stat call serves both.
+    _VM_STAT_TTL = 1.0
+    # Upper bound for any one tool, so a wedged tool cannot hold a worker forever.
+    _TOOL_TIMEOUT = 10
+
+    def __init__(self):
+        self._vm_stat = None
+        self._vm_stat_time = 0.0
+        self._vm_stat_lock = threading.Lock()
+
+    def _read_vm_stat(self):
+        """Parsed vm_stat pages, reused for ``_VM_STAT_TTL`` seconds."""
+        with self._vm_stat_lock:
+            now = time.monotonic()
+            if self._vm_stat is None or now - self._vm_stat_time > self._VM_STAT_TTL:
+                output = subprocess.check_output(['vm_stat'], timeout=self._TOOL_TIMEOUT)
+                self._vm_stat = parse_vm_stat(output.decode('utf-8'))
+                self._vm_stat_time = now
+            return self._vm_stat
+
+    def memory_breakdown(self):
+        """Get detailed macOS memory breakdown (raises if vm_stat fails)."""
+        page_size = get_page_size()
+
+        # Get vm_stat - fast call
+        stats = {key: pages * page_size for key, pages in self._read_vm_stat().items()}
+
+        # Get memory_pressure for compressed info; the rest of the breakdown
+        # is still worth reporting without it.
+        try:
+            mp_output = subprocess.check_output(['memory_pressure'], stderr=subprocess.STDOUT,
+                                                timeout=self._TOOL_TIMEOUT).decode('utf-8')
+            compressed_bytes = 0
+            for line in mp_output.split('\n'):
+                if 'Pages used by compressor:' in line:
+                    compressed_bytes = int(line.split(':')[1].strip()) * page_size
+                    break
+        except Exception as e:
+            logger.warning(f"Error reading compressor pages from memory_pressure: {e}")
+            compressed_bytes = 0
+
+        wired = stats.get('Pages wired down', 0)
+        active = stats.get('Pages active', 0)
+        inactive = stats.get('Pages inactive', 0)
+        speculative = stats.get('Pages speculative', 0)
+
+        return MemoryBreakdown(
+            wired=wired / (1024**3),
+            active=active / (1024**3),
+            compressed=compressed_bytes / (1024**3),
+            cached=(inactive + speculative) / (1024**3),
+        )
+
+    def paging_counters(self):
+        """Cumulative Pageins/Pageouts/Swapins/Swapouts/(De)compressions in bytes."""
+        return vm_stat_counters(self._read_vm_stat(), get_page_size())
+
+    def memory_pressure(self, psi=None):
+        """Get macOS memory pressure level - very fast sysctl call."""
+        pressure_val = int(subprocess.check_output(['sysctl', '-n', 'vm.memory_pressure'],
+                                                    timeout=self._TOOL_TIMEOUT).strip())
+        status = "OK"
+        if pressure_val == 1:
+            status = "WARN"
+        elif pressure_val >= 2:
+            status = "HIGH"
+        return status, pressure_val
@@ -0,0 +1,188 @@
+"""Linux backend: /proc/meminfo, /proc/vmstat and PSI (/proc/pressure/*).
+
+Every source file is opened once and re-read with ``seek(0)`` on each tick,
+so sampling costs a few ``read()`` syscalls and no subprocesses.
+"""
+
+import logging
+import os
+
+from core.backends.base import Backend
+from core.paging import VmCounters
+from core.snapshot import MemoryBreakdown, PressureStall
+
+logger = logging.getLogger('macmonitor.core')
+
+_KB_PER_GB = 1024 ** 2
+
+# PSI memory thresholds (10 s average, percent of time stalled).
+PSI_WARN_SOME = 10.0
+PSI_HIGH_SOME = 40.0
+PSI_HIGH_FULL = 10.0
+
+
+class ProcFile:
+    """A /proc (or /sys) file kept open and re-read from the start."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def read(self):
+        """Return the file contents as text, or ``None`` if the file does not exist.
+
+        Any other ``OSError`` is raised (after closing the handle, so the
+        next read reopens the file).
+        """
+        try:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDONLY)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+            chunks = []
+            while True:
+                chunk = os.read(self._fd, 8192)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return b''.join(chunks).decode('ascii', 'replace')
+        except FileNotFoundError:
+            self.close()
+            return None
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+def parse_meminfo(text):
+    """Parse /proc/meminfo into ``{key: kB}``."""
+    values = {}
+    for line in text.splitlines():
+        key, sep, rest = line.partition(':')
+        if not sep:
+            continue
+        try:
+            values[key] = int(rest.split()[0])
+        except (ValueError, IndexError):
+            continue
+    return values
+
+
+def parse_vmstat(text):
+    """Parse /proc/vmstat into ``{key: count}``."""
+    values = {}
+    for line in text.splitlines():
+        key, _, count = line.partition(' ')
+        try:
+            values[key] = int(count)
+        except ValueError:
+            continue
+    return values
+
+
+def parse_psi(text):
+    """Parse a PSI file into ``{'some': avg10, 'full': avg10}``."""
+    values = {}
+    for line in text.splitlines():
+        kind, _, rest = line.partition(' ')
+        for field in rest.split():
+            if field.startswith('avg10='):
+                try:
+                    values[kind] = float(field[6:])
+                except ValueError:
+                    pass
+                break
+    return values
+
+
+class LinuxBackend(Backend):
+    name = "linux"
+
+    def __init__(self, proc_root='/proc', page_size=None):
+        self._page_size = page_size or os.sysconf('SC_PAGE_SIZE')
+        self._meminfo = ProcFile(os.path.join(proc_root, 'meminfo'))
+        self._vmstat = ProcFile(os.path.join(proc_root, 'vmstat'))
+        self._psi = {
+            kind: ProcFile(os.path.join(proc_root, 'pressure', kind))
+            for kind in ('cpu', 'memory', 'io')
+        }
+
+    def memory_breakdown(self):
+        text = self._meminfo.read()
+        if text is None:
+            return None
+        m = parse_meminfo(text)
+        # "Wired" on Linux: memory the kernel cannot reclaim or swap out.
+        wired = (m.get('Unevictable', 0) + m.get('SUnreclaim', 0)
+                 + m.get('KernelStack', 0) + m.get('PageTables', 0))
+        cached = m.get('Cached', 0) + m.get('Buffers', 0) + m.get('SReclaimable', 0)
+        return MemoryBreakdown(
+            wired=wired / _KB_PER_GB,
+            active=m.get('Active', 0) / _KB_PER_GB,
+            compressed=m.get('Zswap', 0) / _KB_PER_GB,
+            cached=cached / _KB_PER_GB,
+            swap_cached=m.get('SwapCached', 0) / _KB_PER_GB,
+        )
+
+    def pressure_stall(self):
+        values = {}
+        for kind, handle in self._psi.items():
+            text = handle.read()
+            if text is None:
+                return None
+            values[kind] = parse_psi(text)
+        return PressureStall(
+            cpu_some=values['cpu'].get('some', 0.0),
+            memory_some=values['memory'].get('some', 0.0),
+            memory_full=values['memory'].get('full', 0.0),
+            io_some=values['io'].get('some', 0.0),
+            io_full=values['io'].get('full', 0.0),
+        )
+
+    def paging_counters(self):
+        """Paging counters in vm_stat terms, from /proc/vmstat.
+
+        Linux has no direct "Pageins"/"Pageouts": refaults of recently
+        evicted file pages and reclaimed pages are the closest equivalent.
+        Compressions map to zswap stores and loads.
+        """
+        text = self._vmstat.read()
+        if text is None:
+            return None
+        v = parse_vmstat(text)
+        refaults = v.get('workingset_refault_file', v.get('workingset_refault', 0))
+        reclaimed = v.get('pgsteal_kswapd', 0) + v.get('pgsteal_direct', 0)
+        page = self._page_size
+        return VmCounters(
+            pageins=refaults * page,
+            pageouts=reclaimed * page,
+            swapins=v.get('pswpin', 0) * page,
+            swapouts=v.get('pswpout', 0) * page,
+            compressions=v.get('zswpout', 0) * page,
+            decompressions=v.get('zswpin', 0) * page,
+        )
+
+    def memory_pressure(self, psi=None):
+        """Map PSI memory stall time onto the macOS-style OK/WARN/HIGH scale."""
+        psi = psi or self.pressure_stall()
+        if psi is None:
+            return "UNKNOWN", 0
+        if psi.memory_full >= PSI_HIGH_FULL or psi.memory_some >= PSI_HIGH_SOME:
+            return "HIGH", 2
+        if psi.memory_some >= PSI_WARN_SOME:
+            return "WARN", 1
+        return "OK", 0
+
+    def close(self):
+        self._meminfo.close()
+        self._vmstat.close()
+        for handle in self._psi.values():
+            handle.close()
@@ -0,0 +1,183 @@
+"""Seasonal baselines: what is normal for this metric at this hour and weekday.
+
+A fixed threshold fires every morning during the usual build storm and stays
+silent when something pegs the CPU at 3 a.m. Instead, each metric keeps 168
+buckets (7 weekdays x 24 hours) of an exponentially weighted mean and
+variance. Every ``get_stats()`` sample is scored against its bucket, and
+then folded into it. State is three floats per bucket, so it never grows,
+however long the monitor runs.
+
+A sample is anomalous when it is ``BASELINE_SIGMA`` deviations *and*
+``BASELINE_MIN_DELTA`` points above the bucket mean, and the bucket has
+seen enough samples to be trusted. An alert needs ``BASELINE_SUSTAIN``
+anomalous samples in a row.
+
+The model is saved as a small binary file (a JSON header line followed by
+the raw float arrays) in the app's config directory. Loading it is a
+single read.
+"""
+
+import os
+import json
+import time
+import logging
+from array import array
+
+from core import can_notify
+from core.config import (
+    config_dir, BASELINE_METRICS, BASELINE_SIGMA, BASELINE_MIN_DELTA, BASELINE_SUSTAIN,
+)
+
+logger = logging.getLogger('macmonitor.baseline')
+
+BUCKETS = 7 * 24
+_FIELDS = 3                 # weight, mean, variance
+_FORMAT_VERSION = 1
+# Samples a bucket needs before it is trusted (10 minutes at a 5 s tick).
+MIN_SAMPLES = 120
+# Weight cap: older samples fade out, so the baseline follows habits that change.
+MAX_WEIGHT = 2000.0
+# Floor for the deviation, so a perfectly flat bucket does not flag noise.
+MIN_STD = 2.0
+
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_LABELS = {'cpu': "CPU", 'mem': "Memory", 'swap': "Swap"}
+
+
+def default_baseline_path():
+    return config_dir() / "baseline.dat"
+
+
+def bucket_of(ts):
+    """Bucket index (weekday * 24 + hour, local time) for epoch seconds ``ts``."""
+    t = time.localtime(ts)
+    return t.tm_wday * 24 + t.tm_hour
+
+
+def _bucket_label(bucket):
+    return f"{_WEEKDAYS[bucket // 24]} {bucket % 24:02d}:00"
+
+
+class SeasonalBaseline:
+    """Per-metric hour-of-week baselines with anomaly alerts.
+
+    Args:
+        metrics: ``Stats`` attributes to model.
+        path:    Where ``save()`` writes the model (``None`` = not persisted).
+    """
+
+    def __init__(self, metrics=BASELINE_METRICS, path=None, sigma=BASELINE_SIGMA,
+                 min_delta=BASELINE_MIN_DELTA, sustain=BASELINE_SUSTAIN):
+        self.metrics = tuple(metrics)
+        self.path = path
+        self.sigma = sigma
+        self.min_delta = min_delta
+        self.sustain = sustain
+        self._state = {m: array('d', bytes(8 * BUCKETS * _FIELDS)) for m in self.metrics}
+        self._streak = dict.fromkeys(self.metrics, 0)
+        self._anomalies = []
+
+    # ── Model ─────────────────────────────────────────────────────────────
+
+    def expected(self, metric, ts):
+        """``(mean, std, samples)`` for ``metric`` at time ``ts``."""
+        state = self._state[metric]
+        i = bucket_of(ts) * _FIELDS
+        return state[i + 1], max(MIN_STD, state[i + 2] ** 0.5), state[i]
+
+    def observe(self, stats, ts=None):
+        """Score one sample against its bucket, then learn from it.
+
+        Returns ``[(metric, value, mean, std, bucket)]`` for metrics whose
+        anomaly has lasted ``sustain`` samples.
+        """
+        ts = time.time() if ts is None else ts
+        bucket = bucket_of(ts)
+        i = bucket * _FIELDS
+        anomalies = []
+        for metric in self.metrics:
+            value = getattr(stats, metric, None)
+            if value is None:
+                continue
+            state = self._state[metric]
+            weight, mean, var = state[i], state[i + 1], state[i + 2]
+            std = max(MIN_STD, var ** 0.5)
+
+            if (weight >= MIN_SAMPLES and value - mean >= self.min_delta
+                    and value - mean >= self.sigma * std):
+                self._streak[metric] += 1
+                if self._streak[metric] >= self.sustain:
+                    anomalies.append((metric, value, mean, std, bucket))
+            else:
+                self._streak[metric] = 0
+
+            # Exponentially weighted mean/variance (exact running stats
+            # until the weight cap is reached).
+            weight = min(weight + 1.0, MAX_WEIGHT)
+            alpha = 1.0 / weight
+            diff = value - mean
+            incr = alpha * diff
+            state[i] = weight
+            state[i + 1] = mean + incr
+            state[i + 2] = (1.0 - alpha) * (var + diff * incr)
+        self._anomalies = anomalies
+        return anomalies
+
+    def alerts(self):
+        """``(title, message)`` pairs for the last sample's anomalies (with cooldown)."""
+        alerts = []
+        for metric, value, mean, std, bucket in self._anomalies:
+            if not can_notify(f"anomaly:{metric}"):
+                continue
+            label = _LABELS.get(metric, metric)
+            alerts.append((f"Unusual {label}",
+                           f"{label} at {value:.1f}% (usual for {_bucket_label(bucket)}: "
+                           f"{mean:.1f}% ± {std:.1f})"))
+        return alerts
+
+    # ── Persistence ───────────────────────────────────────────────────────
+
+    def save(self, path=None):
+        """Write the model atomically. Returns False on failure."""
+        path = path or self.path
+        if path is None:
+            return False
+        header = json.dumps({'version': _FORMAT_VERSION, 'buckets': BUCKETS,
+                             'fields': _FIELDS, 'metrics': list(self.metrics)})
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(header.encode() + b"\n")
+                for metric in self.metrics:
+                    self._state[metric].tofile(f)
+            os.replace(tmp, path)
+            return True
+        except OSError as e:
+            logger.error(f"Could not save baseline to {path}: {e}")
+            return False
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Load a saved model, or start empty if it is missing or unreadable.
+
+        Metrics in the file but not requested are skipped; requested metrics
+        missing from the file start empty.
+        """
+        model = cls(path=path, **kwargs)
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                if (header.get('version') != _FORMAT_VERSION or header.get('buckets') != BUCKETS
+                        or header.get('fields') != _FIELDS):
+                    raise ValueError("incompatible baseline format")
+                for metric in header['metrics']:
+                    state = array('d')
+                    state.fromfile(f, BUCKETS * _FIELDS)
+                    if metric in model._state:
+                        model._state[metric] = state
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            logger.warning(f"Ignoring unreadable baseline {path}: {e}")
+            model = cls(path=path, **kwargs)
+        return model
@@ -0,0 +1,202 @@
+"""Filesystem capacity: free space, fill rate and time-to-full per volume.
+
+A full boot volume is a classic root cause of memory pressure on macOS:
+swap files live on it (the VM volume shares the APFS container's space),
+and once they cannot grow, the compressor and then apps stall. The watcher
+samples local volumes at a low cadence (``CAPACITY_CHECK_EVERY``) with one
+``statvfs`` per volume. Network and pseudo filesystems are skipped, so a
+hung mount cannot stall it.
+
+The swap volume is found by device (``st_dev``), not by path. On macOS 11
+and later ``/private/var/vm`` is a firmlink into ``/System/Volumes/VM``,
+and ``/`` is a sealed read-only snapshot, so the path does not name its
+volume. Read-only mounts are candidates for that lookup. They are sampled
+only when they hold swap and never get a "filling up" alert.
+
+Each volume keeps constant-size state: the last reading and a fill rate
+smoothed over ``tau`` seconds. Time-to-full is the free space divided by
+that rate.
+"""
+
+import math
+import os
+import sys
+import time
+import logging
+
+import psutil
+
+from core import can_notify
+from core.config import CAPACITY_CHECK_EVERY, DISK_FREE_MIN_GB, DISK_FULL_ETA
+from core.snapshot import _SlotRecord
+
+logger = logging.getLogger('macmonitor.capacity')
+
+_GB = 1024 ** 3
+_SKIP_FSTYPES = frozenset({
+    'devfs', 'autofs', 'nullfs', 'proc', 'sysfs', 'tmpfs', 'devtmpfs', 'overlay', 'squashfs',
+    'nfs', 'nfs4', 'smbfs', 'cifs', 'afpfs', 'webdav', 'fuse.sshfs', 'osxfuse', 'macfuse',
+})
+# Where swap files grow: macOS keeps them in /private/var/vm (on the VM volume).
+SWAP_PATH = '/private/var/vm' if sys.platform == 'darwin' else '/'
+
+
+def format_duration(seconds):
+    """``"45m"``, ``"3h 20m"``, ``"2d 4h"``."""
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{max(1, minutes)}m"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 48:
+        return f"{hours}h {minutes:02d}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours}h"
+
+
+class VolumeCapacity(_SlotRecord):
+    """One volume's capacity (bytes), fill rate (bytes/s) and time-to-full (s or None)."""
+
+    __slots__ = ('mount', 'total', 'free', 'fill_bps', 'eta', 'swap', 'readonly')
+    _fields = __slots__
+
+    def __init__(self, mount, total, free, fill_bps=0.0, eta=None, swap=False, readonly=False):
+        self.mount = mount
+        self.total = total
+        self.free = free
+        self.fill_bps = fill_bps
+        self.eta = eta
+        self.swap = swap
+        self.readonly = readonly
+
+    @property
+    def percent(self):
+        return 100.0 * (self.total - self.free) / self.total if self.total else 0.0
+
+
+class _VolumeState:
+    __slots__ = ('time', 'free', 'rate')
+
+    def __init__(self, now, free):
+        self.time = now
+        self.free = free
+        self.rate = 0.0
+
+
+def _mount_of(path, mounts, stat=os.stat):
+    """The mount point on the same device as ``path`` (longest path prefix as a fallback)."""
+    try:
+        device = stat(path).st_dev
+    except OSError:
+        device = None
+    if device is not None:
+        for mount in mounts:
+            try:
+                if stat(mount).st_dev == device:
+                    return mount
+            except OSError:
+                continue
+    best = None
+    for mount in mounts:
+        prefix = mount.rstrip('/') + '/'
+        if (path == mount or path.startswith(prefix)) and (best is None or len(mount) > len(best)):
+            best = mount
+    return best
+
+
+class CapacityWatcher:
+    """Low-cadence capacity sampling with fill-rate tracking.
+
+    Args:
+        interval: Minimum seconds between samples; ``sample()`` returns the
+            previous result in between.
+        tau:      Smoothing time constant of the fill rate, in seconds.
+    """
+
+    def __init__(self, interval=CAPACITY_CHECK_EVERY, tau=900.0, clock=time.monotonic,
+                 partitions=psutil.disk_partitions, statvfs=os.statvfs, stat=os.stat,
+                 swap_path=SWAP_PATH):
+        self.interval = interval
+        self.tau = tau
+        self._clock = clock
+        self._partitions = partitions
+        self._statvfs = statvfs
+        self._stat = stat
+        self._swap_path = swap_path
+        self._state = {}
+        self._last = None
+        self.volumes = []
+
+    def _mounts(self):
+        """``{mount point: read-only}`` for local, real filesystems."""
+        mounts = {}
+        for part in self._partitions(all=False):
+            if part.fstype in _SKIP_FSTYPES:
+                continue
+            mounts[part.mountpoint] = 'ro' in part.opts.split(',')
+        return mounts
+
+    def sample(self):
+        """Refresh volumes if ``interval`` has passed; returns ``[VolumeCapacity]``."""
+        now = self._clock()
+        if self._last is not None and now - self._last < self.interval:
+            return self.volumes
+        self._last = now
+        try:
+            mounts = self._mounts()
+        except Exception as e:
+            logger.error(f"Error listing volumes: {e}")
+            return self.volumes
+
+        swap_mount = _mount_of(self._swap_path, list(mounts), self._stat)
+        state = self._state
+        volumes = []
+        for mount, readonly in mounts.items():
+            if readonly and mount != swap_mount:
+                continue
+            try:
+                st = self._statvfs(mount)
+            except OSError:
+                continue
+            total = st.f_blocks * st.f_frsize
+            free = st.f_bavail * st.f_frsize
+            if not total:
+                continue
+            vol = state.get(mount)
+            if vol is None:
+                vol = state[mount] = _VolumeState(now, free)
+            elif now > vol.time:
+                dt = now - vol.time
+                alpha = 1.0 - math.exp(-dt / self.tau)
+                vol.rate += alpha * ((vol.free - free) / dt - vol.rate)
+                vol.time = now
+                vol.free = free
+            eta = free / vol.rate if vol.rate > 0 else None
+            volumes.append(VolumeCapacity(mount, total, free, vol.rate, eta, mount == swap_mount,
+                                          readonly))
+
+        # Unmounted volumes drop out.
+        for mount in state.keys() - {v.mount for v in volumes}:
+            del state[mount]
+        self.volumes = volumes
+        return volumes
+
+    def swap_volume(self):
+        """The volume swap files grow on, if it is being watched."""
+        for vol in self.volumes:
+            if vol.swap:
+                return vol
+        return None
+
+    def alerts(self, free_min_gb=DISK_FREE_MIN_GB, full_eta=DISK_FULL_ETA):
+        """``(title, message)`` for low swap headroom and volumes filling up (with cooldown)."""
+        alerts = []
+        for vol in self.volumes:
+            free_gb = vol.free / _GB
+            if vol.swap and free_gb < free_min_gb and can_notify(f"swap_space:{vol.mount}"):
+                alerts.append(("Swap Space at Risk",
+                               f"Only {free_gb:.1f} GB free on {vol.mount}; swap cannot grow much further"))
+            elif (not vol.readonly and vol.eta is not None and vol.eta < full_eta
+                  and can_notify(f"disk_full:{vol.mount}")):
+                alerts.append(("Disk Filling Up",
+                               f"{vol.mount}: {free_gb:.1f} GB free, full in ~{format_duration(vol.eta)}"))
+        return alerts
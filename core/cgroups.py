@@ -0,0 +1,197 @@
+"""Container usage from cgroup v2: CPU, memory and memory pressure per container.
+
+Container runtimes give each container its own cgroup:
+
+    system.slice/docker-<id>.scope              docker (systemd driver)
+    docker/<id>                                  docker (cgroupfs driver)
+    machine.slice/libpod-<id>.scope              podman
+    kubepods.slice/.../cri-containerd-<id>.scope containerd / k8s
+    kubepods.slice/.../crio-<id>.scope           CRI-O
+    lxc.payload.<name>                           LXC
+
+``CgroupCollector`` walks the tree every ``rescan`` seconds to find them.
+Between walks it re-reads three files per container (``cpu.stat``,
+``memory.current`` and ``memory.pressure``) through ``ProcFile`` handles
+that stay open across ticks. CPU is the ``usage_usec`` delta over the
+monotonic-clock delta, in percent of one core. Pressure is the PSI
+``some`` 10 s average.
+"""
+
+import os
+import re
+import time
+import logging
+
+from core.backends.linux import ProcFile, parse_psi
+from core.config import CGROUP_ROOT, CGROUP_RESCAN_EVERY
+from core.snapshot import _SlotRecord
+
+logger = logging.getLogger('macmonitor.core')
+
+_CONTAINER_SCOPE = re.compile(r'^(docker|libpod|cri-containerd|crio)-([0-9a-f]{12,})\.scope$')
+_CONTAINER_ID = re.compile(r'^[0-9a-f]{64}$')
+_LXC = re.compile(r'^lxc\.payload\.(.+)$')
+
+
+def container_name(path_parts):
+    """``"docker 3f2a1b9c0d1e"`` for a container cgroup, ``None`` for anything else."""
+    leaf = path_parts[-1]
+    m = _CONTAINER_SCOPE.match(leaf)
+    if m:
+        runtime = {'libpod': 'podman', 'cri-containerd': 'containerd'}.get(m.group(1), m.group(1))
+        return f"{runtime} {m.group(2)[:12]}"
+    if len(path_parts) >= 2 and path_parts[-2] == 'docker' and _CONTAINER_ID.match(leaf):
+        return f"docker {leaf[:12]}"
+    m = _LXC.match(leaf)
+    if m:
+        return f"lxc {m.group(1)}"
+    return None
+
+
+def parse_cpu_stat(text):
+    """``usage_usec`` from a cgroup ``cpu.stat``, or ``None``."""
+    for line in text.splitlines():
+        key, _, value = line.partition(' ')
+        if key == 'usage_usec':
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+class ContainerUsage(_SlotRecord):
+    """One container: CPU (% of one core), memory (bytes) and PSI memory ``some``/``full`` (%)."""
+
+    __slots__ = ('name', 'path', 'cpu', 'mem', 'pressure', 'pressure_full')
+    _fields = __slots__
+
+    def __init__(self, name, path, cpu=0.0, mem=0, pressure=0.0, pressure_full=0.0):
+        self.name = name
+        self.path = path
+        self.cpu = cpu
+        self.mem = mem
+        self.pressure = pressure
+        self.pressure_full = pressure_full
+
+
+class _Container:
+    """Open handles and the previous CPU reading for one container cgroup."""
+
+    __slots__ = ('name', 'path', 'cpu_stat', 'memory', 'pressure', 'usage', 'time')
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.cpu_stat = ProcFile(os.path.join(path, 'cpu.stat'))
+        self.memory = ProcFile(os.path.join(path, 'memory.current'))
+        self.pressure = ProcFile(os.path.join(path, 'memory.pressure'))
+        self.usage = None
+        self.time = None
+
+    def close(self):
+        for handle in (self.cpu_stat, self.memory, self.pressure):
+            handle.close()
+
+
+RANK_KEYS = {'cpu': lambda c: c.cpu, 'mem': lambda c: c.mem,
+             'pressure': lambda c: (c.pressure, c.pressure_full)}
+
+
+class CgroupCollector:
+    """Per-container usage with rates from deltas and reused file handles.
+
+    Args:
+        root:   cgroup v2 mount point.
+        rescan: Seconds between walks of the tree for new containers.
+    """
+
+    def __init__(self, root=CGROUP_ROOT, rescan=CGROUP_RESCAN_EVERY, clock=time.monotonic):
+        self.root = root
+        self.rescan = rescan
+        self._clock = clock
+        self._containers = {}      # cgroup path -> _Container
+        self._last_walk = None
+        self.usage = []
+
+    @staticmethod
+    def available(root=CGROUP_ROOT):
+        """Whether ``root`` is a cgroup v2 (unified) hierarchy."""
+        return os.path.exists(os.path.join(root, 'cgroup.controllers'))
+
+    def _walk(self):
+        found = {}
+        stack = [(self.root, ())]
+        while stack:
+            path, parts = stack.pop()
+            try:
+                entries = list(os.scandir(path))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                child = parts + (entry.name,)
+                name = container_name(child)
+                if name is not None:
+                    found[entry.path] = name
+                else:
+                    # Containers do not nest containers we care about.
+                    stack.append((entry.path, child))
+        return found
+
+    def _discover(self, now):
+        found = self._walk()
+        containers = self._containers
+        for path in containers.keys() - found.keys():
+            containers.pop(path).close()
+        for path, name in found.items():
+            if path not in containers:
+                containers[path] = _Container(name, path)
+        self._last_walk = now
+
+    def sample(self):
+        """Read every known container; returns ``[ContainerUsage]``."""
+        now = self._clock()
+        if self._last_walk is None or now - self._last_walk >= self.rescan:
+            self._discover(now)
+
+        usage = []
+        gone = []
+        for path, c in self._containers.items():
+            cpu_text = c.cpu_stat.read()
+            mem_text = c.memory.read()
+            if cpu_text is None or mem_text is None:
+                gone.append(path)          # removed since the last walk
+                continue
+            cpu = 0.0
+            used = parse_cpu_stat(cpu_text)
+            if used is not None:
+                if c.usage is not None and now > c.time and used >= c.usage:
+                    cpu = (used - c.usage) / 1e4 / (now - c.time)
+                c.usage, c.time = used, now
+            try:
+                mem = int(mem_text)
+            except ValueError:
+                mem = 0
+            psi_text = c.pressure.read()
+            psi = parse_psi(psi_text) if psi_text else {}
+            usage.append(ContainerUsage(c.name, path, cpu, mem,
+                                        psi.get('some', 0.0), psi.get('full', 0.0)))
+        for path in gone:
+            self._containers.pop(path).close()
+        self.usage = usage
+        return usage
+
+    def top(self, by='cpu', n=5):
+        """The ``n`` busiest containers from the last sample by ``cpu``, ``mem`` or ``pressure``."""
+        try:
+            key = RANK_KEYS[by]
+        except KeyError:
+            raise ValueError(f"Unknown container ranking: {by!r}") from None
+        return sorted(self.usage, key=key, reverse=True)[:n]
+
+    def close(self):
+        for c in self._containers.values():
+            c.close()
+        self._containers.clear()
@@ -0,0 +1,82 @@
+"""Process classification (Spotlight, GPU-heavy, browsers, build tools, VMs).
+
+All rules are compiled into one regular expression, so a name is classified
+with a single ``match()`` call, and results are memoized per process name.
+Processes that persist between scans therefore cost one dict lookup.
+"""
+
+import re
+import logging
+
+from core.config import PROCESS_CLASSES
+
+logger = logging.getLogger('macmonitor.core')
+
+# Upper bound on memoized names; the cache is simply dropped when exceeded.
+_CACHE_LIMIT = 4096
+
+
+class ProcessClassifier:
+    """Compiled matcher for a list of classification rules.
+
+    Each rule is a dict ``{'label': str, 'contains': [str, ...]}`` with an
+    optional ``'ignore_case'`` flag. ``'words'`` lists short names that only
+    count as a whole word (``Arc`` matches "Arc Helper", not "Archive
+    Utility"). A name gets every label whose rule matches it, in rule order.
+    """
+
+    def __init__(self, rules=PROCESS_CLASSES):
+        self.labels = []
+        parts = []
+        for rule in rules:
+            needles = [re.escape(n) for n in rule.get('contains', ()) if n]
+            needles += [rf'(?<![0-9A-Za-z]){re.escape(w)}(?![0-9A-Za-z])'
+                        for w in rule.get('words', ()) if w]
+            if not needles:
+                continue
+            alt = '|'.join(needles)
+            if rule.get('ignore_case'):
+                alt = f'(?i:{alt})'
+            # One optional lookahead per rule: a single match() from position 0
+            # reports every rule that occurs anywhere in the name.
+            parts.append(f'(?=.*?({alt}))?')
+            self.labels.append(rule['label'])
+        self._pattern = re.compile(''.join(parts), re.DOTALL)
+        self._cache = {}
+        # Interned label tuples so rows with the same classes share one tuple.
+        self._tuples = {(): ()}
+
+    def classify(self, name):
+        """Return the tuple of labels for ``name`` (memoized)."""
+        if not name:
+            return ()
+        labels = self._cache.get(name)
+        if labels is not None:
+            return labels
+
+        groups = self._pattern.match(name).groups()
+        found = tuple(label for label, hit in zip(self.labels, groups) if hit is not None)
+        labels = self._tuples.setdefault(found, found)
+
+        if len(self._cache) >= _CACHE_LIMIT:
+            self._cache.clear()
+        self._cache[name] = labels
+        return labels
+
+
+_classifier = ProcessClassifier()
+
+
+def get_classifier():
+    """Return the active process classifier."""
+    return _classifier
+
+
+def configure(rules):
+    """Replace the active classifier with one compiled from ``rules``."""
+    global _classifier
+    try:
+        _classifier = ProcessClassifier(rules)
+    except (re.error, KeyError, TypeError) as e:
+        logger.error(f"Invalid process classification rules, keeping previous set: {e}")
+    return _classifier
@@ -0,0 +1,226 @@
+"""Collector registry: concurrent, memoized and fault-isolated metric sources.
+
+The platform collectors behind ``get_stats()`` (vm_stat, memory_pressure,
+sysctl, /proc reads, I/O counters) are independent of one another, so the
+runner starts them together on a small thread pool and a tick takes as long
+as the slowest one rather than the sum of all of them.
+
+Each collector declares its ``cost`` (``COST_CHEAP``: in-process reads;
+``COST_TOOL``: a subprocess or syscall-heavy walk; ``COST_SCAN``: the
+process scan) and a freshness ``ttl``. A value younger than its TTL is
+served from the cache without calling the collector again. Every consumer
+that reads within that time (menu, alerts, Copy Stats, Refresh, the
+dashboard) shares one call. Costlier collectors are started first.
+
+Each collector has a timeout. If it has not finished in time, the tick uses
+the collector's last good value, lists it as stale and counts a failure
+(see below). The hung call is left to finish in the background. Later ticks
+neither wait for it nor start it again until it returns, so a wedged tool
+ties up one worker and costs the tick nothing.
+
+A collector that raises is isolated. Its last good value is served and
+listed as stale. It is not called again until a backoff has passed, which
+doubles per consecutive failure from ``COLLECTOR_BACKOFF`` up to
+``COLLECTOR_MAX_BACKOFF``. Only a call that returns within its timeout
+ends the backoff. One broken source never takes the rest of the
+tick with it.
+
+Collectors added with ``on_demand=True`` are not part of ``run()``. They
+are read synchronously with ``get(name)``, through the same TTL cache and
+backoff. ``guard()`` applies the backoff alone to any call (alert engines
+and other per-tick stages).
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from core.config import COLLECTOR_TIMEOUT, COLLECTOR_BACKOFF, COLLECTOR_MAX_BACKOFF
+
+logger = logging.getLogger('macmonitor.core')
+
+COST_CHEAP = 1      # in-process reads (psutil counters, /proc, cached values)
+COST_TOOL = 2       # subprocesses or heavier system calls
+COST_SCAN = 3       # a pass over every process
+
+
+class Collector:
+    """One named metric source, its last good value and its failure state."""
+
+    __slots__ = ('name', 'fn', 'timeout', 'value', 'future', 'updated', 'ttl', 'cost',
+                 'on_demand', 'failures', 'retry_at')
+
+    def __init__(self, name, fn, timeout, default=None, ttl=0.0, cost=COST_CHEAP, on_demand=False):
+        self.name = name
+        self.fn = fn
+        self.timeout = timeout
+        self.value = default
+        self.future = None
+        self.updated = None     # monotonic time of the last good value
+        self.ttl = ttl
+        self.cost = cost
+        self.on_demand = on_demand
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def fresh(self, now):
+        return self.updated is not None and 0 <= now - self.updated < self.ttl
+
+    def backing_off(self, now):
+        return now < self.retry_at
+
+    def _succeeded(self, value, now):
+        self.value = value
+        self.updated = now
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def _failed(self, error, now):
+        self.failures += 1
+        delay = min(COLLECTOR_MAX_BACKOFF, COLLECTOR_BACKOFF * 2 ** (self.failures - 1))
+        self.retry_at = now + delay
+        logger.error(f"Collector {self.name} failed ({error}); retrying in {delay:.0f}s")
+
+    def _harvest(self, late=False):
+        """Take the finished call's result as the new value. True on success.
+
+        A ``late`` result (from a call that timed out) is kept, but does not
+        end the backoff the timeout started.
+        """
+        future = self.future
+        self.future = None
+        try:
+            value = future.result()
+        except Exception as e:
+            self._failed(e, time.monotonic())
+            return False
+        if late:
+            self.value = value
+            self.updated = time.monotonic()
+        else:
+            self._succeeded(value, time.monotonic())
+        return True
+
+
+def _by_cost(collector):
+    return -collector.cost
+
+
+class CollectorRunner:
+    """Run registered collectors concurrently, once per ``run()``.
+
+    Args:
+        max_workers: Thread pool size.
+        timeout:     Default per-collector timeout in seconds.
+    """
+
+    def __init__(self, max_workers=4, timeout=COLLECTOR_TIMEOUT):
+        self.timeout = timeout
+        self._max_workers = max_workers
+        self._collectors = {}
+        self._pool = None
+
+    def add(self, name, fn, timeout=None, default=None, ttl=0.0, cost=COST_CHEAP, on_demand=False):
+        """Register ``fn()`` under ``name``; ``default`` is used until it first succeeds.
+
+        ``ttl`` is how long (seconds) a value is served without calling
+        ``fn`` again. ``on_demand`` collectors are only called by ``get()``.
+        """
+        self._collectors[name] = Collector(name, fn, timeout or self.timeout, default,
+                                           ttl, cost, on_demand)
+        return self
+
+    def run(self, force=False):
+        """Return ``(values, stale)``: ``{name: value}`` and a tuple of stale names.
+
+        ``force`` ignores TTLs and backoff (an explicit refresh).
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._max_workers,
+                                            thread_name_prefix='collector')
+        collectors = [c for c in self._collectors.values() if not c.on_demand]
+        now = time.monotonic()
+        stale = []
+        waiting = []
+        # A call left over from an earlier tick either finished in the
+        # meantime (start a new one) or is still hung (do not pile up more,
+        # and do not wait for it again).
+        for c in sorted(collectors, key=_by_cost):
+            if c.future is not None and c.future.done():
+                c._harvest(late=True)
+            if c.future is not None:
+                stale.append(c.name)
+                continue
+            if not force and c.fresh(now):
+                continue
+            if not force and c.backing_off(now):
+                stale.append(c.name)
+                continue
+            c.future = self._pool.submit(c.fn)
+            waiting.append(c)
+
+        start = time.monotonic()
+        for c in sorted(waiting, key=lambda c: c.timeout):
+            remaining = start + c.timeout - time.monotonic()
+            try:
+                c.future.result(timeout=max(0.0, remaining))
+            except FutureTimeout:
+                c._failed(f"timed out after {c.timeout:.1f}s", time.monotonic())
+                stale.append(c.name)
+                continue
+            except Exception:
+                pass
+            if not c._harvest():
+                stale.append(c.name)
+
+        return {c.name: c.value for c in collectors}, tuple(stale)
+
+    def get(self, name, force=False):
+        """Memoized read of one collector, calling it in this thread if needed.
+
+        Within the TTL, or while the collector is backing off after a
+        failure, the last good value is returned without calling it.
+        """
+        c = self._collectors[name]
+        now = time.monotonic()
+        if not force and (c.fresh(now) or c.backing_off(now)):
+            return c.value
+        try:
+            c._succeeded(c.fn(), time.monotonic())
+        except Exception as e:
+            c._failed(e, time.monotonic())
+        return c.value
+
+    def invalidate(self, name):
+        """Make the next read of ``name`` call the collector again."""
+        self._collectors[name].updated = None
+
+    def guard(self, name, fn, *args, default=None):
+        """Call ``fn(*args)``, isolating failures with backoff under ``name``.
+
+        While ``name`` is backing off, ``default`` is returned without calling.
+        """
+        c = self._collectors.get(name)
+        if c is None:
+            c = self._collectors[name] = Collector(name, None, self.timeout, on_demand=True)
+        now = time.monotonic()
+        if c.backing_off(now):
+            return default
+        try:
+            value = fn(*args)
+        except Exception as e:
+            c._failed(e, time.monotonic())
+            return default
+        c._succeeded(None, time.monotonic())
+        return value
+
+    def backing_off(self):
+        """``{name: seconds until retry}`` for collectors isolated after failures."""
+        now = time.monotonic()
+        return {c.name: c.retry_at - now for c in self._collectors.values() if c.backing_off(now)}
+
+    def close(self):
+        """Shut the pool down without waiting for hung collectors."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
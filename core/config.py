@@ -10,6 +10,32 @@ CPU_LIMIT = 85
 MEM_LIMIT = 80
 SWAP_LIMIT = 20
 
+# Throughput thresholds (MB/s, summed over all disks / interfaces)
+DISK_IO_LIMIT = 400
+NET_IO_LIMIT = 100
+
+# Thrash score (0-100, core.paging) at which lag risk is flagged
+THRASH_LIMIT = 50
+
+# Scheduler latency (core.latency): while enabled ("latency_probe": true in
+# config.json; off by default, as it costs a wakeup every 1/LATENCY_PROBE_HZ s),
+# a probe thread times how late it wakes. Lag risk is flagged when the p95 over
+# the last LATENCY_WINDOW seconds reaches LAG_LIMIT_MS.
+LATENCY_PROBE_HZ = 10
+LATENCY_WINDOW = 60
+LAG_LIMIT_MS = 50
+
+# Pressure attribution (core.attribution): when memory pressure rises, name the
+# processes whose RSS grew by at least ATTRIBUTION_MIN_GROWTH_MB over the last
+# ATTRIBUTION_WINDOW seconds.
+ATTRIBUTION_WINDOW = 300
+ATTRIBUTION_MIN_GROWTH_MB = 50
+
+# Disk capacity (core.capacity): warn when the volume swap grows on has less
+# than DISK_FREE_MIN_GB free, or any volume will fill within DISK_FULL_ETA s.
+DISK_FREE_MIN_GB = 5
+DISK_FULL_ETA = 3 * 3600
+
 # Timing (seconds)
 # CHECK_EVERY controls how often resource usage is sampled.
 # Lower values (e.g. 5s) provide more responsive monitoring but increase CPU usage
@@ -19,11 +45,153 @@ SWAP_LIMIT = 20
 CHECK_EVERY = 5
 COOLDOWN = 120
 
+# Accurate memory (core.footprint): rank the top ACCURATE_MEMORY_TOP_K processes
+# by owned memory (USS/PSS) instead of RSS, re-measuring each at most every
+# ACCURATE_MEMORY_REFRESH seconds. Enabled with "accurate_memory": true.
+ACCURATE_MEMORY_TOP_K = 10
+ACCURATE_MEMORY_REFRESH = 30
 
-def _config_file() -> Path:
+# Containers (core.cgroups, Linux cgroup v2): where the hierarchy is mounted and
+# how often it is walked for new containers (seconds).
+CGROUP_ROOT = '/sys/fs/cgroup'
+CGROUP_RESCAN_EVERY = 10
+
+# Terminal UI (tui) refresh interval (seconds).
+TUI_REFRESH = 1.0
+
+# Volume capacity changes slowly; it is sampled this often (seconds).
+CAPACITY_CHECK_EVERY = 60
+
+# While the menu is closed and nothing has subscribed to the process scan, it
+# only runs this often (seconds); see core.demand.
+PROCESS_SCAN_IDLE_EVERY = 60
+
+# Features fed by the process scan (the "process_tracking" key in config.json).
+# They ride the idle scan and only keep it at tick rate while they need it
+# (lifecycle: while the running pids change; attribution: while memory
+# pressure is raised; see core.demand). Turning one off drops the feature and
+# the psutil fields only it asks for (ppid, cpu_times, memory_info).
+PROCESS_TRACKING = {'lifecycle': True, 'cpu_accounting': True, 'attribution': True}
+
+# Per-collector timeout within one tick (seconds); a collector that misses it
+# keeps its previous value and is reported as stale (see core.collectors).
+COLLECTOR_TIMEOUT = 2.0
+# Platform collectors' values are shared by every reader for COLLECTOR_TTL
+# seconds (shorter than CHECK_EVERY, so each tick still refreshes). A collector
+# that fails is retried after COLLECTOR_BACKOFF seconds, doubling per failure
+# up to COLLECTOR_MAX_BACKOFF.
+COLLECTOR_TTL = 2.0
+COLLECTOR_BACKOFF = 5.0
+COLLECTOR_MAX_BACKOFF = 300.0
+# Repeated process-scan reads within this many seconds share one scan.
+PROCESS_SCAN_TTL = 1.0
+
+# Process churn (core.lifecycle): alert when, within SPAWN_WINDOW seconds, one
+# name starts SPAWN_STORM_PER_NAME times, one parent spawns
+# SPAWN_STORM_PER_PARENT children, or one name exits CRASH_LOOP_EXITS times
+# within CRASH_LOOP_LIFETIME seconds of starting. Crash loops need the
+# per-tick process scan (CHECK_EVERY); see core.lifecycle.
+SPAWN_WINDOW = 60
+SPAWN_STORM_PER_NAME = 100
+SPAWN_STORM_PER_PARENT = 200
+CRASH_LOOP_EXITS = 10
+CRASH_LOOP_LIFETIME = 10
+
+# Alert sinks (core.sinks): alerts are batched and forwarded every
+# ALERT_BATCH_INTERVAL seconds to the sinks listed under "alert_sinks" in
+# config.json (webhook / syslog / file). None are configured by default.
+ALERT_BATCH_INTERVAL = 30
+ALERT_SINKS = []
+
+# Seasonal baselines (core.baseline): alert when a metric sits BASELINE_SIGMA
+# standard deviations and at least BASELINE_MIN_DELTA points above what is
+# normal for this hour and weekday, for BASELINE_SUSTAIN consecutive samples.
+BASELINE_METRICS = ('cpu', 'mem', 'swap')
+BASELINE_SIGMA = 3.0
+BASELINE_MIN_DELTA = 15.0
+BASELINE_SUSTAIN = 6
+BASELINE_SAVE_EVERY = 600   # seconds between saves of the learned model
+
+# Long-horizon history (core.history): every sample for HISTORY_RETENTION
+# seconds, compressed in sealed blocks of HISTORY_BLOCK_SPAN seconds each.
+# Each metric is (Stats attribute path, decimal places kept).
+HISTORY_METRICS = (
+    ('cpu', 1), ('mem', 1), ('swap', 1), ('pressure_val', 0), ('lag_risk', 0),
+    ('macos_mem.wired', 2), ('macos_mem.active', 2), ('macos_mem.compressed', 2),
+    ('macos_mem.cached', 2), ('macos_mem.swap_cached', 2),
+    ('io.disk_read_bps', -3), ('io.disk_write_bps', -3),
+    ('io.net_recv_bps', -3), ('io.net_sent_bps', -3),
+    ('paging.thrash', 0), ('lag.p95', 1),
+)
+HISTORY_RETENTION = 7 * 24 * 3600
+HISTORY_BLOCK_SPAN = 3600
+HISTORY_RESOLUTION = 1.0    # seconds; timestamps are stored on this grid
+HISTORY_SAVE_EVERY = 600
+
+# Flight recorder window dumped when an alert fires (seconds of history)
+FLIGHT_RECORDER_WINDOW = 300
+
+# Local live dashboard (core.dashboard); only started when enabled in config.json.
+DASHBOARD_PORT = 8765
+
+# Process classification rules (label -> name substrings, plus short names in
+# "words" that must match as a whole word). Users can override these through
+# the "process_classes" key in config.json; each entry may also set
+# "ignore_case" (default False).
+PROCESS_CLASSES = [
+    {'label': 'Spotlight', 'contains': ['mds', 'mdworker'], 'ignore_case': True},
+    {'label': 'GPU', 'contains': ['Electron', 'WebKit', 'Google Chrome', 'Slack',
+                                  'Discord', 'WindowServer', 'Helper (GPU)']},
+    {'label': 'Browser', 'contains': ['Safari', 'Google Chrome', 'Firefox',
+                                      'Brave Browser', 'Microsoft Edge'],
+     'words': ['Arc']},
+    {'label': 'Build', 'contains': ['clang', 'swift-frontend', 'xcodebuild', 'cargo',
+                                    'rustc', 'gradle', 'webpack', 'esbuild'],
+     'words': ['tsc']},
+    {'label': 'VM', 'contains': ['qemu', 'VirtualBox', 'com.docker', 'Parallels', 'vmware'],
+     'words': ['UTM']},
+]
+
+# Per-process threshold rules (see core.rules), e.g.
+#   {"process": "node", "metric": "rss", "threshold": 4}
+#   {"process": "WindowServer", "metric": "cpu", "threshold": 60, "sustain": 30}
+# Users add them under the "process_rules" key in config.json.
+PROCESS_RULES = []
+
+# Automatic remediation (see core.remediation). No policies are active until
+# they are added under the "remediation" key in config.json, and actions are
+# only logged until "dry_run" is set to false.
+REMEDIATION = {'dry_run': True, 'policies': []}
+
+
+def config_dir() -> Path:
+    """The app's settings directory (created on first use)."""
     path = Path.home() / "Library" / "Application Support" / "MacMonitor"
     path.mkdir(parents=True, exist_ok=True)
-    return path / "config.json"
+    return path
+
+
+def _config_file() -> Path:
+    return config_dir() / "config.json"
+
+
+def _read_config() -> dict:
+    """Return the saved config dict, or an empty dict if unreadable."""
+    try:
+        data = json.loads(_config_file().read_text())
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _write_config(**updates) -> None:
+    """Merge ``updates`` into the saved config, keeping unrelated keys."""
+    try:
+        data = _read_config()
+        data.update(updates)
+        _config_file().write_text(json.dumps(data, indent=2))
+    except Exception:
+        pass
 
 
 def load_thresholds() -> tuple:
@@ -45,10 +213,90 @@ def load_thresholds() -> tuple:
 
 def save_thresholds(cpu: int, mem: int, swap: int) -> None:
     """Persist threshold settings to disk."""
+    _write_config(cpu_limit=cpu, mem_limit=mem, swap_limit=swap)
+
+
+def load_process_rules() -> list:
+    """Load per-process threshold rules (list of dicts), falling back to defaults."""
+    rules = _read_config().get('process_rules')
+    if not isinstance(rules, list):
+        return list(PROCESS_RULES)
+    return [r for r in rules if isinstance(r, dict)]
+
+
+def save_process_rules(rules: list) -> None:
+    """Persist per-process threshold rules to disk."""
+    _write_config(process_rules=rules)
+
+
+def load_process_classes() -> list:
+    """Load process classification rules, falling back to defaults."""
+    rules = _read_config().get('process_classes')
+    if not isinstance(rules, list):
+        return PROCESS_CLASSES
+    valid = [
+        r for r in rules
+        if isinstance(r, dict) and r.get('label')
+        and (isinstance(r.get('contains'), list) or isinstance(r.get('words'), list))
+        and all(isinstance(r.get(k, []), list) for k in ('contains', 'words'))
+    ]
+    return valid or PROCESS_CLASSES
+
+
+def save_process_classes(rules: list) -> None:
+    """Persist process classification rules to disk."""
+    _write_config(process_classes=rules)
+
+
+def load_remediation() -> dict:
+    """Load remediation settings, falling back to defaults (dry-run, no policies)."""
+    data = _read_config().get('remediation')
+    if not isinstance(data, dict):
+        return dict(REMEDIATION)
+    policies = data.get('policies')
+    return {
+        'dry_run': bool(data.get('dry_run', True)),
+        'policies': policies if isinstance(policies, list) else [],
+    }
+
+
+def load_alert_sinks() -> list:
+    """Load alert sink settings (list of dicts with a "type"), falling back to none."""
+    sinks = _read_config().get('alert_sinks')
+    if not isinstance(sinks, list):
+        return list(ALERT_SINKS)
+    return [s for s in sinks if isinstance(s, dict) and s.get('type')]
+
+
+def load_accurate_memory() -> bool:
+    """Whether the memory ranking uses USS/PSS for the top processes (off by default)."""
+    return bool(_read_config().get('accurate_memory', False))
+
+
+def save_accurate_memory(enabled: bool) -> None:
+    _write_config(accurate_memory=bool(enabled))
+
+
+def load_process_tracking() -> dict:
+    """Which scan-observer features are enabled (all of them by default)."""
+    data = _read_config().get('process_tracking')
+    if not isinstance(data, dict):
+        data = {}
+    return {name: bool(data.get(name, default)) for name, default in PROCESS_TRACKING.items()}
+
+
+def load_latency_probe() -> bool:
+    """Whether the scheduler-latency probe runs (off by default)."""
+    return bool(_read_config().get('latency_probe', False))
+
+
+def load_dashboard() -> dict:
+    """Load live dashboard settings (disabled by default)."""
+    data = _read_config().get('dashboard')
+    if not isinstance(data, dict):
+        data = {}
     try:
-        _config_file().write_text(json.dumps(
-            {'cpu_limit': cpu, 'mem_limit': mem, 'swap_limit': swap},
-            indent=2
-        ))
-    except Exception:
-        pass
+        port = int(data.get('port', DASHBOARD_PORT))
+    except (TypeError, ValueError):
+        port = DASHBOARD_PORT
+    return {'enabled': bool(data.get('enabled', False)), 'port': port}
@@ -0,0 +1,257 @@
+"""Local live dashboard over Server-Sent Events.
+
+One sample fans out to every open browser tab. Each frame is a flat
+``{key: value}`` dict, and only the keys that changed since the previous
+frame are sent. Each event is encoded to bytes once and shared by all
+clients. A bounded history lets a new tab draw its charts immediately: it
+gets a keyframe for the oldest retained sample, then the deltas after it.
+A reconnecting tab (``Last-Event-ID``) only gets what it missed.
+
+    python -m core.dashboard            # standalone, samples on its own
+    http://127.0.0.1:8765/
+"""
+
+import json
+import queue
+import logging
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from core.config import DASHBOARD_PORT
+
+logger = logging.getLogger('macmonitor.dashboard')
+
+_PAGE_PATH = Path(__file__).parent / "dashboard.html"
+
+# Per-device throughput maps are too chatty for the dashboard; totals are kept.
+_SKIP_KEYS = frozenset({'io.disks', 'io.nics'})
+
+
+def flatten(data, prefix='', out=None):
+    """Flatten nested dicts into dotted keys, rounding floats to 2 places."""
+    if out is None:
+        out = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if name in _SKIP_KEYS:
+            continue
+        if isinstance(value, dict):
+            flatten(value, f"{name}.", out)
+        elif isinstance(value, float):
+            out[name] = round(value, 2)
+        else:
+            out[name] = value
+    return out
+
+
+def build_frame(stats, cpu_procs=(), mem_procs=()):
+    """Flat dashboard frame from a ``Stats`` sample and top-process rows."""
+    frame = flatten(stats.as_dict())
+    frame['top_cpu'] = [[p.pid, p.name, round(p.cpu, 1)] for p in cpu_procs]
+    frame['top_mem'] = [[p.pid, p.name, round(p.rank_mem, 1)] for p in mem_procs]
+    return frame
+
+
+_MISSING = object()
+
+
+def diff_frames(old, new):
+    """Keys of ``new`` whose values differ from ``old``; removed keys map to None."""
+    delta = {k: v for k, v in new.items() if old.get(k, _MISSING) != v}
+    for k in old.keys() - new.keys():
+        delta[k] = None
+    return delta
+
+
+def _event(kind, seq, payload):
+    data = json.dumps(payload, separators=(',', ':'))
+    return f"id: {seq}\nevent: {kind}\ndata: {data}\n\n".encode()
+
+
+class DashboardHub:
+    """Encodes frames once and fans them out to subscribed clients.
+
+    Args:
+        history: Number of recent frames replayed to a new client.
+        client_queue: Per-client backlog; a client that falls further behind
+            is disconnected and catches up through ``Last-Event-ID``.
+    """
+
+    def __init__(self, history=300, client_queue=64):
+        self._lock = threading.Lock()
+        self._clients = set()
+        self._client_queue = client_queue
+        self._history = deque(maxlen=history)   # (seq, frame-delta, encoded event)
+        self._base = {}                          # full frame before the oldest history entry
+        self._base_seq = 0
+        self._current = {}
+        self._seq = 0
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    def publish(self, frame, ts=None):
+        """Add one frame (flat dict). Only changed keys are sent."""
+        frame = dict(frame)
+        frame['t'] = round(ts if ts is not None else time.time(), 3)
+        with self._lock:
+            delta = diff_frames(self._current, frame)
+            self._current = frame
+            self._seq += 1
+            message = _event('delta', self._seq, delta)
+            if len(self._history) == self._history.maxlen:
+                evicted_seq, evicted_delta, _ = self._history[0]
+                _apply(self._base, evicted_delta)
+                self._base_seq = evicted_seq
+            self._history.append((self._seq, delta, message))
+            clients = list(self._clients)
+
+        for client in clients:
+            try:
+                client.put_nowait(message)
+            except queue.Full:
+                self._drop(client)
+        return delta
+
+    def subscribe(self, last_event_id=None):
+        """Register a client; returns ``(queue, replay_bytes)``."""
+        client = queue.Queue(maxsize=self._client_queue)
+        with self._lock:
+            replay = self._replay(last_event_id)
+            self._clients.add(client)
+        return client, replay
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def _drop(self, client):
+        self.unsubscribe(client)
+        try:
+            client.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def _replay(self, last_event_id):
+        """Bytes that bring a client from ``last_event_id`` (or nothing) up to date."""
+        if (last_event_id is not None and self._history
+                and self._base_seq <= last_event_id <= self._seq):
+            return b''.join(msg for seq, _, msg in self._history if seq > last_event_id)
+        parts = [_event('key', self._base_seq, self._base)]
+        parts.extend(msg for _, _, msg in self._history)
+        return b''.join(parts)
+
+
+def _apply(frame, delta):
+    for key, value in delta.items():
+        if value is None:
+            frame.pop(key, None)
+        else:
+            frame[key] = value
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hub = None
+    keepalive = 15.0
+
+    def log_message(self, fmt, *args):
+        logger.debug("dashboard: " + fmt % args)
+
+    def do_GET(self):
+        if self.path in ('/', '/index.html'):
+            body = _PAGE_PATH.read_bytes()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == '/events':
+            self._stream()
+        else:
+            self.send_error(404)
+
+    def _stream(self):
+        try:
+            last_id = int(self.headers.get('Last-Event-ID', ''))
+        except ValueError:
+            last_id = None
+        client, replay = self.hub.subscribe(last_id)
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(b"retry: 2000\n\n" + replay)
+            self.wfile.flush()
+            while True:
+                try:
+                    message = client.get(timeout=self.keepalive)
+                except queue.Empty:
+                    message = b": keepalive\n\n"
+                if message is None:
+                    break
+                self.wfile.write(message)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.hub.unsubscribe(client)
+
+
+class DashboardServer:
+    """HTTP server for the dashboard page and its ``/events`` stream.
+
+    Binds to localhost only. ``port=0`` picks a free port (see ``.port``).
+    """
+
+    def __init__(self, hub, port=DASHBOARD_PORT, host='127.0.0.1'):
+        handler = type('DashboardHandler', (_Handler,), {'hub': hub})
+        self.hub = hub
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name='dashboard', daemon=True)
+        self._thread.start()
+        logger.info(f"Dashboard running at {self.url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main(interval=1.0):
+    """Standalone mode: sample on our own and serve the dashboard."""
+    from core import get_stats, get_combined_process_info
+
+    logging.basicConfig(level=logging.INFO)
+    hub = DashboardHub()
+    server = DashboardServer(hub).start()
+    print(f"Dashboard: {server.url}")
+    try:
+        while True:
+            stats = get_stats()
+            cpu_procs, mem_procs, _ = get_combined_process_info(limit=5)
+            hub.publish(build_frame(stats, cpu_procs, mem_procs))
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
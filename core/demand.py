@@ -0,0 +1,121 @@
+"""Demand tiers for the process scan.
+
+The menu bar title needs only ``get_stats()``. The process scan (and the
+menu built from it) costs several times more, and most of the time nobody
+looks at it. ``ScanDemand`` decides, tick by tick, whether the scan runs:
+
+    menu open     every tick, plus an immediate warm scan when it opens
+    subscribed    every tick while any subscriber is active (process rules,
+                  remediation, a connected dashboard, ...)
+    urgent        this tick, when the title metrics already look unhealthy
+                  (so alerts and the flight recorder name the culprits)
+    idle          every ``idle_every`` seconds when nothing else needs it
+
+Scan observers ride whatever scans run. ``register()`` adds one without
+asking for more scans; ``attach()`` also subscribes it, optionally only
+while ``when()`` holds. ``build_scan_demand()`` wires the app's consumers:
+
+    lifecycle     every tick while the running pids change (a cheap
+                  ``psutil.pids()`` diff), so starts and exits are not missed
+    attribution   every tick while memory pressure is raised; before the
+                  rise the idle scan fills its (downsampled) RSS rings, and
+                  the rise itself is an urgent scan
+    accounting    never; it charges cumulative ``cpu_times`` deltas, so
+                  sparse scans only lose the time of processes that exit
+                  between them
+    rules, remediation
+                  every tick while any rule or policy is configured
+
+On a quiet machine with the menu closed the scan therefore drops to the
+idle cadence.
+"""
+
+import time
+
+from core import add_scan_observer, remove_scan_observer
+from core.config import PROCESS_SCAN_IDLE_EVERY
+
+
+class ScanDemand:
+    """Tracks who needs the process scan and when it last ran."""
+
+    def __init__(self, idle_every=PROCESS_SCAN_IDLE_EVERY, clock=time.monotonic):
+        self.idle_every = idle_every
+        self._clock = clock
+        self._subscribers = {}     # name -> predicate or None (always)
+        self._observers = {}       # name -> scan observer registered by attach()
+        self.menu_open = False
+        self._last_scan = None
+
+    def subscribe(self, name, when=None):
+        """Keep the scan running every tick for ``name`` (while ``when()`` is true)."""
+        self._subscribers[name] = when
+
+    def unsubscribe(self, name):
+        self._subscribers.pop(name, None)
+
+    def register(self, name, observer, attrs=()):
+        """Register ``observer`` with the process scan without asking for more scans."""
+        add_scan_observer(observer, attrs)
+        self._observers[name] = observer
+
+    def attach(self, name, observer, attrs=(), when=None):
+        """Register ``observer`` and keep the scan at full rate for it (while ``when()`` is true)."""
+        self.register(name, observer, attrs)
+        self.subscribe(name, when)
+
+    def detach(self, name):
+        """Undo ``register()`` / ``attach()``."""
+        observer = self._observers.pop(name, None)
+        if observer is not None:
+            remove_scan_observer(observer)
+        self.unsubscribe(name)
+
+    def observers(self):
+        """``{name: observer}`` for everything attached."""
+        return dict(self._observers)
+
+    def reasons(self, urgent=False):
+        """Why the scan should run this tick (empty = skip it)."""
+        reasons = []
+        if self.menu_open:
+            reasons.append('menu')
+        for name, when in self._subscribers.items():
+            if when is None or when():
+                reasons.append(name)
+        if urgent:
+            reasons.append('urgent')
+        if not reasons and (self._last_scan is None
+                            or self._clock() - self._last_scan >= self.idle_every):
+            reasons.append('idle')
+        return reasons
+
+    def should_scan(self, urgent=False):
+        return bool(self.reasons(urgent))
+
+    def mark_scanned(self):
+        self._last_scan = self._clock()
+
+
+def build_scan_demand(lifecycle=None, accountant=None, attribution=None, process_rules=None,
+                      remediation=None, dashboard_hub=None, **kwargs):
+    """The app's ``ScanDemand`` for the consumers passed in (``None`` = disabled).
+
+    See the module docstring for when each one keeps the scan at tick rate.
+    ``kwargs`` go to ``ScanDemand``.
+    """
+    demand = ScanDemand(**kwargs)
+    if lifecycle is not None:
+        demand.attach('lifecycle', lifecycle.observe, lifecycle.ATTRS, when=lifecycle.pids_changed)
+    if accountant is not None:
+        demand.register('accounting', accountant.observe, accountant.ATTRS)
+    if attribution is not None:
+        demand.attach('attribution', attribution.observe, attribution.ATTRS,
+                      when=attribution.under_pressure)
+    if process_rules is not None and process_rules.rules:
+        demand.attach('process_rules', process_rules.observe, process_rules.attrs)
+    if remediation is not None and remediation.policies:
+        demand.attach('remediation', remediation.observe, remediation.ATTRS)
+    if dashboard_hub is not None:
+        demand.subscribe('dashboard', when=lambda: dashboard_hub.client_count > 0)
+    return demand
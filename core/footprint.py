@@ -0,0 +1,134 @@
+"""Accurate per-process memory (USS / PSS / swap) for the top candidates.
+
+``memory_percent`` is RSS, which counts every shared framework page in
+every process that maps it, so Electron apps and browser helpers look far
+bigger than they are. ``memory_full_info()`` gives the memory a process
+actually owns:
+
+    uss   pages only this process maps (what quitting it would free)
+    pss   uss plus its share of shared pages (Linux only)
+    swap  its swapped-out pages (Linux only)
+
+It walks the whole address space, so it costs far more than the scan.
+``FootprintCache`` therefore measures only the ``top_k`` processes by RSS
+(RSS is an upper bound on USS). A process is re-measured at most every
+``refresh`` seconds, and no more than ``budget`` processes are measured
+per scan. Results are cached per ``(pid, create_time)``, so a reused pid is
+never given another process's footprint.
+
+Owned and RSS figures are never compared with each other: measured rows
+are ranked by owned memory, ahead of the rows still ranked by RSS.
+"""
+
+import time
+
+import psutil
+
+from core.config import ACCURATE_MEMORY_TOP_K, ACCURATE_MEMORY_REFRESH
+from core.snapshot import _SlotRecord
+
+
+class MemoryFootprint(_SlotRecord):
+    """Owned memory of one process in bytes (``pss``/``swap`` are ``None`` on macOS)."""
+
+    __slots__ = ('uss', 'pss', 'swap')
+    _fields = __slots__
+
+    def __init__(self, uss, pss=None, swap=None):
+        self.uss = uss
+        self.pss = pss
+        self.swap = swap
+
+    @property
+    def attributable(self):
+        """Resident memory charged to the process: PSS where known, else USS."""
+        return self.pss if self.pss is not None else self.uss
+
+
+def format_footprint(row):
+    """``"Slack 1.24 GB USS"`` for a refined row, ``"Slack 12.3%"`` (RSS) otherwise."""
+    fp = getattr(row, 'footprint', None)
+    if fp is None:
+        return f"{row.name} {row.mem:.1f}%"
+    label = "PSS" if fp.pss is not None else "USS"
+    return f"{row.name} {fp.attributable / 1024 ** 3:.2f} GB {label}"
+
+
+def _by_owned(row):
+    return row.owned_mem
+
+
+class FootprintCache:
+    """Refines the top of a memory ranking with cached ``memory_full_info``.
+
+    Args:
+        top_k:   Candidates (by RSS) that are measured.
+        refresh: Seconds before a cached measurement is taken again.
+        budget:  Most measurements per ``rank()`` call; the rest keep
+            their cached value (or RSS) until a later scan.
+    """
+
+    def __init__(self, top_k=ACCURATE_MEMORY_TOP_K, refresh=ACCURATE_MEMORY_REFRESH, budget=5,
+                 clock=time.monotonic, total=None):
+        self.top_k = top_k
+        self.refresh = refresh
+        self.budget = budget
+        self._clock = clock
+        self._total = total or psutil.virtual_memory().total
+        self._entries = {}         # (pid, create_time) -> [measured_at, footprint or None]
+        self.measured = 0          # memory_full_info calls so far
+
+    def _lookup(self, pid, now, allow_measure):
+        """Footprint for ``pid`` (cached or fresh); ``(footprint, measured)``."""
+        try:
+            proc = psutil.Process(pid)
+            key = (pid, proc.create_time())
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None, False
+        entry = self._entries.get(key)
+        if entry is not None and (now - entry[0] < self.refresh or not allow_measure):
+            return entry[1], False
+        if not allow_measure:
+            return None, False
+        try:
+            full = proc.memory_full_info()
+            footprint = MemoryFootprint(full.uss, getattr(full, 'pss', None), getattr(full, 'swap', None))
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return None, False
+        except psutil.AccessDenied:
+            # Other users' processes on macOS; remember so we stop asking.
+            footprint = None
+        self.measured += 1
+        self._entries[key] = [now, footprint]
+        return footprint, True
+
+    def rank(self, rows):
+        """Re-rank an RSS-sorted list, measuring its ``top_k`` rows.
+
+        Measured rows get ``footprint`` and ``owned_mem`` (percent of RAM)
+        and come first, by owned memory. The rest (not measured yet, denied,
+        or past ``top_k``) follow in their RSS order. ``mem`` stays RSS.
+        """
+        now = self._clock()
+        budget = self.budget
+        measured_rows = []
+        rss_rows = []
+        for row in rows[:self.top_k]:
+            footprint, measured = self._lookup(row.pid, now, budget > 0)
+            budget -= measured
+            if footprint is not None:
+                row.footprint = footprint
+                row.owned_mem = 100.0 * footprint.attributable / self._total
+                measured_rows.append(row)
+            else:
+                rss_rows.append(row)
+        measured_rows.sort(key=_by_owned, reverse=True)
+
+        # Forget processes that have not been a candidate for a while.
+        expiry = now - 4 * self.refresh
+        if len(self._entries) > 4 * self.top_k:
+            self._entries = {k: e for k, e in self._entries.items() if e[0] >= expiry}
+        return measured_rows + rss_rows + rows[self.top_k:]
+
+    def __len__(self):
+        return len(self._entries)
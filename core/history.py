@@ -0,0 +1,498 @@
+"""Long-horizon history: a week of every sample in a few MB.
+
+A week of 1 s samples is about 600k rows. Kept as Python floats, 16 metrics
+take several hundred MB. ``History`` keeps them column-compressed in the
+style of Facebook's Gorilla (Pelkonen et al., 2015):
+
+    timestamps  delta-of-delta on a ``resolution`` grid. A steady cadence
+                costs 1 bit per row and small jitter costs 9 bits.
+    values      XOR with the column's previous value. An unchanged value
+                costs 1 bit. Otherwise only the changed bits are written,
+                reusing the previous leading/trailing-zero window when the
+                new bits fit inside it.
+
+Values are rounded to their metric's decimal places and encoded as scaled
+integers (``12.3`` becomes ``123.0``), so the low mantissa bits are always
+zero and the XOR windows stay short. That keeps ``cpu`` at around a byte
+per sample and slow metrics (swap, the memory breakdown) close to 1 bit.
+``None`` (a metric not collected on this platform or this tick) is stored
+as NaN and costs 1 bit while it stays missing.
+
+Rows go into an open block. Once the block spans ``block_span`` seconds it
+is sealed into an immutable ``Block`` (bytes plus its time range) and a new
+block starts. Blocks older than ``retention`` are dropped whole. A range
+query bisects the blocks by time and decodes only the ones that overlap,
+one row at a time, so its cost is bounded by the requested range plus at
+most one block at each end. Nothing outside the range is decompressed.
+
+``save()`` writes the blocks as a JSON header line followed by the raw
+block bytes, the same layout as the seasonal baseline file.
+"""
+
+import os
+import json
+import math
+import time
+import struct
+import logging
+from bisect import bisect_right
+
+from core.config import (
+    config_dir, HISTORY_METRICS, HISTORY_RETENTION, HISTORY_BLOCK_SPAN, HISTORY_RESOLUTION,
+)
+
+logger = logging.getLogger('macmonitor.history')
+
+_FORMAT_VERSION = 1
+_DOUBLE = struct.Struct('>d')
+_UINT64 = struct.Struct('>Q')
+_NAN_BITS = _UINT64.unpack(_DOUBLE.pack(math.nan))[0]
+# Delta-of-delta classes: (prefix, prefix bits, value bits).
+_DOD_CLASSES = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+_DOD_ESCAPE_BITS = 32
+
+
+def default_history_path():
+    return config_dir() / "history.dat"
+
+
+# ── Bit streams ───────────────────────────────────────────────────────────────
+
+class BitWriter:
+    """Append-only bit stream over a ``bytearray``."""
+
+    __slots__ = ('_buf', '_acc', '_bits')
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value, nbits):
+        """Append the low ``nbits`` of ``value``, most significant first."""
+        acc = (self._acc << nbits) | (value & ((1 << nbits) - 1))
+        bits = self._bits + nbits
+        buf = self._buf
+        while bits >= 8:
+            bits -= 8
+            buf.append((acc >> bits) & 0xFF)
+        self._acc = acc & ((1 << bits) - 1)
+        self._bits = bits
+
+    def getvalue(self):
+        """The stream so far as ``bytes``, zero-padded to a whole byte."""
+        if not self._bits:
+            return bytes(self._buf)
+        return bytes(self._buf) + bytes([(self._acc << (8 - self._bits)) & 0xFF])
+
+    def __len__(self):
+        return len(self._buf) + (1 if self._bits else 0)
+
+
+class BitReader:
+    """Sequential reads from a ``bytes`` bit stream written by ``BitWriter``."""
+
+    __slots__ = ('_data', '_pos')
+
+    def __init__(self, data):
+        self._data = data
+        self._pos = 0
+
+    def read(self, nbits):
+        pos = self._pos
+        start = pos >> 3
+        end = (pos + nbits + 7) >> 3
+        if end > len(self._data):
+            raise EOFError("bit stream exhausted")
+        chunk = int.from_bytes(self._data[start:end], 'big')
+        self._pos = pos + nbits
+        return (chunk >> ((end << 3) - pos - nbits)) & ((1 << nbits) - 1)
+
+    def read_bit(self):
+        pos = self._pos
+        self._pos = pos + 1
+        return (self._data[pos >> 3] >> (7 - (pos & 7))) & 1
+
+
+# ── Column codecs ─────────────────────────────────────────────────────────────
+
+def _signed(value, nbits):
+    return value - (1 << nbits) if value >= 1 << (nbits - 1) else value
+
+
+def _write_dod(out, dod):
+    if dod == 0:
+        out.write(0, 1)
+        return
+    for prefix, prefix_bits, value_bits in _DOD_CLASSES:
+        if -(1 << (value_bits - 1)) <= dod < 1 << (value_bits - 1):
+            out.write(prefix, prefix_bits)
+            out.write(dod, value_bits)
+            return
+    out.write(0b1111, 4)
+    out.write(dod, _DOD_ESCAPE_BITS)
+
+
+def _read_dod(inp):
+    if not inp.read_bit():
+        return 0
+    for _prefix, _prefix_bits, value_bits in _DOD_CLASSES:
+        if not inp.read_bit():
+            return _signed(inp.read(value_bits), value_bits)
+    return _signed(inp.read(_DOD_ESCAPE_BITS), _DOD_ESCAPE_BITS)
+
+
+class _XorState:
+    """One column's previous value bits and its leading/trailing-zero window."""
+
+    __slots__ = ('bits', 'lead', 'trail')
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.lead = -1
+        self.trail = 0
+
+    def write(self, out, bits):
+        x = bits ^ self.bits
+        self.bits = bits
+        if not x:
+            out.write(0, 1)
+            return
+        lead = min(31, 64 - x.bit_length())
+        trail = (x & -x).bit_length() - 1
+        if self.lead >= 0 and lead >= self.lead and trail >= self.trail:
+            out.write(0b10, 2)
+            out.write(x >> self.trail, 64 - self.lead - self.trail)
+            return
+        size = 64 - lead - trail
+        out.write(0b11, 2)
+        out.write(lead, 5)
+        out.write(size - 1, 6)
+        out.write(x >> trail, size)
+        self.lead, self.trail = lead, trail
+
+    def read(self, inp):
+        if inp.read_bit():
+            if inp.read_bit():
+                self.lead = inp.read(5)
+                size = inp.read(6) + 1
+                self.trail = 64 - self.lead - size
+            else:
+                size = 64 - self.lead - self.trail
+            self.bits ^= inp.read(size) << self.trail
+        return self.bits
+
+
+def _quantizer(places):
+    """``(encode, decode)`` between a metric value and its scaled-integer float bits."""
+    if places >= 0:
+        scale = 10 ** places
+
+        def encode(value):
+            return _UINT64.unpack(_DOUBLE.pack(float(round(value * scale))))[0]
+
+        def decode(q):
+            return q / scale
+    else:
+        step = 10 ** -places
+
+        def encode(value):
+            return _UINT64.unpack(_DOUBLE.pack(float(round(value / step))))[0]
+
+        def decode(q):
+            return q * step
+    return encode, decode
+
+
+def _to_bits(value, encode):
+    if value is None:
+        return _NAN_BITS
+    value = float(value)
+    if not math.isfinite(value):
+        return _NAN_BITS
+    return encode(value)
+
+
+# ── Blocks ────────────────────────────────────────────────────────────────────
+
+class Block:
+    """A sealed, immutable run of rows: ``start``/``end`` in grid units, ``count`` rows.
+
+    ``streams`` holds one bit stream per column, timestamps first, so a
+    query for one metric decodes only the timestamps and that column.
+    """
+
+    __slots__ = ('start', 'end', 'count', 'streams')
+
+    def __init__(self, start, end, count, streams):
+        self.start = start
+        self.end = end
+        self.count = count
+        self.streams = tuple(bytes(s) for s in streams)
+
+    def __len__(self):
+        return sum(len(s) for s in self.streams)
+
+
+class _BlockEncoder:
+    """The open block: one bit stream for timestamps and one per column."""
+
+    __slots__ = ('times', 'columns', 'start', 'last', 'delta', 'count', 'state')
+
+    def __init__(self, columns):
+        self.times = BitWriter()
+        self.columns = [BitWriter() for _ in range(columns)]
+        self.start = self.last = None
+        self.delta = 0
+        self.count = 0
+        self.state = None
+
+    def fits(self, t):
+        """Whether a row at grid time ``t`` can follow the last one in this block."""
+        if self.last is None:
+            return True
+        dod = t - self.last - self.delta
+        return -(1 << (_DOD_ESCAPE_BITS - 1)) <= dod < 1 << (_DOD_ESCAPE_BITS - 1)
+
+    def append(self, t, row):
+        if self.count == 0:
+            self.times.write(t, 64)
+            for out, bits in zip(self.columns, row):
+                out.write(bits, 64)
+            self.state = [_XorState(bits) for bits in row]
+            self.start = t
+        else:
+            delta = t - self.last
+            _write_dod(self.times, delta - self.delta)
+            self.delta = delta
+            for out, column, bits in zip(self.columns, self.state, row):
+                column.write(out, bits)
+        self.last = t
+        self.count += 1
+
+    def seal(self):
+        return Block(self.start, self.last, self.count,
+                     [self.times.getvalue()] + [out.getvalue() for out in self.columns])
+
+    def __len__(self):
+        return len(self.times) + sum(len(out) for out in self.columns)
+
+
+def decode_block(block, columns):
+    """Yield ``(t, [bits, ...])`` for each row of ``block``, one row at a time.
+
+    ``columns`` are the column indexes to decode; the others are not read.
+    """
+    times = BitReader(block.streams[0])
+    readers = [BitReader(block.streams[i + 1]) for i in columns]
+    t = times.read(64)
+    state = [_XorState(r.read(64)) for r in readers]
+    yield t, [c.bits for c in state]
+    delta = 0
+    pairs = list(zip(state, readers))
+    for _ in range(block.count - 1):
+        delta += _read_dod(times)
+        t += delta
+        yield t, [c.read(r) for c, r in pairs]
+
+
+# ── History ───────────────────────────────────────────────────────────────────
+
+def _getter(path):
+    parts = path.split('.')
+
+    def get(stats):
+        value = stats
+        for part in parts:
+            value = getattr(value, part, None)
+            if value is None:
+                return None
+        return value
+    return get
+
+
+class History:
+    """Compressed history of ``Stats`` samples with bounded-time range queries.
+
+    Args:
+        metrics:    ``(attribute path, decimal places)`` pairs to keep.
+        retention:  Seconds of history kept.
+        block_span: Seconds per sealed block.
+        resolution: Timestamp grid in seconds.
+    """
+
+    def __init__(self, metrics=HISTORY_METRICS, retention=HISTORY_RETENTION,
+                 block_span=HISTORY_BLOCK_SPAN, resolution=HISTORY_RESOLUTION, path=None):
+        self.metrics = tuple((name, int(places)) for name, places in metrics)
+        self.names = tuple(name for name, _ in self.metrics)
+        self.retention = retention
+        self.block_span = block_span
+        self.resolution = resolution
+        self.path = path
+        self._getters = [_getter(name) for name in self.names]
+        codecs = [_quantizer(places) for _, places in self.metrics]
+        self._encoders = [enc for enc, _ in codecs]
+        self._decoders = [dec for _, dec in codecs]
+        self.blocks = []           # sealed, oldest first
+        self._starts = []          # block start times, for bisection
+        self._open = _BlockEncoder(len(self.names))
+
+    # ── Writing ───────────────────────────────────────────────────────────
+
+    def record(self, stats, ts=None):
+        """Append one sample. Returns False if ``ts`` is not after the last sample."""
+        ts = time.time() if ts is None else ts
+        return self.append(ts, [get(stats) for get in self._getters])
+
+    def append(self, ts, values):
+        """Append one row of raw values (in ``metrics`` order; ``None`` = missing)."""
+        t = round(ts / self.resolution)
+        last = self._last_time()
+        if last is not None and t <= last:
+            return False           # clock stepped back, or a second sample on this grid slot
+        current = self._open
+        if current.count and (t - current.start >= self.block_span / self.resolution
+                              or not current.fits(t)):
+            self.seal()
+            current = self._open
+        current.append(t, [_to_bits(v, enc) for v, enc in zip(values, self._encoders)])
+        self._expire(t)
+        return True
+
+    def seal(self):
+        """Seal the open block (if it has rows) and start a new one."""
+        if self._open.count:
+            block = self._open.seal()
+            self.blocks.append(block)
+            self._starts.append(block.start)
+            self._open = _BlockEncoder(len(self.names))
+
+    def _expire(self, now):
+        horizon = now - self.retention / self.resolution
+        drop = 0
+        for block in self.blocks:
+            if block.end >= horizon:
+                break
+            drop += 1
+        if drop:
+            del self.blocks[:drop]
+            del self._starts[:drop]
+
+    def _last_time(self):
+        if self._open.count:
+            return self._open.last
+        return self.blocks[-1].end if self.blocks else None
+
+    # ── Reading ───────────────────────────────────────────────────────────
+
+    def _all_blocks(self):
+        if self._open.count:
+            return self.blocks + [self._open.seal()]
+        return self.blocks
+
+    def query(self, start=None, end=None, metrics=None):
+        """Yield ``(ts, values)`` for samples with ``start <= ts <= end``.
+
+        ``values`` follows ``metrics`` (default: every metric), with
+        ``None`` where a metric was missing. Only blocks overlapping the
+        range are decoded.
+        """
+        lo = -math.inf if start is None else start / self.resolution
+        hi = math.inf if end is None else end / self.resolution
+        columns = range(len(self.names)) if metrics is None else [self.names.index(m) for m in metrics]
+        decoders = [self._decoders[i] for i in columns]
+        blocks = self._all_blocks()
+        # The last block starting at or before ``lo`` is the first that can overlap.
+        first = max(0, bisect_right(self._starts, lo) - 1)
+        for block in blocks[first:]:
+            if block.start > hi:
+                break
+            if block.end < lo:
+                continue
+            for t, row in decode_block(block, columns):
+                if t < lo:
+                    continue
+                if t > hi:
+                    break
+                yield t * self.resolution, [
+                    None if bits == _NAN_BITS else decode(_DOUBLE.unpack(_UINT64.pack(bits))[0])
+                    for decode, bits in zip(decoders, row)]
+
+    def series(self, metric, start=None, end=None):
+        """``[(ts, value)]`` for one metric over a range."""
+        return [(ts, values[0]) for ts, values in self.query(start, end, (metric,))]
+
+    def span(self):
+        """``(first_ts, last_ts)`` held, or ``None`` when empty."""
+        blocks = self._all_blocks()
+        if not blocks:
+            return None
+        return blocks[0].start * self.resolution, blocks[-1].end * self.resolution
+
+    @property
+    def nbytes(self):
+        """Compressed size of every block, open one included."""
+        return sum(len(b) for b in self.blocks) + len(self._open)
+
+    def __len__(self):
+        return sum(b.count for b in self.blocks) + self._open.count
+
+    # ── Persistence ───────────────────────────────────────────────────────
+
+    def save(self, path=None):
+        """Write every block (the open one sealed into the file) atomically. False on failure."""
+        path = path or self.path
+        if path is None:
+            return False
+        blocks = self._all_blocks()
+        header = json.dumps({
+            'version': _FORMAT_VERSION, 'resolution': self.resolution,
+            'metrics': [list(m) for m in self.metrics],
+            'blocks': [[b.start, b.end, b.count, [len(s) for s in b.streams]] for b in blocks],
+        })
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(header.encode() + b"\n")
+                for block in blocks:
+                    for stream in block.streams:
+                        f.write(stream)
+            os.replace(tmp, path)
+            return True
+        except OSError as e:
+            logger.error(f"Could not save history to {path}: {e}")
+            return False
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Load saved history, or start empty if it is missing, unreadable or
+        was written with different metrics or resolution.
+
+        Loaded blocks are all sealed; new samples start a fresh block.
+        """
+        history = cls(path=path, **kwargs)
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                if (header.get('version') != _FORMAT_VERSION
+                        or header.get('resolution') != history.resolution
+                        or [tuple(m) for m in header.get('metrics', ())] != list(history.metrics)):
+                    raise ValueError("incompatible history format")
+                columns = len(history.names) + 1
+                for start, end, count, sizes in header['blocks']:
+                    if len(sizes) != columns:
+                        raise ValueError("block column count mismatch")
+                    streams = [f.read(size) for size in sizes]
+                    if any(len(data) != size for data, size in zip(streams, sizes)):
+                        raise EOFError("truncated history file")
+                    history.blocks.append(Block(start, end, count, streams))
+                    history._starts.append(start)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError, EOFError) as e:
+            logger.warning(f"Ignoring unreadable history {path}: {e}")
+            history.blocks.clear()
+            history._starts.clear()
+        if history.blocks:
+            history._expire(history.blocks[-1].end)
+        return history
@@ -0,0 +1,160 @@
+"""Scheduler-latency probe: measured responsiveness instead of inferred.
+
+A daemon thread sleeps for ``1 / hz`` seconds at a time and records how late
+it woke up. On an idle machine the overshoot is tens of microseconds. When
+the CPU run queue is long, or the thread has to fault its pages back in
+from swap or the compressor, wakeups are late. That lateness is the lag
+the user feels. The probe works the same on Linux and macOS, because it
+only needs ``time.sleep`` and a monotonic clock.
+
+The probe is a Python thread, so it also sees GIL hand-off delays from
+this process's own threads. At a 5 s tick those are sub-millisecond and
+far below the lag limit. On macOS, App Nap would coalesce the probe's
+timers; the menu bar app opts out of it while the probe runs.
+
+Overshoots go into a log-spaced histogram (``BUCKETS`` buckets, 50 µs to
+about a minute, 25% wide). The window is split into ``slots`` histograms
+that rotate, and running totals are updated on insert and expiry, so
+memory is fixed and a percentile read is one walk over the buckets.
+
+Overhead is one wakeup per ``1 / hz`` seconds (``LATENCY_PROBE_HZ``). The
+probe is opt-in ("latency_probe" in config.json). Front-ends start it with
+``core.start_latency_probe()`` and stop it on exit; ``get_stats()`` only
+reads it.
+"""
+
+import math
+import time
+import threading
+from array import array
+
+from core.config import LATENCY_PROBE_HZ, LATENCY_WINDOW
+from core.snapshot import SchedLatency
+
+BUCKETS = 64
+_MIN_S = 50e-6
+_GROWTH = 1.25
+_LOG_GROWTH = math.log(_GROWTH)
+# Wakeups later than this are clock jumps (sleep/resume), not lag.
+_MAX_OVERSHOOT = 30.0
+
+
+def bucket_of(seconds):
+    """Histogram bucket for an overshoot in seconds."""
+    if seconds <= _MIN_S:
+        return 0
+    return min(BUCKETS - 1, int(math.log(seconds / _MIN_S) / _LOG_GROWTH) + 1)
+
+
+def bucket_upper(index):
+    """Upper edge of a bucket, in seconds."""
+    return _MIN_S * _GROWTH ** index
+
+
+class LatencyHistogram:
+    """Sliding-window histogram of overshoots: ``slots`` rotating sub-histograms."""
+
+    def __init__(self, window=LATENCY_WINDOW, slots=6):
+        self.slot_s = window / slots
+        self._slots = [array('L', [0]) * BUCKETS for _ in range(slots)]
+        self._slot_ids = [None] * slots
+        self._slot_max = [0.0] * slots
+        self._totals = array('L', [0]) * BUCKETS
+        self._count = 0
+
+    def _expire(self, slot_id):
+        """Drop slots that fell out of the window ending at ``slot_id``."""
+        n = len(self._slots)
+        for i, sid in enumerate(self._slot_ids):
+            if sid is not None and slot_id - sid >= n:
+                counts = self._slots[i]
+                totals = self._totals
+                for b in range(BUCKETS):
+                    if counts[b]:
+                        totals[b] -= counts[b]
+                        self._count -= counts[b]
+                        counts[b] = 0
+                self._slot_ids[i] = None
+                self._slot_max[i] = 0.0
+
+    def add(self, overshoot, now):
+        slot_id = int(now // self.slot_s)
+        i = slot_id % len(self._slots)
+        if self._slot_ids[i] != slot_id:
+            self._expire(slot_id)
+            self._slot_ids[i] = slot_id
+        b = bucket_of(overshoot)
+        self._slots[i][b] += 1
+        self._totals[b] += 1
+        self._count += 1
+        if overshoot > self._slot_max[i]:
+            self._slot_max[i] = overshoot
+
+    def summary(self, now):
+        """``SchedLatency`` (milliseconds) over the window, or ``None`` if empty."""
+        self._expire(int(now // self.slot_s))
+        count = self._count
+        if not count:
+            return None
+        worst = max(self._slot_max)
+        targets = [0.50 * count, 0.95 * count, 0.99 * count]
+        found = []
+        seen = 0
+        for b in range(BUCKETS):
+            seen += self._totals[b]
+            while targets and seen >= targets[0]:
+                targets.pop(0)
+                found.append(min(bucket_upper(b), worst))
+            if not targets:
+                break
+        p50, p95, p99 = (v * 1000.0 for v in found)
+        return SchedLatency(p50, p95, p99, worst * 1000.0, count)
+
+
+class LatencyProbe:
+    """Background thread timing the overshoot of periodic sleeps.
+
+    Args:
+        hz:     Wakeups per second.
+        window: Seconds of history behind the percentiles.
+    """
+
+    def __init__(self, hz=LATENCY_PROBE_HZ, window=LATENCY_WINDOW, clock=time.monotonic):
+        self.period = 1.0 / hz
+        self._clock = clock
+        self._histogram = LatencyHistogram(window)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='latency-probe', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        clock = self._clock
+        period = self.period
+        while not self._stop.is_set():
+            start = clock()
+            time.sleep(period)
+            now = clock()
+            overshoot = now - start - period
+            if overshoot < _MAX_OVERSHOOT:
+                self.record(max(0.0, overshoot), now)
+
+    def record(self, overshoot, now):
+        with self._lock:
+            self._histogram.add(overshoot, now)
+
+    def summary(self):
+        """Current ``SchedLatency``, or ``None`` until the first wakeup."""
+        with self._lock:
+            return self._histogram.summary(self._clock())
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
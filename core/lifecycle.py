@@ -0,0 +1,203 @@
+"""Process lifecycle events: starts, exits, spawn storms and crash loops.
+
+Each scan is diffed against the previous one to emit ``start`` and ``exit``
+events, with the process name, parent and lifetime. Processes are keyed by
+``(pid, create_time)``, so a reused pid shows up as an exit plus a start.
+
+The per-process cost of a scan is one dict lookup. The exit sweep only
+walks the live table when the scan found fewer known processes than it
+holds. Events and the sliding-window counters are only touched on churn.
+A process that starts and exits between two scans is never seen.
+
+Within the window (``SPAWN_WINDOW`` seconds) the tracker counts starts per
+name and per parent, and short-lived exits per name. It raises alerts for
+spawn storms (a build tool fork-bombing the machine) and crash loops (a
+helper that keeps dying and being relaunched).
+
+An exit is only noticed at the scan after the process's last sighting, so
+``now - create_time`` overstates its lifetime by up to one scan interval.
+Crash loops are judged on the lifetime the scans actually saw, which is
+``last_seen - create_time``. That only works at the per-tick scan cadence.
+``core.demand`` keeps the scan there whenever ``pids_changed()`` (a
+``psutil.pids()`` diff, far cheaper than the scan) reports churn. A helper
+that lives less than one interval is never seen at all.
+"""
+
+import time
+from collections import deque
+
+import psutil
+
+from core import can_notify
+from core.config import (
+    SPAWN_WINDOW, SPAWN_STORM_PER_NAME, SPAWN_STORM_PER_PARENT,
+    CRASH_LOOP_EXITS, CRASH_LOOP_LIFETIME,
+)
+from core.snapshot import _SlotRecord
+
+
+class ProcessEvent(_SlotRecord):
+    """One ``start`` or ``exit`` (``lifetime`` in seconds, up to the exit scan; ``None`` for starts)."""
+
+    __slots__ = ('kind', 'time', 'pid', 'name', 'ppid', 'lifetime')
+    _fields = __slots__
+
+    def __init__(self, kind, time, pid, name, ppid=None, lifetime=None):
+        self.kind = kind
+        self.time = time
+        self.pid = pid
+        self.name = name
+        self.ppid = ppid
+        self.lifetime = lifetime
+
+
+class _WindowCounter:
+    """Counts per key over a sliding time window, updated per event."""
+
+    def __init__(self, window):
+        self.window = window
+        self._events = deque()     # (time, key)
+        self.counts = {}
+
+    def add(self, now, key):
+        self._events.append((now, key))
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def expire(self, now):
+        events = self._events
+        counts = self.counts
+        cutoff = now - self.window
+        while events and events[0][0] <= cutoff:
+            _, key = events.popleft()
+            left = counts[key] - 1
+            if left:
+                counts[key] = left
+            else:
+                del counts[key]
+
+    def __len__(self):
+        return len(self._events)
+
+
+class ProcessLifecycle:
+    """Scan-to-scan process diff with spawn-rate and crash-loop tracking.
+
+    Feed it with ``observe(infos)`` (psutil ``proc.info`` dicts that include
+    ``ppid`` and ``create_time``), e.g. via ``core.add_scan_observer``.
+
+    Args:
+        history: Number of recent events kept in ``events``.
+        clock:   Wall-clock source (events carry epoch times).
+        pids:    Lists the running pids (for ``pids_changed()``).
+    """
+
+    ATTRS = ('ppid', 'create_time')
+
+    def __init__(self, history=500, window=SPAWN_WINDOW, clock=time.time, pids=psutil.pids):
+        self._clock = clock
+        self._pids = pids
+        self.events = deque(maxlen=history)
+        self._live = {}            # (pid, create_time) -> [name, ppid, generation, last_seen]
+        self._names = {}           # pid -> name, for naming parents
+        self._generation = 0
+        self._primed = False
+        self.starts_by_name = _WindowCounter(window)
+        self.starts_by_parent = _WindowCounter(window)
+        self.crashes_by_name = _WindowCounter(window)
+        self.exits = _WindowCounter(window)
+
+    def observe(self, infos, now=None):
+        """Diff this scan against the previous one; returns this scan's events."""
+        now = self._clock() if now is None else now
+        self._generation = generation = self._generation + 1
+        live = self._live
+        new = []
+        matched = 0
+        for info in infos:
+            key = (info['pid'], info.get('create_time'))
+            entry = live.get(key)
+            if entry is not None:
+                entry[2] = generation
+                entry[3] = now
+                matched += 1
+            else:
+                new.append(info)
+
+        events = []
+        if matched < len(live):
+            for key in [k for k, entry in live.items() if entry[2] != generation]:
+                name, ppid, _, last_seen = live.pop(key)
+                pid, created = key
+                if self._names.get(pid) == name:
+                    del self._names[pid]
+                lifetime = now - created if created else None
+                events.append(ProcessEvent('exit', now, pid, name, ppid, lifetime))
+                self.exits.add(now, name)
+                # Seen alive for this long; the exit happened before the next scan.
+                if created and last_seen - created < CRASH_LOOP_LIFETIME:
+                    self.crashes_by_name.add(now, name)
+
+        for info in new:
+            pid = info['pid']
+            name = info['name'] or f"PID {pid}"
+            ppid = info.get('ppid')
+            live[(pid, info.get('create_time'))] = [name, ppid, generation, now]
+            self._names[pid] = name
+            if self._primed:
+                events.append(ProcessEvent('start', now, pid, name, ppid))
+                self.starts_by_name.add(now, name)
+                self.starts_by_parent.add(now, ppid)
+
+        # The first scan only establishes what is already running.
+        self._primed = True
+        for counter in (self.starts_by_name, self.starts_by_parent,
+                        self.crashes_by_name, self.exits):
+            counter.expire(now)
+        self.events.extend(events)
+        return events
+
+    def pids_changed(self):
+        """Whether the running pids differ from the last scan's (True before the first)."""
+        if not self._primed:
+            return True
+        pids = self._pids()
+        live = self._live
+        return len(pids) != len(live) or set(pids) != {pid for pid, _ in live}
+
+    def churn(self):
+        """``(starts, exits)`` within the window."""
+        return len(self.starts_by_parent), len(self.exits)
+
+    def parent_name(self, ppid):
+        return self._names.get(ppid, f"PID {ppid}")
+
+    def storms(self):
+        """``[(kind, who, count)]`` over the storm and crash-loop limits."""
+        found = []
+        for name, count in self.starts_by_name.counts.items():
+            if count >= SPAWN_STORM_PER_NAME:
+                found.append(('spawn', name, count))
+        for ppid, count in self.starts_by_parent.counts.items():
+            if count >= SPAWN_STORM_PER_PARENT:
+                found.append(('parent', ppid, count))
+        for name, count in self.crashes_by_name.counts.items():
+            if count >= CRASH_LOOP_EXITS:
+                found.append(('crash', name, count))
+        return found
+
+    def alerts(self):
+        """``(title, message)`` pairs for current storms (with cooldown)."""
+        window = f"{self.starts_by_name.window:.0f}s"
+        alerts = []
+        for kind, who, count in self.storms():
+            if not can_notify(f"{kind}_storm:{who}"):
+                continue
+            if kind == 'spawn':
+                alerts.append(("Process Storm", f"{who} started {count} times in {window}"))
+            elif kind == 'parent':
+                alerts.append(("Process Storm",
+                               f"{self.parent_name(who)} (PID {who}) spawned {count} processes in {window}"))
+            else:
+                alerts.append(("Crash Loop", f"{who} exited {count} times within "
+                                             f"{CRASH_LOOP_LIFETIME:.0f}s of starting in {window}"))
+        return alerts
@@ -5,13 +5,15 @@ import os
 from pathlib import Path
 
 
-def setup_logging(log_level=logging.INFO, log_to_file=True):
+def setup_logging(log_level=logging.INFO, log_to_file=True, log_to_console=True):
     """
     Setup logging configuration for MacMonitor.
     
     Args:
         log_level: Logging level (default: INFO)
         log_to_file: Whether to log to file (default: True)
+        log_to_console: Whether to log to stderr (default: True; off for the
+            terminal UI, which owns the screen)
     """
     # Create logs directory if it doesn't exist
     log_dir = Path.home() / "Library" / "Logs" / "MacMonitor"
@@ -22,8 +24,14 @@ def setup_logging(log_level=logging.INFO, log_to_file=True):
         log_file = None
     
     # Configure logging
-    handlers = [logging.StreamHandler()]  # Always log to console
-    
+    handlers = []
+    if log_to_console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(
+            logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+        )
+        handlers.append(console_handler)
+
     if log_file:
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(
@@ -34,12 +42,9 @@ def setup_logging(log_level=logging.INFO, log_to_file=True):
         )
         handlers.append(file_handler)
     
-    console_formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s',
-        datefmt='%H:%M:%S'
-    )
-    handlers[0].setFormatter(console_formatter)
-    
+    if not handlers:
+        handlers.append(logging.NullHandler())
+
     logging.basicConfig(
         level=log_level,
         handlers=handlers,
@@ -0,0 +1,99 @@
+"""Paging and swap activity rates, and a thrash score.
+
+Free memory and the size of the compressor say little about whether the
+machine is *struggling*; what hurts is pages moving out and straight back
+in. Backends report the cumulative paging counters (``vm_stat`` on macOS,
+``/proc/vmstat`` on Linux) in bytes, and ``PagingMonitor`` turns them into
+per-second rates with the same wrap-aware deltas as the throughput
+collectors.
+
+The thrash score (0-100) weighs two-way traffic: swap-ins alongside
+swap-outs, decompressions alongside compressions, file page-ins alongside
+page-outs. One-way swap-ins count too, since every one is a stalled fault.
+A one-off burst (e.g. swapping out an idle app) scores low. An exponential
+moving average keeps a single noisy tick from flipping ``lag_risk``.
+"""
+
+from collections import namedtuple
+import time
+
+from core.snapshot import PagingRates
+from core.throughput import CounterRates
+
+PAGING_FIELDS = ('pageins', 'pageouts', 'swapins', 'swapouts', 'compressions', 'decompressions')
+
+# Cumulative paging counters in bytes, as returned by ``Backend.paging_counters()``.
+VmCounters = namedtuple('VmCounters', PAGING_FIELDS)
+
+# Rates (bytes/s) at which each kind of traffic alone is treated as thrashing.
+_MB = 1024 ** 2
+THRASH_SWAP_BPS = 4 * _MB           # swap-ins paired with swap-outs
+THRASH_SWAPIN_BPS = 16 * _MB        # swap-ins on their own
+THRASH_COMPRESSOR_BPS = 64 * _MB    # decompressions paired with compressions
+THRASH_FILE_BPS = 16 * _MB          # file page-ins paired with page-outs
+
+# vm_stat line labels for each counter.
+VM_STAT_KEYS = {
+    'pageins': 'Pageins',
+    'pageouts': 'Pageouts',
+    'swapins': 'Swapins',
+    'swapouts': 'Swapouts',
+    'compressions': 'Compressions',
+    'decompressions': 'Decompressions',
+}
+
+
+def parse_vm_stat(text):
+    """Parse ``vm_stat`` output into ``{label: pages}``."""
+    values = {}
+    for line in text.splitlines():
+        key, sep, val = line.rpartition(':')
+        if not sep or 'Mach Virtual Memory Statistics' in key:
+            continue
+        try:
+            values[key.strip().strip('"')] = int(val.strip().rstrip('.'))
+        except ValueError:
+            continue
+    return values
+
+
+def vm_stat_counters(values, page_size):
+    """``VmCounters`` (bytes) from parsed ``vm_stat`` values, or ``None`` if absent."""
+    if VM_STAT_KEYS['pageins'] not in values:
+        return None
+    return VmCounters(*(values.get(VM_STAT_KEYS[f], 0) * page_size for f in PAGING_FIELDS))
+
+
+def thrash_score(pageins, pageouts, swapins, swapouts, compressions, decompressions):
+    """Instantaneous thrash score (0-100) from paging rates in bytes/s."""
+    load = (min(swapins, swapouts) / THRASH_SWAP_BPS
+            + swapins / THRASH_SWAPIN_BPS
+            + min(compressions, decompressions) / THRASH_COMPRESSOR_BPS
+            + min(pageins, pageouts) / THRASH_FILE_BPS)
+    return min(100.0, 100.0 * load)
+
+
+class PagingMonitor:
+    """Cumulative paging counters -> ``PagingRates`` with a smoothed thrash score.
+
+    Args:
+        smoothing: EWMA weight of the newest tick's score (1.0 = no smoothing).
+    """
+
+    def __init__(self, smoothing=0.5, clock=time.monotonic):
+        self.smoothing = smoothing
+        self._rates = CounterRates(PAGING_FIELDS, clock)
+        self._thrash = None
+
+    def update(self, counters):
+        """Feed ``VmCounters``; returns ``PagingRates``, or ``None`` on the first reading."""
+        if counters is None:
+            return None
+        rates = self._rates.update({'vm': counters}).get('vm')
+        if rates is None:
+            return None
+        score = thrash_score(*rates)
+        if self._thrash is not None:
+            score = self.smoothing * score + (1 - self.smoothing) * self._thrash
+        self._thrash = score
+        return PagingRates(*rates, thrash=score)
@@ -0,0 +1,167 @@
+"""Flight recorder: the last few minutes of samples, dumped when an alert fires.
+
+Every tick, ``record()`` stores references to that tick's stats and top-process
+rows in a preallocated ring; no copying or formatting happens on the hot path.
+On ``trigger()``, the ring is snapshotted (a list slice of references) and
+handed to a background worker. The worker adds one expensive capture (full
+process list, memory breakdown) and writes a timestamped gzip JSON file, so
+the sampler never waits for disk or for the capture. At most one dump waits
+behind the one being written; further triggers are skipped until it starts.
+"""
+
+import gzip
+import json
+import queue
+import re
+import logging
+import threading
+import time
+from pathlib import Path
+
+import psutil
+
+logger = logging.getLogger('macmonitor.recorder')
+
+# Fields for the one-off full process capture.
+_CAPTURE_ATTRS = ['pid', 'ppid', 'name', 'username', 'status', 'create_time',
+                  'cpu_percent', 'memory_percent', 'memory_info', 'num_threads']
+
+
+def default_flight_dir() -> Path:
+    return Path.home() / "Library" / "Logs" / "MacMonitor" / "flight"
+
+
+def capture_system():
+    """Expensive one-off capture: every process plus a full memory breakdown."""
+    from core.backends import get_backend
+
+    processes = []
+    for proc in psutil.process_iter(_CAPTURE_ATTRS):
+        info = dict(proc.info)
+        mem = info.pop('memory_info', None)
+        info['rss'] = mem.rss if mem else None
+        info['vms'] = mem.vms if mem else None
+        processes.append(info)
+
+    capture = {
+        'processes': processes,
+        'virtual_memory': psutil.virtual_memory()._asdict(),
+        'swap_memory': psutil.swap_memory()._asdict(),
+        'memory_breakdown': None,
+    }
+    # The backend raises when its tools fail; keep the rest of the capture.
+    try:
+        breakdown = get_backend().memory_breakdown()
+        capture['memory_breakdown'] = breakdown.as_dict() if breakdown else None
+    except Exception as e:
+        capture['memory_breakdown_error'] = str(e)
+    return capture
+
+
+def _rows(procs):
+    return [[p.pid, p.raw_name, p.cpu, p.mem] for p in procs]
+
+
+class FlightRecorder:
+    """Ring of recent samples with asynchronous dumps.
+
+    Args:
+        capacity:  Number of ticks kept (e.g. 60 ticks at 5 s = 5 minutes).
+        directory: Where dump files are written.
+        keep:      Maximum number of dump files kept on disk.
+        capture:   Callable for the one-off expensive capture (injectable).
+    """
+
+    def __init__(self, capacity=60, directory=None, keep=20, capture=capture_system):
+        self.capacity = capacity
+        self.directory = Path(directory) if directory else default_flight_dir()
+        self.keep = keep
+        self._capture = capture
+        self._ring = [None] * capacity
+        self._next = 0
+        self._count = 0
+        self._jobs = queue.Queue(maxsize=1)
+        self._worker = None
+
+    def record(self, stats, cpu_procs=(), mem_procs=(), ts=None):
+        """Store one tick (references only)."""
+        self._ring[self._next] = (ts if ts is not None else time.time(), stats, cpu_procs, mem_procs)
+        self._next = (self._next + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def samples(self):
+        """Recorded ticks, oldest first."""
+        if self._count < self.capacity:
+            return self._ring[:self._count]
+        return self._ring[self._next:] + self._ring[:self._next]
+
+    def trigger(self, reason):
+        """Queue a dump for ``reason``. Returns immediately; False if one is already pending."""
+        job = (time.time(), reason, self.samples())
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            logger.warning(f"Flight recorder busy, skipping dump for: {reason}")
+            return False
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='flight-recorder', daemon=True)
+            self._worker.start()
+        return True
+
+    def wait(self, timeout=None):
+        """Block until queued dumps are written (for tests and shutdown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._jobs.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                self._dump(*job)
+            except Exception as e:
+                logger.error(f"Flight recorder dump failed: {e}", exc_info=True)
+            finally:
+                self._jobs.task_done()
+
+    def _dump(self, ts, reason, samples):
+        try:
+            capture = self._capture()
+        except Exception as e:
+            capture = {'error': str(e)}
+
+        payload = {
+            'reason': reason,
+            'time': ts,
+            'samples': [
+                {'time': t, 'stats': stats.as_dict(), 'top_cpu': _rows(cpu), 'top_mem': _rows(mem)}
+                for t, stats, cpu, mem in samples
+            ],
+            'capture': capture,
+        }
+
+        slug = re.sub(r'[^a-z0-9]+', '-', reason.lower()).strip('-') or 'alert'
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(ts))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Alerts often fire together; never overwrite a dump from the same second.
+        name, n = f"flight-{stamp}-{slug}", 1
+        while True:
+            path = self.directory / f"{name}.json.gz"
+            try:
+                f = gzip.open(path, 'xt', encoding='utf-8')
+                break
+            except FileExistsError:
+                n += 1
+                name = f"flight-{stamp}-{slug}-{n}"
+        with f:
+            json.dump(payload, f, default=str)
+        logger.info(f"Flight recorder dump written: {path}")
+
+        dumps = sorted(self.directory.glob("flight-*.json.gz"))
+        for old in dumps[:-self.keep]:
+            old.unlink(missing_ok=True)
+        return path
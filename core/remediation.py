@@ -0,0 +1,243 @@
+"""Automatic remediation policies (renice, suspend or terminate offenders).
+
+A policy watches one system metric and fires once the metric has stayed at or
+above its threshold for ``sustain`` seconds:
+
+    renice     lower the priority of the top CPU consumer (optionally only
+               among ``targets``)
+    suspend    SIGSTOP processes named in ``targets`` (batch jobs); they are
+               sent SIGCONT again once the condition clears
+    terminate  SIGTERM processes named in ``targets`` (an explicit allow-list)
+
+Every decision, including dry-run and rate-limited ones, is written to an
+audit log. Nothing is ever sent to this process or to pid 0/1.
+
+The engine sees every process in the scan through ``observe()``, not just
+the menu's top rows, so a target outside the top five is still acted on.
+It keeps one row per pid for the processes named in any policy's targets,
+plus the top CPU consumer for untargeted renice.
+"""
+
+import os
+import json
+import time
+import logging
+from collections import deque
+from pathlib import Path
+
+import psutil
+
+from core.snapshot import ProcessRow
+
+logger = logging.getLogger('macmonitor.remediation')
+
+ACTIONS = ('renice', 'suspend', 'terminate')
+METRICS = ('pressure', 'cpu', 'mem', 'swap')
+
+
+def default_audit_path() -> Path:
+    return Path.home() / "Library" / "Logs" / "MacMonitor" / "remediation.log"
+
+
+class RemediationPolicy:
+    """One trigger -> action rule."""
+
+    def __init__(self, name, action, metric='pressure', threshold=1, sustain=30,
+                 targets=(), nice=10, min_interval=300):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown remediation action: {action}")
+        if metric not in METRICS:
+            raise ValueError(f"Unknown remediation metric: {metric}")
+        if action in ('suspend', 'terminate') and not targets:
+            raise ValueError(f"'{action}' policies need an explicit list of target names")
+        self.name = name
+        self.action = action
+        self.metric = metric
+        self.threshold = threshold
+        self.sustain = sustain
+        self.targets = frozenset(targets)
+        self.nice = nice
+        self.min_interval = min_interval
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def metric_value(self, stats):
+        if self.metric == 'pressure':
+            return stats['pressure_val']
+        return stats[self.metric]
+
+
+class RemediationEngine:
+    """Evaluate policies against each tick's stats and process rows.
+
+    Args:
+        policies:   Iterable of ``RemediationPolicy``.
+        dry_run:    Log what would be done without sending anything.
+        audit_path: JSON-lines audit file (``None`` disables the file).
+        clock:      Monotonic time source, injectable for tests.
+    """
+
+    ATTRS = ()     # pid, name, cpu_percent and memory_percent are always scanned
+
+    def __init__(self, policies=(), dry_run=True, audit_path=None, clock=time.monotonic):
+        self.policies = list(policies)
+        self._targets = frozenset().union(*(p.targets for p in self.policies))
+        self._untargeted = any(not p.targets for p in self.policies)
+        self._cooldown = max((p.min_interval for p in self.policies), default=0)
+        self._scanned = []        # candidate rows from the last observe()
+        self.dry_run = dry_run
+        self.audit_path = Path(audit_path) if audit_path else None
+        self.audit = deque(maxlen=200)
+        self._clock = clock
+        self._since = {}          # policy name -> time the condition became true
+        self._last_action = {}    # (pid, action) -> time of last action
+        self._suspended = {}      # policy name -> {pid: name}
+
+    def observe(self, infos, now=None):
+        """Keep this scan's candidate rows (scan observer; one row per pid)."""
+        own_pid = os.getpid()
+        targets = self._targets
+        rows = {}
+        top = None
+        for info in infos:
+            pid = info['pid']
+            if pid <= 1 or pid == own_pid:
+                continue
+            name = info['name']
+            cpu = info['cpu_percent'] or 0.0
+            if name in targets:
+                rows[pid] = ProcessRow(pid, name, cpu, info['memory_percent'] or 0.0)
+            if self._untargeted and (top is None or cpu > (top['cpu_percent'] or 0.0)):
+                top = info
+        if top is not None and top['pid'] not in rows:
+            rows[top['pid']] = ProcessRow(top['pid'], top['name'], top['cpu_percent'] or 0.0,
+                                          top['memory_percent'] or 0.0)
+        self._scanned = list(rows.values())
+
+    def evaluate(self, stats, processes=None):
+        """Run all policies once. Returns the audit entries written this call.
+
+        ``processes`` defaults to the rows from the last ``observe()``; rows
+        repeated for one pid are only considered once.
+        """
+        now = self._clock()
+        if processes is None:
+            processes = self._scanned
+        else:
+            processes = list({p.pid: p for p in processes}.values())
+        self._prune(now)
+        entries = []
+        for policy in self.policies:
+            try:
+                active = policy.metric_value(stats) >= policy.threshold
+            except (KeyError, TypeError):
+                continue
+
+            if not active:
+                self._since.pop(policy.name, None)
+                entries.extend(self._resume(policy, now))
+                continue
+
+            since = self._since.setdefault(policy.name, now)
+            if now - since < policy.sustain:
+                continue
+
+            for proc in self._select(policy, processes):
+                entry = self._apply(policy, proc, now)
+                if entry:
+                    entries.append(entry)
+        return entries
+
+    def _prune(self, now):
+        """Forget (pid, action) cooldowns that have expired for every policy."""
+        last_action = self._last_action
+        if last_action:
+            cutoff = now - self._cooldown
+            for key in [k for k, t in last_action.items() if t <= cutoff]:
+                del last_action[key]
+
+    def resume_all(self):
+        """Send SIGCONT to everything still suspended (e.g. on quit)."""
+        entries = []
+        for policy in self.policies:
+            entries.extend(self._resume(policy, self._clock()))
+        return entries
+
+    def _select(self, policy, processes):
+        own_pid = os.getpid()
+        candidates = [
+            p for p in processes
+            if p.pid > 1 and p.pid != own_pid
+            and (not policy.targets or p.proc_name in policy.targets)
+        ]
+        if policy.action == 'renice':
+            top = max(candidates, key=lambda p: p.cpu, default=None)
+            return [top] if top else []
+        if policy.action == 'suspend':
+            held = self._suspended.get(policy.name, {})
+            return [p for p in candidates if p.pid not in held]
+        return candidates
+
+    def _apply(self, policy, proc, now):
+        key = (proc.pid, policy.action)
+        last = self._last_action.get(key)
+        if last is not None and now - last < policy.min_interval:
+            return None
+        self._last_action[key] = now
+
+        if self.dry_run:
+            return self._record(policy, policy.action, proc.pid, proc.proc_name, "dry-run")
+
+        try:
+            target = psutil.Process(proc.pid)
+            # Guard against pid reuse since the scan.
+            if target.name() != proc.proc_name:
+                return self._record(policy, policy.action, proc.pid, proc.proc_name, "skipped: pid reused")
+            if policy.action == 'renice':
+                target.nice(max(target.nice(), policy.nice))
+            elif policy.action == 'suspend':
+                target.suspend()
+                self._suspended.setdefault(policy.name, {})[proc.pid] = proc.proc_name
+            else:
+                target.terminate()
+            result = "ok"
+        except (psutil.NoSuchProcess, psutil.AccessDenied, OSError) as e:
+            result = f"failed: {e}"
+        return self._record(policy, policy.action, proc.pid, proc.proc_name, result)
+
+    def _resume(self, policy, now):
+        held = self._suspended.pop(policy.name, None)
+        if not held:
+            return []
+        entries = []
+        for pid, name in held.items():
+            try:
+                psutil.Process(pid).resume()
+                result = "ok"
+            except (psutil.NoSuchProcess, psutil.AccessDenied, OSError) as e:
+                result = f"failed: {e}"
+            entries.append(self._record(policy, 'resume', pid, name, result))
+        return entries
+
+    def _record(self, policy, action, pid, name, result):
+        entry = {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'policy': policy.name,
+            'action': action,
+            'pid': pid,
+            'name': name,
+            'dry_run': self.dry_run,
+            'result': result,
+        }
+        self.audit.append(entry)
+        logger.info(f"Remediation [{policy.name}] {action} {name} (PID: {pid}): {result}")
+        if self.audit_path:
+            try:
+                self.audit_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.audit_path.open('a') as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError as e:
+                logger.error(f"Failed to write remediation audit log: {e}")
+        return entry
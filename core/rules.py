@@ -0,0 +1,187 @@
+"""Per-process threshold rules.
+
+The global limits in ``core.config`` only look at system totals. A process
+rule watches every process whose name matches ``process`` and fires once one
+of them has stayed above ``threshold`` for ``sustain`` seconds:
+
+    {"process": "node", "metric": "rss", "threshold": 4}
+    {"process": "WindowServer", "metric": "cpu", "threshold": 60, "sustain": 30}
+    {"process": "Google Chrome Helper*", "metric": "mem", "threshold": 10}
+
+``process`` is an exact name, or a glob pattern if it contains ``*``, ``?``
+or ``[``. Metrics are ``cpu`` and ``mem`` (percent) and ``rss`` (GB).
+
+Rules are indexed by name: exact names in a dict, patterns resolved once per
+distinct process name and memoized. Evaluating a scan costs one dict hit per
+process plus the rules that actually match it.
+"""
+
+import time
+import logging
+from fnmatch import fnmatchcase
+
+from core import can_notify
+
+logger = logging.getLogger('macmonitor.rules')
+
+METRICS = ('cpu', 'mem', 'rss')
+_METRIC_LABELS = {'cpu': "CPU", 'mem': "memory", 'rss': "RSS"}
+_GLOB_CHARS = frozenset('*?[')
+_CACHE_LIMIT = 4096
+_GB = 1024 ** 3
+
+
+def _value(metric, info):
+    if metric == 'cpu':
+        return info.get('cpu_percent') or 0.0
+    if metric == 'mem':
+        return info.get('memory_percent') or 0.0
+    mem = info.get('memory_info')
+    return mem.rss / _GB if mem else 0.0
+
+
+def _format(metric, value):
+    return f"{value:.1f} GB" if metric == 'rss' else f"{value:.1f}%"
+
+
+class ProcessRule:
+    """One "process metric above threshold" rule."""
+
+    def __init__(self, process, metric, threshold, sustain=0, name=None):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown process rule metric: {metric}")
+        if not process:
+            raise ValueError("Process rules need a process name or pattern")
+        self.process = process
+        self.metric = metric
+        self.threshold = float(threshold)
+        self.sustain = sustain
+        self.name = name or f"{process} {_METRIC_LABELS[metric]} > {_format(metric, self.threshold)}"
+
+    @property
+    def is_pattern(self):
+        return not _GLOB_CHARS.isdisjoint(self.process)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def as_dict(self):
+        return {'process': self.process, 'metric': self.metric,
+                'threshold': self.threshold, 'sustain': self.sustain, 'name': self.name}
+
+
+class RuleIndex:
+    """Process name -> tuple of matching rules."""
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+        self._exact = {}
+        self._patterns = []
+        for rule in self.rules:
+            if rule.is_pattern:
+                self._patterns.append(rule)
+            else:
+                self._exact.setdefault(rule.process, []).append(rule)
+        self._cache = {}
+
+    def match(self, name):
+        """Rules that apply to process ``name`` (memoized per name)."""
+        rules = self._cache.get(name)
+        if rules is None:
+            if name is None:
+                return ()
+            matched = list(self._exact.get(name, ()))
+            matched.extend(r for r in self._patterns if fnmatchcase(name, r.process))
+            rules = tuple(matched)
+            if len(self._cache) >= _CACHE_LIMIT:
+                self._cache.clear()
+            self._cache[name] = rules
+        return rules
+
+    def __len__(self):
+        return len(self.rules)
+
+
+class ProcessRuleEngine:
+    """Evaluate process rules against each scan.
+
+    Feed it with ``observe(infos)`` (psutil ``proc.info`` dicts), e.g. via
+    ``core.add_scan_observer(engine.observe, engine.attrs)``, then collect
+    ``alerts()`` after the scan.
+
+    Args:
+        rules: Iterable of ``ProcessRule``.
+        clock: Monotonic time source, injectable for tests.
+    """
+
+    def __init__(self, rules=(), clock=time.monotonic):
+        self.index = RuleIndex(rules)
+        self._clock = clock
+        self._since = {}       # (rule name, pid, create_time) -> time the rule first held
+        self._firing = []      # (rule, info, value) from the last scan
+
+    @property
+    def rules(self):
+        return self.index.rules
+
+    @property
+    def attrs(self):
+        """Extra psutil fields the rules need in each scan."""
+        attrs = ['create_time']
+        if any(r.metric == 'rss' for r in self.index.rules):
+            attrs.append('memory_info')
+        return tuple(attrs)
+
+    def observe(self, infos, now=None):
+        """Check every process against its matching rules."""
+        if not self.index.rules:
+            return
+        now = self._clock() if now is None else now
+        match = self.index.match
+        since = self._since
+        holding = {}
+        firing = []
+        for info in infos:
+            rules = match(info['name'])
+            if not rules:
+                continue
+            for rule in rules:
+                value = _value(rule.metric, info)
+                if value <= rule.threshold:
+                    continue
+                key = (rule.name, info['pid'], info.get('create_time'))
+                start = holding[key] = since.get(key, now)
+                if now - start >= rule.sustain:
+                    firing.append((rule, info, value))
+        # Processes that dropped below a threshold (or exited) start over.
+        self._since = holding
+        self._firing = firing
+
+    def alerts(self):
+        """``(title, message)`` per rule firing in the last scan, naming its worst process."""
+        worst = {}
+        for rule, info, value in self._firing:
+            if rule.name not in worst or value > worst[rule.name][2]:
+                worst[rule.name] = (rule, info, value)
+        alerts = []
+        for rule, info, value in worst.values():
+            if not can_notify(f"rule:{rule.name}"):
+                continue
+            message = (f"{info['name']} (PID {info['pid']}) {_METRIC_LABELS[rule.metric]} "
+                       f"{_format(rule.metric, value)}")
+            if rule.sustain:
+                message += f" for {rule.sustain:.0f}s"
+            alerts.append((rule.name, message))
+        return alerts
+
+
+def build_rules(data):
+    """``ProcessRule`` list from saved dicts, skipping (and logging) invalid ones."""
+    rules = []
+    for entry in data:
+        try:
+            rules.append(ProcessRule.from_dict(entry))
+        except (TypeError, ValueError) as e:
+            logger.error(f"Ignoring invalid process rule {entry!r}: {e}")
+    return rules
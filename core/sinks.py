@@ -0,0 +1,257 @@
+"""Alert sinks: forward alerts to a webhook, syslog or a JSON-lines file.
+
+``AlertDispatcher.submit()`` only appends to a list, so the sampling tick
+never waits on a sink. Every ``interval`` seconds the pending alerts become
+one batch. The batch is handed to each sink's own worker thread, which
+keeps a bounded queue. When the queue is full the oldest batch is dropped.
+
+A failed delivery is retried with exponential backoff (``backoff`` doubling
+up to ``max_backoff``). Sinks are independent, so a slow or unreachable
+webhook never delays syslog or the file.
+
+Sinks are configured under the ``alert_sinks`` key in config.json:
+
+    [{"type": "webhook", "url": "https://hooks.example.com/macmonitor"},
+     {"type": "syslog"},
+     {"type": "file", "path": "~/Library/Logs/MacMonitor/alerts.jsonl"}]
+"""
+
+import abc
+import json
+import os
+import socket
+import logging
+import threading
+import time
+import urllib.request
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+from core.config import ALERT_BATCH_INTERVAL
+
+logger = logging.getLogger('macmonitor.sinks')
+
+
+def _default_syslog_address():
+    for path in ('/var/run/syslog', '/dev/log'):
+        if Path(path).exists():
+            return path
+    return ('localhost', 514)
+
+
+class AlertSink(abc.ABC):
+    """Delivers one batch (list of alert dicts); raises on failure."""
+
+    name = "sink"
+
+    @abc.abstractmethod
+    def send(self, batch):
+        """Deliver ``batch``, raising on failure so the worker retries it."""
+
+    def close(self):
+        """Release any resources held by the sink."""
+
+
+class WebhookSink(AlertSink):
+    """POST ``{"alerts": [...]}`` as JSON to ``url``."""
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=5.0, headers=None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+
+    def send(self, batch):
+        body = json.dumps({'alerts': batch}).encode()
+        request = urllib.request.Request(self.url, data=body, headers=self.headers, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class SyslogSink(AlertSink):
+    """One RFC 5424 syslog message per alert (local socket, or ``[host, port]`` over UDP).
+
+    Each message is ``<PRI>1 TIMESTAMP HOSTNAME APP-NAME PROCID - - TITLE: MESSAGE``
+    (no MSGID and no structured data).
+    """
+
+    name = "syslog"
+
+    # Facility codes from RFC 5424; alerts are logged at "warning" severity.
+    FACILITIES = {'user': 1, 'daemon': 3, 'local0': 16, 'local1': 17, 'local2': 18,
+                  'local3': 19, 'local4': 20, 'local5': 21, 'local6': 22, 'local7': 23}
+    _WARNING = 4
+
+    def __init__(self, address=None, facility='user', ident='MacMonitor'):
+        if isinstance(address, list):
+            address = tuple(address)
+        self.address = address or _default_syslog_address()
+        self.ident = ident
+        self._priority = self.FACILITIES[facility] * 8 + self._WARNING
+        self._hostname = socket.gethostname() or '-'
+        family = socket.AF_INET if isinstance(self.address, tuple) else socket.AF_UNIX
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+
+    def send(self, batch):
+        for alert in batch:
+            ts = datetime.fromtimestamp(alert.get('time', time.time()), timezone.utc)
+            line = (f"<{self._priority}>1 {ts.isoformat(timespec='milliseconds').replace('+00:00', 'Z')} "
+                    f"{alert.get('host') or self._hostname} {self.ident} {os.getpid()} - - "
+                    f"{alert['title']}: {alert['message']}")
+            self._socket.sendto(line.encode('utf-8'), self.address)
+
+    def close(self):
+        self._socket.close()
+
+
+class JsonFileSink(AlertSink):
+    """Append one JSON line per alert to ``path``."""
+
+    name = "file"
+
+    def __init__(self, path):
+        self.path = Path(path).expanduser()
+
+    def send(self, batch):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('a', encoding='utf-8') as f:
+            for alert in batch:
+                f.write(json.dumps(alert) + "\n")
+
+
+SINK_TYPES = {'webhook': WebhookSink, 'syslog': SyslogSink, 'file': JsonFileSink}
+
+
+def build_sinks(data):
+    """Sinks from saved dicts (``{"type": ..., **options}``), skipping invalid ones."""
+    sinks = []
+    for entry in data:
+        try:
+            options = dict(entry)
+            sinks.append(SINK_TYPES[options.pop('type')](**options))
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            logger.error(f"Ignoring invalid alert sink {entry!r}: {e}")
+    return sinks
+
+
+class _SinkWorker:
+    """One sink's bounded batch queue, retried with exponential backoff."""
+
+    def __init__(self, sink, queue_size, backoff, max_backoff):
+        self.sink = sink
+        self.queue = deque(maxlen=queue_size)
+        self.dropped = 0
+        self.failures = 0
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name=f"alert-sink-{sink.name}", daemon=True)
+        self._thread.start()
+
+    def put(self, batch):
+        with self._lock:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+                logger.warning(f"Alert sink {self.sink.name} queue full; dropping oldest batch")
+            self.queue.append(batch)
+            self._idle.clear()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop:
+            delay = self._retry_at - time.monotonic()
+            if not self.queue or delay > 0:
+                self._wake.wait(delay if self.queue else None)
+                self._wake.clear()
+                continue
+            batch = self.queue[0]
+            try:
+                self.sink.send(batch)
+            except Exception as e:
+                self.failures += 1
+                wait = min(self._max_backoff, self._backoff * 2 ** (self.failures - 1))
+                self._retry_at = time.monotonic() + wait
+                logger.warning(f"Alert sink {self.sink.name} failed ({e}); retrying in {wait:.1f}s")
+                continue
+            self.failures = 0
+            self._retry_at = 0.0
+            with self._lock:
+                # A full queue may already have dropped this batch.
+                if self.queue and self.queue[0] is batch:
+                    self.queue.popleft()
+                if not self.queue:
+                    self._idle.set()
+
+    def wait(self, timeout):
+        return self._idle.wait(timeout)
+
+    def stop(self):
+        self._stop = True
+        self._wake.set()
+        self._thread.join(timeout=1.0)
+        self.sink.close()
+
+
+class AlertDispatcher:
+    """Batches alerts and fans them out to sinks in the background.
+
+    Args:
+        sinks:       Iterable of ``AlertSink``.
+        interval:    Seconds between batches.
+        queue_size:  Batches each sink may hold while its endpoint is down.
+        backoff:     First retry delay in seconds (doubled per failure).
+        max_backoff: Retry delay cap in seconds.
+    """
+
+    def __init__(self, sinks, interval=ALERT_BATCH_INTERVAL, queue_size=50,
+                 backoff=2.0, max_backoff=300.0):
+        self.interval = interval
+        self.hostname = socket.gethostname()
+        self.workers = [_SinkWorker(s, queue_size, backoff, max_backoff) for s in sinks]
+        self._pending = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+        if self.workers:
+            self._thread = threading.Thread(target=self._run, name='alert-dispatcher', daemon=True)
+            self._thread.start()
+
+    def submit(self, title, message, ts=None):
+        """Queue one alert for the next batch (never blocks on a sink)."""
+        if not self.workers:
+            return
+        alert = {'title': title, 'message': message,
+                 'time': ts if ts is not None else time.time(), 'host': self.hostname}
+        with self._lock:
+            self._pending.append(alert)
+
+    def _run(self):
+        while not self._closed.wait(self.interval):
+            self._dispatch()
+
+    def _dispatch(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            for worker in self.workers:
+                worker.put(batch)
+
+    def flush(self, timeout=5.0):
+        """Send pending alerts now and wait for the sinks. True if all delivered."""
+        self._dispatch()
+        deadline = time.monotonic() + timeout
+        return all(w.wait(max(0.0, deadline - time.monotonic())) for w in self.workers)
+
+    def close(self, timeout=2.0):
+        """Flush what can be delivered within ``timeout`` and stop the workers."""
+        self._closed.set()
+        self.flush(timeout)
+        for worker in self.workers:
+            worker.stop()
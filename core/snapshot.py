@@ -0,0 +1,223 @@
+"""Compact per-tick snapshot types.
+
+These replace the dicts that ``get_stats()`` and ``get_combined_process_info()``
+used to build on every tick. Each type uses ``__slots__`` so an instance is a
+fixed-size record with no per-instance ``__dict__``, and still supports the
+read-only mapping access (``stats['cpu']``, ``row.get('name')``) older callers
+rely on.
+"""
+
+# Shared label tuples so rows never allocate their own label containers.
+NO_LABELS = ()
+
+
+class _SlotRecord:
+    """Read-only mapping access over ``__slots__`` fields."""
+
+    __slots__ = ()
+    _fields = ()
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def get(self, key, default=None):
+        if key not in self._fields:
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        return self._fields
+
+    def as_dict(self):
+        """Return a plain dict copy (for JSON export and logging)."""
+        out = {}
+        for key in self._fields:
+            value = getattr(self, key)
+            out[key] = value.as_dict() if isinstance(value, _SlotRecord) else value
+        return out
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in self._fields)
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class MemoryBreakdown(_SlotRecord):
+    """Memory breakdown in GB (wired / active / compressed / cached / swap-cached).
+
+    ``swap_cached`` is only reported on Linux and stays 0 on macOS.
+    """
+
+    __slots__ = ('wired', 'active', 'compressed', 'cached', 'swap_cached')
+    _fields = __slots__
+
+    def __init__(self, wired=0.0, active=0.0, compressed=0.0, cached=0.0, swap_cached=0.0):
+        self.wired = wired
+        self.active = active
+        self.compressed = compressed
+        self.cached = cached
+        self.swap_cached = swap_cached
+
+
+class PressureStall(_SlotRecord):
+    """Linux PSI stall percentages (10 s averages) for cpu / memory / io."""
+
+    __slots__ = ('cpu_some', 'memory_some', 'memory_full', 'io_some', 'io_full')
+    _fields = __slots__
+
+    def __init__(self, cpu_some=0.0, memory_some=0.0, memory_full=0.0, io_some=0.0, io_full=0.0):
+        self.cpu_some = cpu_some
+        self.memory_some = memory_some
+        self.memory_full = memory_full
+        self.io_some = io_some
+        self.io_full = io_full
+
+
+class IORates(_SlotRecord):
+    """Disk and network throughput totals (bytes/s and ops/s).
+
+    ``disks`` and ``nics`` map device name to a per-device rate tuple:
+    ``(read_bps, write_bps, read_ops, write_ops)`` for disks and
+    ``(recv_bps, sent_bps)`` for interfaces.
+    """
+
+    __slots__ = (
+        'disk_read_bps', 'disk_write_bps', 'disk_read_ops', 'disk_write_ops',
+        'net_recv_bps', 'net_sent_bps', 'disks', 'nics',
+    )
+    _fields = __slots__
+
+    def __init__(self, disk_read_bps=0.0, disk_write_bps=0.0, disk_read_ops=0.0,
+                 disk_write_ops=0.0, net_recv_bps=0.0, net_sent_bps=0.0, disks=None, nics=None):
+        self.disk_read_bps = disk_read_bps
+        self.disk_write_bps = disk_write_bps
+        self.disk_read_ops = disk_read_ops
+        self.disk_write_ops = disk_write_ops
+        self.net_recv_bps = net_recv_bps
+        self.net_sent_bps = net_sent_bps
+        self.disks = disks if disks is not None else {}
+        self.nics = nics if nics is not None else {}
+
+
+class PagingRates(_SlotRecord):
+    """Paging and swap traffic in bytes/s, plus a 0-100 thrash score."""
+
+    __slots__ = ('pageins', 'pageouts', 'swapins', 'swapouts', 'compressions',
+                 'decompressions', 'thrash')
+    _fields = __slots__
+
+    def __init__(self, pageins=0.0, pageouts=0.0, swapins=0.0, swapouts=0.0,
+                 compressions=0.0, decompressions=0.0, thrash=0.0):
+        self.pageins = pageins
+        self.pageouts = pageouts
+        self.swapins = swapins
+        self.swapouts = swapouts
+        self.compressions = compressions
+        self.decompressions = decompressions
+        self.thrash = thrash
+
+
+class SchedLatency(_SlotRecord):
+    """Measured wakeup lateness in ms (``core.latency``) over the probe window."""
+
+    __slots__ = ('p50', 'p95', 'p99', 'max', 'samples')
+    _fields = __slots__
+
+    def __init__(self, p50=0.0, p95=0.0, p99=0.0, max=0.0, samples=0):
+        self.p50 = p50
+        self.p95 = p95
+        self.p99 = p99
+        self.max = max
+        self.samples = samples
+
+
+class Stats(_SlotRecord):
+    """One system sample as returned by ``get_stats()``.
+
+    ``stale`` names the collectors whose values were carried over from an
+    earlier tick because they timed out or failed. ``lag`` is the measured
+    scheduler latency (``SchedLatency``), when the probe is running.
+    """
+
+    __slots__ = (
+        'cpu', 'mem', 'swap', 'mem_total_gb',
+        'macos_mem', 'pressure_status', 'pressure_val', 'lag_risk', 'psi', 'io', 'paging',
+        'stale', 'lag',
+    )
+    _fields = __slots__
+
+    def __init__(self, cpu, mem, swap, mem_total_gb, macos_mem=None,
+                 pressure_status="UNKNOWN", pressure_val=0, lag_risk=False, psi=None, io=None,
+                 paging=None, stale=(), lag=None):
+        self.cpu = cpu
+        self.mem = mem
+        self.swap = swap
+        self.mem_total_gb = mem_total_gb
+        self.macos_mem = macos_mem
+        self.pressure_status = pressure_status
+        self.pressure_val = pressure_val
+        self.lag_risk = lag_risk
+        self.psi = psi
+        self.io = io
+        self.paging = paging
+        self.stale = stale
+        self.lag = lag
+
+
+class ProcessRow(_SlotRecord):
+    """One process from a scan.
+
+    ``name`` (the display label, e.g. ``"mdworker [Spotlight]"``) is only
+    formatted when first read, so rows that never reach the menu cost no
+    string work.
+
+    ``mem`` is always RSS (percent of RAM). Rows refined by
+    ``core.footprint.FootprintCache`` also carry ``footprint`` and
+    ``owned_mem``, the attributable memory as a percent of RAM.
+    """
+
+    __slots__ = ('pid', 'proc_name', 'cpu', 'mem', 'labels', 'footprint', 'owned_mem', '_display')
+    _fields = ('name', 'raw_name', 'pid', 'cpu', 'mem')
+
+    def __init__(self, pid, proc_name, cpu, mem, labels=NO_LABELS):
+        self.pid = pid
+        self.proc_name = proc_name
+        self.cpu = cpu
+        self.mem = mem
+        self.labels = labels
+        self.footprint = None
+        self.owned_mem = None
+        self._display = None
+
+    @property
+    def rank_mem(self):
+        """The memory figure the list is ranked by: ``owned_mem`` where measured, else RSS."""
+        return self.mem if self.owned_mem is None else self.owned_mem
+
+    @property
+    def raw_name(self):
+        return self.proc_name or f"PID {self.pid}"
+
+    @property
+    def name(self):
+        display = self._display
+        if display is None:
+            if not self.proc_name:
+                display = f"PID {self.pid}"
+            elif self.labels:
+                display = f"{self.proc_name} [{', '.join(self.labels)}]"
+            else:
+                display = self.proc_name
+            self._display = display
+        return display
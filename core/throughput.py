@@ -0,0 +1,125 @@
+"""Disk and network throughput collectors.
+
+psutil exposes cumulative per-device counters; these collectors turn them into
+per-second rates using monotonic-clock deltas between ticks. Each device keeps
+only its previous counter tuple, so state and per-tick work stay fixed per
+device no matter how long the monitor runs.
+"""
+
+import os
+import time
+import logging
+
+import psutil
+
+from core.snapshot import IORates
+
+logger = logging.getLogger('macmonitor.core')
+
+_WRAP_32 = 2 ** 32
+
+# Virtual devices that would only add noise (or double-count real disks).
+_SKIP_DISK_PREFIXES = ('loop', 'ram', 'zram')
+_SKIP_NIC_NAMES = ('lo', 'lo0')
+
+DISK_FIELDS = ('read_bytes', 'write_bytes', 'read_count', 'write_count')
+NET_FIELDS = ('bytes_recv', 'bytes_sent')
+
+
+def counter_delta(prev, cur):
+    """Delta between two readings of a cumulative counter.
+
+    A counter that went backwards is treated as a 32-bit wraparound when the
+    wrapped delta is plausible (less than half the range), and as a reset
+    (delta 0) otherwise.
+    """
+    if cur >= prev:
+        return cur - prev
+    if prev < _WRAP_32:
+        wrapped = cur + _WRAP_32 - prev
+        if wrapped < _WRAP_32 // 2:
+            return wrapped
+    return 0
+
+
+def format_rate(bps):
+    """Format a bytes/s rate, e.g. ``"12.3 MB/s"``."""
+    for unit in ('B/s', 'KB/s', 'MB/s'):
+        if bps < 1024:
+            return f"{bps:.0f} {unit}" if unit == 'B/s' else f"{bps:.1f} {unit}"
+        bps /= 1024
+    return f"{bps:.1f} GB/s"
+
+
+class CounterRates:
+    """Per-device counter tuples -> per-second rate tuples."""
+
+    def __init__(self, fields, clock=time.monotonic):
+        self.fields = fields
+        self._clock = clock
+        self._prev = {}
+        self._prev_time = None
+
+    def update(self, counters):
+        """Feed ``{device: psutil namedtuple}``; return ``{device: rates}``.
+
+        The first reading of a device produces no rate.
+        """
+        now = self._clock()
+        dt = now - self._prev_time if self._prev_time is not None else 0.0
+        self._prev_time = now
+
+        fields = self.fields
+        prev_all = self._prev
+        current = {}
+        rates = {}
+        for name, c in counters.items():
+            cur = tuple(getattr(c, f) for f in fields)
+            current[name] = cur
+            prev = prev_all.get(name)
+            if prev is not None and dt > 0:
+                rates[name] = tuple(counter_delta(p, v) / dt for p, v in zip(prev, cur))
+        # Replacing the dict drops devices that disappeared.
+        self._prev = current
+        return rates
+
+
+class IOCollector:
+    """Samples disk and network rates once per tick."""
+
+    def __init__(self, clock=time.monotonic):
+        self._disk = CounterRates(DISK_FIELDS, clock)
+        self._net = CounterRates(NET_FIELDS, clock)
+        self._whole_disks = self._list_whole_disks()
+
+    @staticmethod
+    def _list_whole_disks():
+        """Whole-disk names on Linux (so partitions are not double-counted)."""
+        try:
+            return frozenset(os.listdir('/sys/block'))
+        except OSError:
+            return None
+
+    def _keep_disk(self, name):
+        if name.startswith(_SKIP_DISK_PREFIXES):
+            return False
+        return self._whole_disks is None or name in self._whole_disks
+
+    def sample(self):
+        """Return an ``IORates`` for this tick (raises if the counters can't be read)."""
+        disks = psutil.disk_io_counters(perdisk=True, nowrap=False) or {}
+        nics = psutil.net_io_counters(pernic=True, nowrap=False) or {}
+
+        disk_rates = self._disk.update({n: c for n, c in disks.items() if self._keep_disk(n)})
+        nic_rates = self._net.update({n: c for n, c in nics.items() if n not in _SKIP_NIC_NAMES})
+
+        io = IORates(disks=disk_rates, nics=nic_rates)
+        for read_bps, write_bps, read_ops, write_ops in disk_rates.values():
+            io.disk_read_bps += read_bps
+            io.disk_write_bps += write_bps
+            io.disk_read_ops += read_ops
+            io.disk_write_ops += write_ops
+        for recv_bps, sent_bps in nic_rates.values():
+            io.net_recv_bps += recv_bps
+            io.net_sent_bps += sent_bps
+        return io
@@ -0,0 +1,252 @@
+"""Menu view-model: turns a stats sample and process rows into display rows.
+
+This holds everything about *what* the dropdown shows, with no UI toolkit
+imports, so the menu bar app, tests and the soak harness can all build it.
+The front-end only maps each ``MenuRow`` onto its own widgets.
+"""
+
+import time
+
+from core import get_status
+from core.throughput import format_rate
+from core.capacity import format_duration
+
+
+def get_status_label(status):
+    """Get short text label for a status value."""
+    return {"OK": "OK", "WARN": "WARN", "HIGH": "HIGH"}.get(status, "OK")
+
+
+def get_progress_bar(percent, width=10):
+    """Create a simple ASCII progress bar."""
+    filled = int(percent / 100 * width)
+    filled = max(0, min(width, filled))
+    return "[" + "■" * filled + "□" * (width - filled) + "]"
+
+
+def get_mini_bar(value_gb: float, total_gb: float, width: int = 5) -> str:
+    """Create a compact 5-char bar showing value as a fraction of total RAM."""
+    if total_gb <= 0:
+        return "[" + "□" * width + "]"
+    filled = max(0, min(width, int((value_gb / total_gb) * width)))
+    return "[" + "■" * filled + "□" * (width - filled) + "]"
+
+
+def format_process_name(name, max_length=28):
+    """Format process name with smart truncation."""
+    if len(name) <= max_length:
+        return name
+    if '.' in name:
+        parts = name.rsplit('.', 1)
+        if len(parts) == 2:
+            ext = parts[1]
+            max_base = max_length - len(ext) - 1
+            return f"{name[:max_base]}….{ext}"
+    return name[:max_length - 1] + "…"
+
+
+class MenuRow:
+    """One dropdown row.
+
+    Kinds
+    -----
+    text      label styled from the shared palette (``style=None`` for a
+              plain item); ``action`` names a callback if the row is clickable
+    bar       progress-bar row coloured by ``style`` (OK / WARN / HIGH)
+    process   process entry with kill (and optionally info) actions
+    submenu   ``children`` rows nested under ``text``
+
+    ``None`` in a row list is a separator.
+    """
+
+    __slots__ = ('kind', 'text', 'style', 'action', 'pid', 'proc_name', 'children')
+
+    def __init__(self, kind, text, style='primary', action=None, pid=None,
+                 proc_name=None, children=None):
+        self.kind = kind
+        self.text = text
+        self.style = style
+        self.action = action
+        self.pid = pid
+        self.proc_name = proc_name
+        self.children = children
+
+    def __repr__(self):
+        return f"MenuRow({self.kind!r}, {self.text!r})"
+
+
+def health_style(stats):
+    """Palette style for the health header."""
+    if stats.lag_risk or stats.pressure_status == 'HIGH':
+        return 'health_high'
+    if stats.pressure_status == 'WARN':
+        return 'health_warn'
+    return 'health_ok'
+
+
+def gpu_activity(gpu_procs):
+    """GPU heuristic from the CPU use of known GPU-heavy processes."""
+    total_gpu_cpu = sum(p.cpu for p in gpu_procs)
+    if total_gpu_cpu > 50:
+        return "HEAVY"
+    if total_gpu_cpu > 10:
+        return "MODERATE"
+    return "IDLE"
+
+
+def process_rows(cpu_procs, mem_procs):
+    """Rows for the Processes submenu."""
+    rows = [MenuRow('text', "CPU", 'tertiary')]
+    for p in cpu_procs:
+        rows.append(MenuRow('process', f"  {format_process_name(p.name, 24)}  {p.cpu:.1f}%",
+                            action='info', pid=p.pid, proc_name=p.raw_name))
+    rows.append(MenuRow('text', "Memory", 'tertiary'))
+    for p in mem_procs:
+        rows.append(MenuRow('process', f"  {format_process_name(p.name, 24)}  {p.rank_mem:.1f}%",
+                            pid=p.pid, proc_name=p.raw_name))
+    return rows
+
+
+def format_cpu_seconds(seconds):
+    """Compact CPU-time label: ``42s``, ``3m 05s``, ``1h 02m``."""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+
+CPU_TIME_WINDOWS = (('5m', "Last 5 min"), ('1h', "Last hour"), ('today', "Today"))
+
+
+def cpu_time_rows(cpu_time):
+    """Rows for the CPU Time submenu from ``{window: [(name, seconds), ...]}``."""
+    rows = []
+    for window, label in CPU_TIME_WINDOWS:
+        rows.append(MenuRow('text', label, 'tertiary'))
+        top = cpu_time.get(window) or ()
+        for name, seconds in top:
+            rows.append(MenuRow('text', f"  {format_process_name(name, 24)}  {format_cpu_seconds(seconds)}",
+                                'secondary'))
+        if not top:
+            rows.append(MenuRow('text', "  —", 'secondary'))
+    return rows
+
+
+def disk_row(volume):
+    """Free-space row for the volume swap grows on (``VolumeCapacity``)."""
+    text = f"  Disk  {volume.free / 1024 ** 3:.1f} GB free of {volume.total / 1024 ** 3:.0f} GB"
+    if volume.eta is not None:
+        text += f" · full in {format_duration(volume.eta)}"
+    return MenuRow('text', text, 'secondary')
+
+
+def lag_row(lag):
+    """Measured scheduler latency (``SchedLatency``) as a secondary row."""
+    return MenuRow('text', f"  Lag p95 {lag.p95:.1f} ms · p99 {lag.p99:.1f} ms · max {lag.max:.0f} ms",
+                   'secondary')
+
+
+def build_menu_model(stats, cpu_procs, mem_procs, gpu_procs, limits, version, last_updated=None,
+                     cpu_time=None, churn=None, disk=None, accurate_memory=None):
+    """Build the full dropdown as a list of ``MenuRow`` (``None`` = separator).
+
+    Args:
+        limits:       ``(cpu_limit, mem_limit, swap_limit)``.
+        version:      App version for the footer.
+        last_updated: Epoch seconds of the sample, shown in the footer.
+        cpu_time:     Optional ``{window: [(name, cpu_seconds), ...]}`` from
+                      ``CpuAccountant.top`` for the CPU Time submenu.
+        churn:        Optional ``(starts, exits)`` in the last minute, from
+                      ``ProcessLifecycle.churn``.
+        disk:         Optional ``VolumeCapacity`` of the swap volume.
+        accurate_memory: Whether memory is ranked by USS/PSS; adds a toggle
+                      to the Processes submenu when not ``None``.
+    """
+    cpu_limit, mem_limit, swap_limit = limits
+
+    # ── Health header (short, status-colored) ────────────────────────────
+    lag_state = "STRESSED" if stats.lag_risk else "HEALTHY"
+    rows = [
+        MenuRow('text', f"{get_status_label(stats.pressure_status)} · {lag_state}", health_style(stats)),
+        None,
+        MenuRow('bar', f"CPU  {get_progress_bar(stats.cpu)}  {stats.cpu:.1f}%",
+                get_status(stats.cpu, cpu_limit)),
+        MenuRow('text', f"  GPU · {gpu_activity(gpu_procs)}", 'secondary'),
+    ]
+    if stats.lag is not None:
+        rows.append(lag_row(stats.lag))
+    rows.append(None)
+
+    # ── Memory breakdown ─────────────────────────────────────────────────
+    m = stats.macos_mem
+    if m:
+        compressed_flag = "  ← HIGH" if m.compressed > m.active else ""
+        ram_text = f"RAM  {get_progress_bar(stats.mem)}  {stats.mem:.1f}%"
+        if stats.mem_total_gb:
+            ram_text += f"  {stats.mem_total_gb:.1f} GB"
+        rows.extend([
+            MenuRow('bar', ram_text, get_status(stats.mem, mem_limit)),
+            MenuRow('text', f"  Wired       {m.wired:.2f} GB", 'secondary'),
+            MenuRow('text', f"  Active      {m.active:.2f} GB", 'secondary'),
+            MenuRow('text', f"  Compressed  {m.compressed:.2f} GB{compressed_flag}", 'secondary'),
+            MenuRow('text', f"  Cached      {m.cached:.2f} GB", 'secondary'),
+        ])
+
+    rows.append(MenuRow('bar', f"SWAP  {get_progress_bar(stats.swap)}  {stats.swap:.1f}%",
+                        get_status(stats.swap, swap_limit)))
+    paging = stats.paging
+    if paging:
+        rows.append(MenuRow(
+            'text', f"  Thrash {paging.thrash:.0f} · swap in {format_rate(paging.swapins)}"
+                    f" · out {format_rate(paging.swapouts)}",
+            'secondary'))
+
+    # ── Disk / network throughput ────────────────────────────────────────
+    io = stats.io
+    if io:
+        rows.append(MenuRow(
+            'text', f"  Disk  R {format_rate(io.disk_read_bps)} · W {format_rate(io.disk_write_bps)}",
+            'secondary'))
+        rows.append(MenuRow(
+            'text', f"  Net   ↓ {format_rate(io.net_recv_bps)} · ↑ {format_rate(io.net_sent_bps)}",
+            'secondary'))
+    if disk is not None:
+        rows.append(disk_row(disk))
+    rows.append(None)
+
+    # ── Footer timestamp ─────────────────────────────────────────────────
+    updated_str = (
+        time.strftime('%H:%M:%S', time.localtime(last_updated))
+        if last_updated else "--:--:--"
+    )
+
+    rows.extend([
+        MenuRow('text', f"  CPU {cpu_limit}% · MEM {mem_limit}% · SWAP {swap_limit}%",
+                'secondary', action='change_thresholds'),
+        None,
+        MenuRow('text', "Refresh", None, action='refresh'),
+        MenuRow('text', "View Logs", None, action='view_logs'),
+        MenuRow('text', "Copy Stats", None, action='copy_stats'),
+        None,
+    ])
+    children = process_rows(cpu_procs, mem_procs)
+    if churn is not None:
+        children.append(MenuRow('text', f"Started {churn[0]} · exited {churn[1]} (last min)", 'tertiary'))
+    if accurate_memory is not None:
+        mark = "✓ " if accurate_memory else ""
+        children.append(MenuRow('text', f"{mark}Rank Memory by Owned (USS/PSS)", None,
+                                action='toggle_accurate_memory'))
+    rows.append(MenuRow('submenu', "Processes", children=children))
+    if cpu_time is not None:
+        rows.append(MenuRow('submenu', "CPU Time", children=cpu_time_rows(cpu_time)))
+    rows.append(None)
+    if stats.stale:
+        rows.append(MenuRow('text', f"Stale: {', '.join(stats.stale)}", 'tertiary'))
+    rows.extend([
+        MenuRow('text', f"v{version}  ·  {updated_str}", 'tertiary'),
+        None,
+        MenuRow('text', "Quit", None, action='quit'),
+    ])
+    return rows
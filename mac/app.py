@@ -10,11 +10,36 @@ import time
 import rumps
 
 from core.config import (
-    CPU_LIMIT, MEM_LIMIT, SWAP_LIMIT, CHECK_EVERY,
-    __version__, load_thresholds, save_thresholds,
+    CPU_LIMIT, MEM_LIMIT, SWAP_LIMIT, CHECK_EVERY, FLIGHT_RECORDER_WINDOW, BASELINE_SAVE_EVERY,
+    PROCESS_SCAN_TTL, HISTORY_SAVE_EVERY,
+    __version__, load_thresholds, save_thresholds, load_process_classes,
+    load_remediation, load_dashboard, load_process_rules, load_alert_sinks,
+    load_accurate_memory, save_accurate_memory, load_process_tracking, load_latency_probe,
+)
+from core import classify
+from core.remediation import RemediationEngine, RemediationPolicy, default_audit_path
+from core.dashboard import DashboardHub, DashboardServer, build_frame
+from core.recorder import FlightRecorder
+from core.accounting import CpuAccountant
+from core.rules import ProcessRuleEngine, build_rules
+from core.lifecycle import ProcessLifecycle
+from core.sinks import AlertDispatcher, build_sinks
+from core.baseline import SeasonalBaseline, default_baseline_path
+from core.history import History, default_history_path
+from core.demand import build_scan_demand
+from core.capacity import CapacityWatcher, format_duration
+from core.footprint import format_footprint
+from core.attribution import PressureAttribution
+from core.collectors import CollectorRunner, COST_SCAN
+from core import (
+    get_stats, check_thresholds, get_combined_process_info, set_accurate_memory,
+    start_latency_probe, stop_latency_probe,
 )
-from core import get_stats, get_status, check_thresholds, get_combined_process_info, can_notify
 from core.logging import setup_logging
+from core.throughput import format_rate
+from core.view import build_menu_model
+# Formatting helpers now live in core.view; re-exported for existing imports.
+from core.view import get_status_label, get_progress_bar, get_mini_bar, format_process_name  # noqa: F401
 
 logger = logging.getLogger('macmonitor.mac')
 
@@ -162,6 +187,29 @@ def notify(title, message, subtitle="", identifier=None):
         _notify_osascript(title, message, subtitle)
 
 
+_MenuDelegate = None
+
+
+def make_menu_delegate(on_open, on_close):
+    """NSMenu delegate that forwards menuWillOpen/menuDidClose to callbacks."""
+    global _MenuDelegate
+    if _MenuDelegate is None:
+        from Foundation import NSObject
+
+        class MacMonitorMenuDelegate(NSObject):
+            def menuWillOpen_(self, menu):
+                self.on_open()
+
+            def menuDidClose_(self, menu):
+                self.on_close()
+
+        _MenuDelegate = MacMonitorMenuDelegate
+    delegate = _MenuDelegate.alloc().init()
+    delegate.on_open = on_open
+    delegate.on_close = on_close
+    return delegate
+
+
 def setup_macos():
     """Setup macOS-specific behavior (no Dock icon)."""
     from AppKit import NSApplication, NSApplicationActivationPolicyAccessory
@@ -170,37 +218,28 @@ def setup_macos():
     logger.info("macOS activation policy set to accessory (no Dock icon)")
 
 
-def get_status_label(status):
-    """Get short text label for a status value."""
-    return {"OK": "OK", "WARN": "WARN", "HIGH": "HIGH"}.get(status, "OK")
-
+def _begin_app_nap_opt_out():
+    """Keep App Nap from coalescing timers, which would read as scheduler lag.
 
-def get_progress_bar(percent, width=10):
-    """Create a simple ASCII progress bar."""
-    filled = int(percent / 100 * width)
-    filled = max(0, min(width, filled))
-    return "[" + "■" * filled + "□" * (width - filled) + "]"
-
-
-def get_mini_bar(value_gb: float, total_gb: float, width: int = 5) -> str:
-    """Create a compact 5-char bar showing value as a fraction of total RAM."""
-    if total_gb <= 0:
-        return "[" + "□" * width + "]"
-    filled = max(0, min(width, int((value_gb / total_gb) * width)))
-    return "[" + "■" * filled + "□" * (width - filled) + "]"
+    Returns the activity token for ``_end_app_nap_opt_out``, or ``None``.
+    """
+    try:
+        from Foundation import NSProcessInfo, NSActivityUserInitiatedAllowingIdleSystemSleep
+        return NSProcessInfo.processInfo().beginActivityWithOptions_reason_(
+            NSActivityUserInitiatedAllowingIdleSystemSleep, "Scheduler latency probe")
+    except Exception as e:
+        logger.warning(f"Could not opt out of App Nap; lag readings may be inflated: {e}")
+        return None
 
 
-def format_process_name(name, max_length=28):
-    """Format process name with smart truncation."""
-    if len(name) <= max_length:
-        return name
-    if '.' in name:
-        parts = name.rsplit('.', 1)
-        if len(parts) == 2:
-            ext = parts[1]
-            max_base = max_length - len(ext) - 1
-            return f"{name[:max_base]}….{ext}"
-    return name[:max_length - 1] + "…"
+def _end_app_nap_opt_out(activity):
+    if activity is None:
+        return
+    try:
+        from Foundation import NSProcessInfo
+        NSProcessInfo.processInfo().endActivity_(activity)
+    except Exception as e:
+        logger.warning(f"Could not end the App Nap opt-out: {e}")
 
 
 class MacMonitorApp(rumps.App):
@@ -215,16 +254,89 @@ class MacMonitorApp(rumps.App):
         )
         self.top_cpu_processes = []
         self.top_mem_processes = []
-        self.current_stats = {}
+        self.gpu_processes = []
+        self.current_stats = None
         self._menu_updating = False
         self._last_updated: float | None = None
 
         # Load persisted thresholds (falls back to defaults if none saved)
         self.cpu_limit, self.mem_limit, self.swap_limit = load_thresholds()
+        classify.configure(load_process_classes())
+        self.remediation = self._build_remediation()
+        self.dashboard_hub, self.dashboard_server = self._start_dashboard()
+        self.recorder = FlightRecorder(capacity=max(1, FLIGHT_RECORDER_WINDOW // CHECK_EVERY))
+        self.accurate_memory = load_accurate_memory()
+        set_accurate_memory(self.accurate_memory)
+        tracking = load_process_tracking()
+        self.cpu_accountant = CpuAccountant()
+        # The latency probe (and the App Nap opt-out it needs) only run when enabled.
+        self._app_nap_activity = None
+        if load_latency_probe() and start_latency_probe() is not None:
+            self._app_nap_activity = _begin_app_nap_opt_out()
+        self.attribution = PressureAttribution()
+        self.capacity = CapacityWatcher()
+        self.baseline = SeasonalBaseline.load(default_baseline_path())
+        self._baseline_saved = time.monotonic()
+        self.history = History.load(default_history_path())
+        self._history_saved = time.monotonic()
+        self.alert_dispatcher = AlertDispatcher(build_sinks(load_alert_sinks()))
+        self.lifecycle = ProcessLifecycle()
+        self.process_rules = ProcessRuleEngine(build_rules(load_process_rules()))
+        if self.process_rules.rules:
+            logger.info(f"Process rules: {len(self.process_rules.rules)} loaded")
+
+        # The process scan is memoized: the menu, alerts, Copy Stats and
+        # Refresh within PROCESS_SCAN_TTL share one scan. Per-tick stages
+        # are guarded so one failing engine backs off alone.
+        self.sources = CollectorRunner().add(
+            'processes', self._collect_processes, default=([], [], []),
+            ttl=PROCESS_SCAN_TTL, cost=COST_SCAN, on_demand=True,
+        )
+
+        # The process scan only runs every tick while someone needs it (the
+        # menu, rules, pid churn, raised pressure); otherwise on the idle cadence.
+        self.scan_demand = build_scan_demand(
+            lifecycle=self.lifecycle if tracking['lifecycle'] else None,
+            accountant=self.cpu_accountant if tracking['cpu_accounting'] else None,
+            attribution=self.attribution if tracking['attribution'] else None,
+            process_rules=self.process_rules,
+            remediation=self.remediation,
+            dashboard_hub=self.dashboard_hub,
+        )
 
         self._build_menu()
+        self._menu_delegate = None
+        self._install_menu_delegate()
         logger.info("MacMonitor app initialized")
 
+    @staticmethod
+    def _build_remediation():
+        """Create the remediation engine from saved settings."""
+        settings = load_remediation()
+        policies = []
+        for data in settings['policies']:
+            try:
+                policies.append(RemediationPolicy.from_dict(data))
+            except (TypeError, ValueError) as e:
+                logger.error(f"Ignoring invalid remediation policy {data!r}: {e}")
+        if policies:
+            mode = "dry-run" if settings['dry_run'] else "active"
+            logger.info(f"Remediation: {len(policies)} policies ({mode})")
+        return RemediationEngine(policies, dry_run=settings['dry_run'], audit_path=default_audit_path())
+
+    @staticmethod
+    def _start_dashboard():
+        """Start the local live dashboard if it is enabled in config.json."""
+        settings = load_dashboard()
+        if not settings['enabled']:
+            return None, None
+        hub = DashboardHub()
+        try:
+            return hub, DashboardServer(hub, port=settings['port']).start()
+        except OSError as e:
+            logger.error(f"Could not start dashboard on port {settings['port']}: {e}")
+            return None, None
+
     def _build_menu(self):
         """Build the initial placeholder menu."""
         self.menu = [
@@ -361,7 +473,8 @@ class MacMonitorApp(rumps.App):
         save_thresholds(cpu, mem, swap)
         notify("MacMonitor", f"Thresholds updated: CPU {cpu}% | MEM {mem}% | SWAP {swap}%")
         logger.info(f"Thresholds updated: CPU={cpu}, Mem={mem}, Swap={swap}")
-        self._update(None)
+        # Only the bars and alert limits change; the next tick re-checks alerts.
+        self._update_process_menu()
 
     def _kill_process(self, sender):
         """Send SIGTERM to a process."""
@@ -373,11 +486,25 @@ class MacMonitorApp(rumps.App):
             os.kill(pid, signal.SIGTERM)
             notify("MacMonitor", f"Sent SIGTERM to {name} (PID: {pid})")
             logger.info(f"Killed process {name} (PID: {pid})")
-            self._update(None)
+            # Drop the row now; the next scan sees the process gone.
+            self.top_cpu_processes = [p for p in self.top_cpu_processes if p.pid != pid]
+            self.top_mem_processes = [p for p in self.top_mem_processes if p.pid != pid]
+            self.gpu_processes = [p for p in self.gpu_processes if p.pid != pid]
+            self.sources.invalidate('processes')
+            self._update_process_menu()
         except Exception as e:
             notify("MacMonitor", f"Failed to kill {name}: {e}")
             logger.error(f"Error killing process {pid}: {e}")
 
+    def _toggle_accurate_memory(self, _):
+        """Switch the memory ranking between RSS and owned memory (USS/PSS)."""
+        self.accurate_memory = not self.accurate_memory
+        save_accurate_memory(self.accurate_memory)
+        set_accurate_memory(self.accurate_memory)
+        logger.info(f"Accurate memory ranking {'on' if self.accurate_memory else 'off'}")
+        self._scan_processes(force=True)
+        self._update_process_menu()
+
     def _open_process_info(self, sender):
         """Open Activity Monitor."""
         subprocess.run(['open', '-a', 'Activity Monitor'])
@@ -388,19 +515,52 @@ class MacMonitorApp(rumps.App):
             notify("MacMonitor", "No stats available yet — try again in a moment.")
             return
         stats = self.current_stats
-        m = stats.get('macos_mem') or {}
+        m = stats.macos_mem
         lines = [
             f"MacMonitor Snapshot — {time.strftime('%H:%M:%S')}",
-            f"CPU: {stats['cpu']:.1f}%  RAM: {stats['mem']:.1f}%  Swap: {stats['swap']:.1f}%",
-            f"Pressure: {stats.get('pressure_status', 'N/A')}  Lag Risk: {'Yes' if stats.get('lag_risk') else 'No'}",
+            f"CPU: {stats.cpu:.1f}%  RAM: {stats.mem:.1f}%  Swap: {stats.swap:.1f}%",
+            f"Pressure: {stats.pressure_status}  Lag Risk: {'Yes' if stats.lag_risk else 'No'}",
         ]
         if m:
             lines.append(
-                f"Wired: {m.get('wired', 0):.2f} GB  "
-                f"Active: {m.get('active', 0):.2f} GB  "
-                f"Compressed: {m.get('compressed', 0):.2f} GB  "
-                f"Cached: {m.get('cached', 0):.2f} GB"
+                f"Wired: {m.wired:.2f} GB  "
+                f"Active: {m.active:.2f} GB  "
+                f"Compressed: {m.compressed:.2f} GB  "
+                f"Cached: {m.cached:.2f} GB"
+            )
+        if stats.lag:
+            lag = stats.lag
+            lines.append(f"Lag: p50 {lag.p50:.1f} ms  p95 {lag.p95:.1f} ms  p99 {lag.p99:.1f} ms  "
+                         f"max {lag.max:.0f} ms")
+        if stats.paging:
+            paging = stats.paging
+            lines.append(
+                f"Thrash: {paging.thrash:.0f}  "
+                f"Swap in: {format_rate(paging.swapins)}  Swap out: {format_rate(paging.swapouts)}  "
+                f"Decompressions: {format_rate(paging.decompressions)}"
+            )
+        if stats.io:
+            io = stats.io
+            lines.append(
+                f"Disk: R {format_rate(io.disk_read_bps)} W {format_rate(io.disk_write_bps)}  "
+                f"Net: ↓ {format_rate(io.net_recv_bps)} ↑ {format_rate(io.net_sent_bps)}"
             )
+        disk = self.capacity.swap_volume()
+        if disk:
+            eta = f", full in ~{format_duration(disk.eta)}" if disk.eta is not None else ""
+            lines.append(f"Free space ({disk.mount}): {disk.free / 1024 ** 3:.1f} GB{eta}")
+        span = self.history.span()
+        if span:
+            lines.append(f"History: {format_duration(span[1] - span[0])}, {len(self.history)} samples "
+                         f"in {self.history.nbytes / 1024 ** 2:.1f} MB")
+        if self.attribution.culprits:
+            lines.append(f"Likely culprits: {', '.join(map(str, self.attribution.culprits))}")
+        if stats.stale:
+            lines.append(f"Stale (collector timed out or failing): {', '.join(stats.stale)}")
+        backing_off = self.sources.backing_off()
+        if backing_off:
+            lines.append("Backing off: " + ", ".join(
+                f"{name} (retry in {delay:.0f}s)" for name, delay in sorted(backing_off.items())))
         try:
             subprocess.run(['pbcopy'], input="\n".join(lines).encode(), check=True, timeout=3)
             notify("MacMonitor", "Stats copied to clipboard")
@@ -408,8 +568,74 @@ class MacMonitorApp(rumps.App):
         except Exception as e:
             logger.error(f"Failed to copy stats: {e}")
 
+    def _render_row(self, row):
+        """Map one view-model ``MenuRow`` onto a rumps menu item."""
+        if row is None:
+            return None
+        callback = {
+            'change_thresholds': self._change_thresholds,
+            'refresh': self._refresh,
+            'view_logs': self._view_logs,
+            'copy_stats': self._copy_stats,
+            'toggle_accurate_memory': self._toggle_accurate_memory,
+            'quit': self._quit,
+        }.get(row.action)
+        if row.kind == 'bar':
+            return self._colored_bar_item(row.text, row.style)
+        if row.kind == 'process':
+            p_item = rumps.MenuItem(row.text)
+            kill_item = rumps.MenuItem("Kill Process", callback=self._kill_process)
+            kill_item.pid = row.pid
+            kill_item.proc_name = row.proc_name
+            p_item.add(kill_item)
+            if row.action == 'info':
+                info_item = rumps.MenuItem("Open Activity Monitor", callback=self._open_process_info)
+                info_item.pid = row.pid
+                p_item.add(info_item)
+            return p_item
+        if row.kind == 'submenu':
+            submenu = rumps.MenuItem(row.text)
+            for child in row.children:
+                submenu.add(self._render_row(child))
+            return submenu
+        if row.style is None:
+            return rumps.MenuItem(row.text, callback=callback)
+        return self._styled_item(row.text, row.style, callback=callback)
+
+    def _install_menu_delegate(self):
+        """Track when the dropdown opens and closes (for demand-driven scans)."""
+        try:
+            self._menu_delegate = make_menu_delegate(self._menu_will_open, self._menu_did_close)
+            self._menu._menu.setDelegate_(self._menu_delegate)
+        except Exception as e:
+            # Without open/close events, scan and rebuild the menu every tick.
+            logger.warning(f"Menu delegate unavailable, scanning every tick: {e}")
+            self.scan_demand.menu_open = True
+
+    def _menu_will_open(self):
+        """Warm refresh: scan and rebuild before the dropdown is drawn."""
+        self.scan_demand.menu_open = True
+        if self.current_stats:
+            self._scan_processes()
+            self._update_process_menu()
+
+    def _menu_did_close(self):
+        self.scan_demand.menu_open = False
+
+    @staticmethod
+    def _collect_processes():
+        return get_combined_process_info(limit=5)
+
+    def _scan_processes(self, force=False):
+        """Read the (memoized) process scan and keep its top rows for the menu and alerts."""
+        cpu_procs, mem_procs, gpu_procs = self.sources.get('processes', force)
+        self.top_cpu_processes = cpu_procs
+        self.top_mem_processes = mem_procs
+        self.gpu_processes = gpu_procs
+        self.scan_demand.mark_scanned()
+
     def _update_process_menu(self):
-        """Rebuild the full dropdown menu with current stats."""
+        """Rebuild the full dropdown menu from the last scan."""
         if self._menu_updating:
             return
         self._menu_updating = True
@@ -419,130 +645,16 @@ class MacMonitorApp(rumps.App):
             if not stats:
                 return
 
-            cpu_procs, mem_procs, gpu_procs = get_combined_process_info(limit=5)
-
-            # ── Status values ─────────────────────────────────────────────
-            cpu_status  = get_status(stats['cpu'],  self.cpu_limit)
-            mem_status  = get_status(stats['mem'],  self.mem_limit)
-            swap_status = get_status(stats['swap'], self.swap_limit)
-
-            # ── Health header (short, status-colored) ────────────────────
-            pressure_label = get_status_label(stats.get('pressure_status', 'OK'))
-            lag_risk = stats.get('lag_risk', False)
-            lag_state = "STRESSED" if lag_risk else "HEALTHY"
-            summary_title = f"{pressure_label} · {lag_state}"
-
-            if lag_risk or pressure == 'HIGH':
-                health_style = 'health_high'
-            elif pressure == 'WARN':
-                health_style = 'health_warn'
-            else:
-                health_style = 'health_ok'
-
-            # ── CPU ──────────────────────────────────────────────────────
-            cpu_item = self._colored_bar_item(
-                f"CPU  {get_progress_bar(stats['cpu'])}  {stats['cpu']:.1f}%",
-                cpu_status,
-            )
-
-            # ── GPU heuristic ────────────────────────────────────────────
-            gpu_activity = "IDLE"
-            if gpu_procs:
-                total_gpu_cpu = sum(p['cpu'] for p in gpu_procs)
-                if total_gpu_cpu > 50:
-                    gpu_activity = "HEAVY"
-                elif total_gpu_cpu > 10:
-                    gpu_activity = "MODERATE"
-
-            # ── Memory breakdown ─────────────────────────────────────────
-            m = stats.get('macos_mem') or {}
-            total_gb = stats.get('mem_total_gb', 0)
-            mem_breakdown = []
-            if m:
-                compressed = m.get('compressed', 0)
-                active     = m.get('active', 0)
-                wired      = m.get('wired', 0)
-                cached     = m.get('cached', 0)
-                compressed_flag = "  ← HIGH" if compressed > active else ""
-
-                ram_text = f"RAM  {get_progress_bar(stats['mem'])}  {stats['mem']:.1f}%"
-                if total_gb:
-                    ram_text += f"  {total_gb:.1f} GB"
-                ram_item = self._colored_bar_item(ram_text, mem_status)
-
-                mem_breakdown = [
-                    ram_item,
-                    self._styled_item(f"  Wired       {wired:.2f} GB", 'secondary'),
-                    self._styled_item(f"  Active      {active:.2f} GB", 'secondary'),
-                    self._styled_item(f"  Compressed  {compressed:.2f} GB{compressed_flag}", 'secondary'),
-                    self._styled_item(f"  Cached      {cached:.2f} GB", 'secondary'),
-                ]
-
-            swap_item = self._colored_bar_item(
-                f"SWAP  {get_progress_bar(stats['swap'])}  {stats['swap']:.1f}%",
-                swap_status,
+            rows = build_menu_model(
+                stats, self.top_cpu_processes, self.top_mem_processes, self.gpu_processes,
+                (self.cpu_limit, self.mem_limit, self.swap_limit),
+                __version__, self._last_updated,
+                cpu_time={w: self.cpu_accountant.top(w) for w in ('5m', '1h', 'today')},
+                churn=self.lifecycle.churn(),
+                disk=self.capacity.swap_volume(),
+                accurate_memory=self.accurate_memory,
             )
-
-            # ── Process submenu ───────────────────────────────────────────
-            proc_menu = rumps.MenuItem("Processes")
-
-            proc_menu.add(self._styled_item("CPU", 'tertiary'))
-            for p in cpu_procs:
-                p_item = rumps.MenuItem(f"  {format_process_name(p['name'], 24)}  {p['cpu']:.1f}%")
-                kill_item = rumps.MenuItem("Kill Process", callback=self._kill_process)
-                kill_item.pid = p['pid']
-                kill_item.proc_name = p['raw_name']
-                info_item = rumps.MenuItem("Open Activity Monitor", callback=self._open_process_info)
-                info_item.pid = p['pid']
-                p_item.add(kill_item)
-                p_item.add(info_item)
-                proc_menu.add(p_item)
-
-            proc_menu.add(self._styled_item("Memory", 'tertiary'))
-            for p in mem_procs:
-                p_item = rumps.MenuItem(f"  {format_process_name(p['name'], 24)}  {p['mem']:.1f}%")
-                kill_item = rumps.MenuItem("Kill Process", callback=self._kill_process)
-                kill_item.pid = p['pid']
-                kill_item.proc_name = p['raw_name']
-                p_item.add(kill_item)
-                proc_menu.add(p_item)
-
-            # ── Footer timestamp ──────────────────────────────────────────
-            updated_str = (
-                time.strftime('%H:%M:%S', time.localtime(self._last_updated))
-                if self._last_updated else "--:--:--"
-            )
-
-            # ── Assemble ─────────────────────────────────────────────────
-            menu_items = [
-                self._styled_item(summary_title, health_style),
-                None,
-                cpu_item,
-                self._styled_item(f"  GPU · {gpu_activity}", 'secondary'),
-                None,
-            ]
-
-            menu_items.extend(mem_breakdown)
-            menu_items.append(swap_item)
-            menu_items.append(None)
-
-            menu_items.extend([
-                self._styled_item(
-                    f"  CPU {self.cpu_limit}% · MEM {self.mem_limit}% · SWAP {self.swap_limit}%",
-                    'secondary',
-                    callback=self._change_thresholds,
-                ),
-                None,
-                rumps.MenuItem("Refresh", callback=self._refresh),
-                rumps.MenuItem("View Logs", callback=self._view_logs),
-                rumps.MenuItem("Copy Stats", callback=self._copy_stats),
-                None,
-                proc_menu,
-                None,
-                self._styled_item(f"v{__version__}  ·  {updated_str}", 'tertiary'),
-                None,
-                rumps.MenuItem("Quit", callback=self._quit),
-            ])
+            menu_items = [self._render_row(row) for row in rows]
 
             # Replace menu atomically
             try:
@@ -559,45 +671,92 @@ class MacMonitorApp(rumps.App):
             self._menu_updating = False
 
     @rumps.timer(CHECK_EVERY)
-    def _update(self, _):
-        """Fetch stats and refresh title + menu on every timer tick."""
-        try:
-            stats = get_stats()
-            self.current_stats = stats
-            self._last_updated = time.time()
-
-            # Menu bar title — compact, uses · as separator
-            pressure = stats.get('pressure_status', 'OK')
-            base = f"C:{stats['cpu']:.0f}% · M:{stats['mem']:.0f}%"
-
-            if stats.get('lag_risk'):
-                self.title = f"STRESS  {base}"
-            elif pressure == 'HIGH':
-                self.title = f"HIGH  {base}"
-            elif pressure == 'WARN':
-                self.title = f"WARN  {base}"
-            else:
-                self.title = base
-
-            self._update_process_menu()
-
-            alerts = check_thresholds(
-                stats,
-                cpu_limit=self.cpu_limit,
-                mem_limit=self.mem_limit,
-                swap_limit=self.swap_limit,
-            )
-            for title, message in alerts:
-                notify(title, message)
+    def _update(self, _, force=False):
+        """Fetch stats and refresh the title every tick; scan processes on demand.
 
+        ``force`` bypasses the collectors' TTL caches (Refresh). Only a failure
+        of ``get_stats()`` itself shows "ERROR"; each later stage is guarded
+        and backs off on its own.
+        """
+        try:
+            stats = get_stats(force)
         except Exception as e:
             self.title = "ERROR"
             logger.error(f"Error updating stats: {e}", exc_info=True)
+            return
+        self.current_stats = stats
+        self._last_updated = time.time()
+
+        # Menu bar title — compact, uses · as separator
+        pressure = stats.pressure_status
+        base = f"C:{stats.cpu:.0f}% · M:{stats.mem:.0f}%"
+
+        if stats.lag_risk:
+            self.title = f"STRESS  {base}"
+        elif pressure == 'HIGH':
+            self.title = f"HIGH  {base}"
+        elif pressure == 'WARN':
+            self.title = f"WARN  {base}"
+        else:
+            self.title = base
+
+        guard = self.sources.guard
+        alerts = guard('thresholds', check_thresholds, stats, self.cpu_limit, self.mem_limit,
+                       self.swap_limit, default=[])
+
+        # Scan only when the menu is open, a consumer needs it, the
+        # system already looks unhealthy, or the idle refresh is due.
+        if force or self.scan_demand.should_scan(urgent=bool(alerts) or stats.lag_risk):
+            self._scan_processes(force)
+            if self.scan_demand.menu_open:
+                guard('menu', self._update_process_menu)
+
+        # Name the largest process (by owned memory when enabled).
+        if self.top_mem_processes:
+            largest = format_footprint(self.top_mem_processes[0])
+            alerts = [(t, f"{m} — largest: {largest}" if t == "High Memory" else m)
+                      for t, m in alerts]
+
+        culprits = guard('attribution.observe', self.attribution.observe_stats, stats)
+        if culprits:
+            logger.info(f"Memory pressure rose; likely culprits: {', '.join(map(str, culprits))}")
+        alerts = guard('attribution.annotate', self.attribution.annotate, alerts, default=alerts)
+
+        guard('recorder.record', self.recorder.record, stats, self.top_cpu_processes, self.top_mem_processes)
+
+        if self.dashboard_hub:
+            guard('dashboard', self.dashboard_hub.publish,
+                  build_frame(stats, self.top_cpu_processes, self.top_mem_processes))
+
+        alerts.extend(guard('process_rules', self.process_rules.alerts, default=[]))
+        alerts.extend(guard('lifecycle', self.lifecycle.alerts, default=[]))
+        guard('capacity.sample', self.capacity.sample)
+        alerts.extend(guard('capacity.alerts', self.capacity.alerts, default=[]))
+        guard('baseline.observe', self.baseline.observe, stats, self._last_updated)
+        alerts.extend(guard('baseline.alerts', self.baseline.alerts, default=[]))
+        if time.monotonic() - self._baseline_saved >= BASELINE_SAVE_EVERY:
+            guard('baseline.save', self.baseline.save)
+            self._baseline_saved = time.monotonic()
+        guard('history.record', self.history.record, stats, self._last_updated)
+        if time.monotonic() - self._history_saved >= HISTORY_SAVE_EVERY:
+            guard('history.save', self.history.save)
+            self._history_saved = time.monotonic()
+        for title, message in alerts:
+            notify(title, message)
+            guard('alert_sinks', self.alert_dispatcher.submit, title, message)
+        if alerts:
+            guard('recorder.trigger', self.recorder.trigger, ", ".join(title for title, _ in alerts))
+
+        if self.remediation.policies:
+            entries = guard('remediation', self.remediation.evaluate, stats, default=[])
+            for entry in entries:
+                if entry['result'] == 'ok':
+                    notify("MacMonitor", f"{entry['action'].title()}: {entry['name']} (PID: {entry['pid']})")
 
     def _refresh(self, _):
-        """Manual refresh."""
+        """Manual refresh: re-read every collector and rescan, ignoring the caches."""
         logger.info("Manual refresh triggered")
-        self._update(None)
+        self._update(None, force=True)
         notify("MacMonitor", "Refreshed")
 
     def _view_logs(self, _):
@@ -614,6 +773,15 @@ class MacMonitorApp(rumps.App):
     def _quit(self, _):
         """Quit the application."""
         logger.info("Quitting MacMonitor")
+        self.remediation.resume_all()
+        self.alert_dispatcher.close()
+        self.baseline.save()
+        self.history.save()
+        stop_latency_probe()
+        _end_app_nap_opt_out(self._app_nap_activity)
+        self._app_nap_activity = None
+        if self.dashboard_server:
+            self.dashboard_server.stop()
         rumps.quit_application()
 
 
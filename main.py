@@ -3,10 +3,12 @@ import sys
 
 
 def main():
-    if sys.platform != "darwin":
-        print(f"Unsupported platform: {sys.platform}. MacMonitor is macOS-only.")
-        sys.exit(1)
-        
+    # The terminal UI runs anywhere core does (SSH sessions, Linux).
+    if "--tui" in sys.argv[1:] or sys.platform != "darwin":
+        from tui import run
+        run()
+        return
+
     from mac import run
     run()
 
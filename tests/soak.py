@@ -0,0 +1,385 @@
+"""Soak harness: long runs of the core pipeline against a synthetic process storm.
+
+Drives ``get_stats()``, ``get_combined_process_info()``, ``check_thresholds()``
+and the menu view-model at an accelerated tick rate, while ``psutil.process_iter``
+is replaced by a storm of thousands of short-lived processes. The stateful
+consumers of each tick ride along as the app wires them: the lifecycle
+tracker, CPU accountant, pressure attribution, process rules and (dry-run)
+remediation through ``build_scan_demand()``, plus the history store and the
+flight recorder. They run on a simulated clock that advances ``CHECK_EVERY``
+per tick, so their time windows fill and expire as they would in the app.
+It records RSS, tracemalloc usage and per-tick latency, and fails when
+growth slopes or tail latency exceed their budgets.
+
+    python -m tests.soak --duration 7200 --population 3000 --churn 300
+    python -m tests.soak --ticks 20000 --json soak.json
+
+Exit status is 1 when any budget is exceeded.
+"""
+
+import argparse
+import gc
+from array import array
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import psutil  # noqa: E402
+
+_MemInfo = namedtuple('pmem', 'rss vms')
+_CpuTimes = namedtuple('pcputimes', 'user system children_user children_system')
+
+# Long-lived names seen on a typical Mac, plus build-tool names for the storm.
+STABLE_NAMES = (
+    'WindowServer', 'kernel_task', 'launchd', 'mds', 'mds_stores', 'mdworker_shared',
+    'Google Chrome', 'Google Chrome Helper (Renderer)', 'Slack Helper', 'Finder',
+    'Dock', 'Safari', 'com.docker.backend', 'coreaudiod', 'zsh', 'node', 'python3',
+)
+STORM_NAMES = ('clang', 'cc1plus', 'ld', 'swift-frontend', 'git', 'sh', 'node', 'esbuild')
+
+
+class FakeProcess:
+    """Minimal stand-in for ``psutil.Process`` as yielded by ``process_iter``."""
+
+    __slots__ = ('pid', 'info')
+
+    def __init__(self, pid, info):
+        self.pid = pid
+        self.info = info
+
+
+class ProcessStorm:
+    """Replacement for ``psutil.process_iter`` with constant process churn.
+
+    Each call retires ``churn`` processes and spawns as many new ones with
+    fresh pids, keeping ``population`` processes alive. ``unique_names``
+    controls how many distinct storm names appear (to exercise name caches).
+    """
+
+    def __init__(self, population=2000, churn=200, unique_names=500, seed=0):
+        self.population = population
+        self.churn = churn
+        self.unique_names = unique_names
+        self._rng = random.Random(seed)
+        self._next_pid = 100
+        self._procs = [self._spawn(stable=i < population // 4) for i in range(population)]
+        self.spawned = population
+        self.exited = 0
+
+    def _spawn(self, stable=False):
+        rng = self._rng
+        pid = self._next_pid
+        self._next_pid += 1
+        if stable:
+            name = rng.choice(STABLE_NAMES)
+        else:
+            name = f"{rng.choice(STORM_NAMES)}-{rng.randrange(self.unique_names)}"
+        info = {
+            'pid': pid,
+            'ppid': 1 if stable else rng.randrange(100, 200),
+            'name': name,
+            'create_time': time.time(),
+            'cpu_percent': rng.choice((0.0, 0.0, 0.0, 0.5, 3.0, 25.0, 90.0)),
+            'memory_percent': rng.random() * 2,
+            'memory_info': _MemInfo(rng.randrange(1, 2048) * 2 ** 20, 4 * 2 ** 30),
+            'cpu_times': _CpuTimes(rng.random() * 10, rng.random() * 5, 0.0, 0.0),
+        }
+        return FakeProcess(pid, info)
+
+    def step(self):
+        """Advance one generation: retire the oldest storm processes, spawn new ones."""
+        stable = self.population // 4
+        storm = self._procs[stable:]
+        del storm[:self.churn]
+        storm.extend(self._spawn() for _ in range(self.churn))
+        self._procs[stable:] = storm
+        self.spawned += self.churn
+        self.exited += self.churn
+
+    def process_iter(self, attrs=None, ad_value=None):
+        return iter(self._procs)
+
+    def pids(self):
+        return [p.pid for p in self._procs]
+
+
+def slope(points):
+    """Least-squares slope of ``[(x, y), ...]`` (0.0 for fewer than 2 points)."""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+class LatencyHistogram:
+    """Fixed-size latency histogram (0.1 ms buckets up to 1 s), so the harness
+    itself does not grow the heap it is measuring."""
+
+    BUCKET_S = 0.0001
+
+    def __init__(self, buckets=10000):
+        self.counts = array('L', bytes(array('L').itemsize * buckets))
+        self.total = 0
+
+    def add(self, seconds):
+        idx = min(len(self.counts) - 1, int(seconds / self.BUCKET_S))
+        self.counts[idx] += 1
+        self.total += 1
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the ``pct`` percentile, in ms."""
+        if not self.total:
+            return 0.0
+        target = self.total * pct / 100
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return (idx + 1) * self.BUCKET_S * 1000
+        return len(self.counts) * self.BUCKET_S * 1000
+
+
+class Trackers:
+    """The app's stateful per-tick consumers, on a simulated clock.
+
+    Observers are attached through ``build_scan_demand()`` as in the app;
+    ``close()`` detaches them again.
+    """
+
+    # A node over 1 GB RSS, and clang over 50% CPU for 30 s.
+    RULES = [{'process': 'node', 'metric': 'rss', 'threshold': 1},
+             {'process': 'clang', 'metric': 'cpu', 'threshold': 50, 'sustain': 30}]
+
+    def __init__(self, storm, directory, start=None):
+        from core.accounting import CpuAccountant
+        from core.attribution import PressureAttribution
+        from core.config import CHECK_EVERY
+        from core.demand import build_scan_demand
+        from core.history import History
+        from core.lifecycle import ProcessLifecycle
+        from core.recorder import FlightRecorder
+        from core.remediation import RemediationEngine, RemediationPolicy
+        from core.rules import ProcessRuleEngine, build_rules
+
+        self.step = CHECK_EVERY
+        self.now = time.time() if start is None else start
+        clock = self.clock
+        self.lifecycle = ProcessLifecycle(clock=clock, pids=storm.pids)
+        self.accountant = CpuAccountant(clock=clock)
+        self.attribution = PressureAttribution(clock=clock)
+        self.rules = ProcessRuleEngine(build_rules(self.RULES), clock=clock)
+        # Renice the top CPU process every tick (dry run), so cooldowns churn.
+        self.remediation = RemediationEngine(
+            [RemediationPolicy('soak', 'renice', metric='cpu', threshold=0, sustain=0)],
+            clock=clock)
+        self.history = History(retention=3600, block_span=300)
+        self.recorder = FlightRecorder(capacity=60, directory=directory, keep=3, capture=dict)
+        self.demand = build_scan_demand(
+            lifecycle=self.lifecycle, accountant=self.accountant, attribution=self.attribution,
+            process_rules=self.rules, remediation=self.remediation)
+
+    def clock(self):
+        return self.now
+
+    def tick(self, tick, stats, cpu_procs, mem_procs):
+        """Everything the app does with one tick's stats after the scan."""
+        alerts = []
+        self.attribution.observe_stats(stats)
+        alerts += self.rules.alerts()
+        alerts += self.lifecycle.alerts()
+        self.remediation.evaluate(stats)
+        self.history.record(stats, self.now)
+        self.recorder.record(stats, cpu_procs, mem_procs, self.now)
+        if tick % 500 == 0:
+            self.recorder.trigger("soak")
+        self.now += self.step
+        return alerts
+
+    def close(self):
+        self.recorder.wait(timeout=5)
+        for name in list(self.demand.observers()):
+            self.demand.detach(name)
+
+
+def run_soak(ticks=None, duration=None, population=2000, churn=200, unique_names=500,
+             interval=0.0, sample_every=50, warmup=0.2, backend='native', trackers=True,
+             budget_rss_kb=256, budget_traced_kb=64, budget_p99_ms=50.0, top=10):
+    """Run the soak loop and return a report dict (``report['passed']``).
+
+    Budgets are growth slopes in KB per 1000 ticks (RSS and tracemalloc),
+    measured after the ``warmup`` fraction of samples, plus p99 tick latency.
+    ``trackers`` adds the stateful consumers (see ``Trackers``).
+    """
+    import core
+    from core import get_stats, get_combined_process_info, check_thresholds
+    from core.backends import Backend, set_backend, get_backend
+    from core.config import __version__
+    from core.view import build_menu_model
+
+    if ticks is None and duration is None:
+        ticks = 1000
+    storm = ProcessStorm(population, churn, unique_names)
+    flight_dir = tempfile.TemporaryDirectory(prefix='soak-flight-')
+    tracking = Trackers(storm, flight_dir.name) if trackers else None
+    tracked = sorted(tracking.demand.observers()) if tracking is not None else []
+    me = psutil.Process()
+    previous_backend = get_backend()
+    if backend == 'none':
+        set_backend(Backend())
+
+    latencies = LatencyHistogram()
+    rss_points = []
+    traced_points = []
+    baseline_snapshot = None
+    tracemalloc.start(1)
+    start = time.monotonic()
+    tick = 0
+    try:
+        with patch('psutil.process_iter', storm.process_iter):
+            while True:
+                if ticks is not None and tick >= ticks:
+                    break
+                if duration is not None and time.monotonic() - start >= duration:
+                    break
+
+                storm.step()
+                t0 = time.perf_counter()
+                stats = get_stats()
+                cpu_procs, mem_procs, gpu_procs = get_combined_process_info(limit=5)
+                check_thresholds(stats)
+                if tracking is not None:
+                    tracking.tick(tick, stats, cpu_procs, mem_procs)
+                build_menu_model(stats, cpu_procs, mem_procs, gpu_procs, (85, 80, 20),
+                                 __version__, time.time())
+                latencies.add(time.perf_counter() - t0)
+
+                if tick % sample_every == 0:
+                    # Collect first so freelists and pending cyclic garbage are
+                    # not mistaken for growth; only retained memory counts.
+                    gc.collect()
+                    if ticks is not None:
+                        warmed_up = tick >= ticks * warmup
+                    else:
+                        warmed_up = time.monotonic() - start >= duration * warmup
+                    # Before sampling, so every measured sample includes the
+                    # snapshot's own memory rather than showing it as a step.
+                    if baseline_snapshot is None and warmed_up:
+                        baseline_snapshot = tracemalloc.take_snapshot()
+                    # tracemalloc's own bookkeeping is excluded from RSS.
+                    rss = me.memory_info().rss - tracemalloc.get_tracemalloc_memory()
+                    rss_points.append((tick, rss))
+                    traced_points.append((tick, tracemalloc.get_traced_memory()[0]))
+                tick += 1
+                if interval:
+                    time.sleep(interval)
+
+        gc.collect()
+        final_snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        if tracking is not None:
+            tracking.close()
+        flight_dir.cleanup()
+        if backend == 'none':
+            set_backend(previous_backend)
+        core._last_alert = {}
+
+    skip = int(len(rss_points) * warmup)
+    rss_slope = slope(rss_points[skip:]) * 1000 / 1024
+    traced_slope = slope(traced_points[skip:]) * 1000 / 1024
+    p50 = latencies.percentile(50)
+    p99 = latencies.percentile(99)
+
+    allocators = []
+    if baseline_snapshot is not None:
+        for stat in final_snapshot.compare_to(baseline_snapshot, 'lineno')[:top]:
+            frame = stat.traceback[0]
+            allocators.append({
+                'where': f"{frame.filename}:{frame.lineno}",
+                'size_diff_kb': stat.size_diff / 1024,
+                'count_diff': stat.count_diff,
+            })
+
+    failures = []
+    if rss_slope > budget_rss_kb:
+        failures.append(f"RSS growth {rss_slope:.1f} KB/1k ticks > {budget_rss_kb} KB")
+    if traced_slope > budget_traced_kb:
+        failures.append(f"Python heap growth {traced_slope:.1f} KB/1k ticks > {budget_traced_kb} KB")
+    if p99 > budget_p99_ms:
+        failures.append(f"p99 tick latency {p99:.2f} ms > {budget_p99_ms} ms")
+
+    return {
+        'ticks': tick,
+        'elapsed_s': time.monotonic() - start,
+        'processes_spawned': storm.spawned,
+        'tracked': tracked,
+        'rss_start_mb': rss_points[0][1] / 2 ** 20 if rss_points else 0.0,
+        'rss_end_mb': rss_points[-1][1] / 2 ** 20 if rss_points else 0.0,
+        'rss_slope_kb_per_1k_ticks': rss_slope,
+        'traced_slope_kb_per_1k_ticks': traced_slope,
+        'latency_p50_ms': p50,
+        'latency_p99_ms': p99,
+        'rss_series': rss_points,
+        'traced_series': traced_points,
+        'top_allocators': allocators,
+        'failures': failures,
+        'passed': not failures,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MacMonitor soak harness")
+    parser.add_argument('--ticks', type=int, help="number of ticks to run")
+    parser.add_argument('--duration', type=float, help="seconds to run (instead of --ticks)")
+    parser.add_argument('--population', type=int, default=2000)
+    parser.add_argument('--churn', type=int, default=200, help="processes replaced per tick")
+    parser.add_argument('--unique-names', type=int, default=500)
+    parser.add_argument('--interval', type=float, default=0.0, help="sleep between ticks")
+    parser.add_argument('--sample-every', type=int, default=50)
+    parser.add_argument('--backend', choices=('native', 'none'), default='native',
+                        help="'none' skips platform subprocess/proc reads")
+    parser.add_argument('--no-trackers', action='store_true',
+                        help="only the scan and menu path, without the stateful consumers")
+    parser.add_argument('--budget-rss-kb', type=float, default=256)
+    parser.add_argument('--budget-traced-kb', type=float, default=64)
+    parser.add_argument('--budget-p99-ms', type=float, default=50.0)
+    parser.add_argument('--json', type=Path, help="write the full report here")
+    args = parser.parse_args(argv)
+
+    report = run_soak(
+        ticks=args.ticks, duration=args.duration, population=args.population,
+        churn=args.churn, unique_names=args.unique_names, interval=args.interval,
+        sample_every=args.sample_every, backend=args.backend, trackers=not args.no_trackers,
+        budget_rss_kb=args.budget_rss_kb, budget_traced_kb=args.budget_traced_kb,
+        budget_p99_ms=args.budget_p99_ms,
+    )
+    print(f"ticks={report['ticks']} elapsed={report['elapsed_s']:.0f}s "
+          f"spawned={report['processes_spawned']}")
+    print(f"RSS {report['rss_start_mb']:.1f} -> {report['rss_end_mb']:.1f} MB "
+          f"(slope {report['rss_slope_kb_per_1k_ticks']:.1f} KB/1k ticks)")
+    print(f"heap slope {report['traced_slope_kb_per_1k_ticks']:.1f} KB/1k ticks  "
+          f"latency p50 {report['latency_p50_ms']:.2f} ms p99 {report['latency_p99_ms']:.2f} ms")
+    for a in report['top_allocators']:
+        print(f"  {a['size_diff_kb']:+9.1f} KB  {a['count_diff']:+7d}  {a['where']}")
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    for failure in report['failures']:
+        print(f"FAIL: {failure}")
+    return 0 if report['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
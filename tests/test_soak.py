@@ -0,0 +1,48 @@
+"""Short soak run — the full harness lives in tests/soak.py."""
+
+import pytest
+
+from tests import soak
+
+
+class TestSoakHelpers:
+    def test_slope_of_line(self):
+        assert soak.slope([(0, 1.0), (1, 3.0), (2, 5.0)]) == pytest.approx(2.0)
+
+    def test_slope_needs_two_points(self):
+        assert soak.slope([(0, 1.0)]) == 0.0
+
+    def test_latency_histogram_percentiles(self):
+        hist = soak.LatencyHistogram(buckets=100)
+        for ms in range(1, 101):
+            hist.add(ms / 10000)
+        assert hist.percentile(50) == pytest.approx(5.1, abs=0.11)
+        hist.add(10.0)
+        assert hist.percentile(100) == pytest.approx(10.0)
+
+    def test_storm_keeps_population_constant(self):
+        storm = soak.ProcessStorm(population=100, churn=10)
+        before = {p.pid for p in storm.process_iter()}
+        storm.step()
+        after = {p.pid for p in storm.process_iter()}
+        assert len(after) == 100
+        assert len(before - after) == 10
+
+
+class TestShortSoak:
+    def test_pipeline_stays_within_budget(self):
+        import core
+        observers = list(core._scan_observers)
+        # A few hundred ticks are still inside cache warm-up, so the budgets
+        # here are loose; long runs use the strict CLI defaults.
+        report = soak.run_soak(
+            ticks=200, population=500, churn=50, unique_names=5, sample_every=10,
+            warmup=0.5, backend='none',
+            budget_rss_kb=8192, budget_traced_kb=1024, budget_p99_ms=500,
+        )
+        assert report['ticks'] == 200
+        assert report['processes_spawned'] == 500 + 200 * 50
+        assert report['passed'], report['failures']
+        assert report['tracked'] == ['accounting', 'attribution', 'lifecycle',
+                                     'process_rules', 'remediation']
+        assert core._scan_observers == observers
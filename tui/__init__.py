@@ -0,0 +1,5 @@
+"""Terminal (curses) implementation."""
+
+from tui.app import run
+
+__all__ = ['run']
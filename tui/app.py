@@ -0,0 +1,413 @@
+"""MacMonitor - terminal UI (curses), for SSH sessions and machines without a menu bar.
+
+The screen is a list of text lines. ``Screen`` remembers what each row
+last showed and only rewrites rows whose text or colour changed, so an
+idle refresh costs a few string compares and curses sends only the
+changed cells.
+
+On Linux with cgroup v2, the busiest containers (``core.cgroups``) are
+listed above the process table, ranked by the table's sort key.
+
+The process table is filled by a scan observer: one ``psutil`` pass per
+refresh covers every process. Sorting and filtering work on that cached
+table, with no rescan, and only the visible rows are ever formatted.
+
+Keys: ``c``/``m``/``p``/``n`` sort by CPU, memory, PID or name (again to
+reverse), ``/`` filters by name (Esc clears), arrows/PgUp/PgDn select,
+``k`` sends SIGTERM and ``K`` SIGKILL to the selected process (after
+confirming), ``q`` quits.
+"""
+
+import os
+import time
+import signal
+import logging
+
+from core.config import TUI_REFRESH, __version__, load_thresholds, load_latency_probe
+from core import (
+    add_scan_observer, remove_scan_observer, get_stats, get_status, get_combined_process_info,
+    start_latency_probe, stop_latency_probe,
+)
+from core.logging import setup_logging
+from core.attribution import PressureAttribution
+from core.cgroups import CgroupCollector
+from core.throughput import format_rate
+from core.view import get_status_label, get_progress_bar, health_style
+
+logger = logging.getLogger('macmonitor.tui')
+
+
+# ── Process table ─────────────────────────────────────────────────────────────
+
+def _by_cpu(info):
+    return info['cpu_percent'] or 0.0
+
+
+def _by_mem(info):
+    return info['memory_percent'] or 0.0
+
+
+def _by_pid(info):
+    return info['pid']
+
+
+def _by_name(info):
+    return (info['name'] or "").lower()
+
+
+# sort key -> (key function, descending by default)
+SORT_KEYS = {'cpu': (_by_cpu, True), 'mem': (_by_mem, True),
+             'pid': (_by_pid, False), 'name': (_by_name, False)}
+
+
+class ProcessTable:
+    """Every process from the last scan, with a cached sorted/filtered view.
+
+    ``update`` is a scan observer: it keeps the ``proc.info`` dicts as they
+    are. ``view()`` sorts and filters once per change of scan, sort order or
+    filter, then serves the cached list.
+    """
+
+    def __init__(self, sort='cpu'):
+        self._infos = []
+        self.sort = sort
+        self.reverse = SORT_KEYS[sort][1]
+        self.filter = ""
+        self._view = None
+
+    def update(self, infos):
+        self._infos = infos
+        self._view = None
+
+    def set_sort(self, key):
+        """Sort by ``key``; choosing the current key again flips the order."""
+        if key == self.sort:
+            self.reverse = not self.reverse
+        else:
+            self.sort = key
+            self.reverse = SORT_KEYS[key][1]
+        self._view = None
+
+    def set_filter(self, text):
+        text = text.lower()
+        if text != self.filter:
+            self.filter = text
+            self._view = None
+
+    def view(self):
+        if self._view is None:
+            rows = self._infos
+            if self.filter:
+                needle = self.filter
+                rows = [i for i in rows if needle in (i['name'] or "").lower()]
+            self._view = sorted(rows, key=SORT_KEYS[self.sort][0], reverse=self.reverse)
+        return self._view
+
+    def __len__(self):
+        return len(self._infos)
+
+
+# ── Screen ────────────────────────────────────────────────────────────────────
+
+class Screen:
+    """Partial redraw: rewrites only the rows that changed since the last frame."""
+
+    def __init__(self, window, attrs=None):
+        self.window = window
+        self.attrs = attrs or {}
+        self._lines = []
+        self._size = None
+
+    def draw(self, lines):
+        """Draw ``[(text, style)]``; returns the number of rows rewritten."""
+        window = self.window
+        height, width = window.getmaxyx()
+        if (height, width) != self._size:
+            self._size = (height, width)
+            self._lines = []
+            window.erase()
+        previous = self._lines
+        written = 0
+        lines = lines[:height]
+        for y, line in enumerate(lines):
+            if y < len(previous) and previous[y] == line:
+                continue
+            text, style = line
+            window.move(y, 0)
+            window.clrtoeol()
+            # The bottom-right cell cannot be written without scrolling.
+            window.addnstr(y, 0, text, width - 1, self.attrs.get(style, 0))
+            written += 1
+        for y in range(len(lines), min(len(previous), height)):
+            window.move(y, 0)
+            window.clrtoeol()
+            written += 1
+        self._lines = lines
+        window.noutrefresh()
+        return written
+
+
+# ── Layout ────────────────────────────────────────────────────────────────────
+
+_COLUMNS = f"{'PID':>7}  {'NAME':<32} {'CPU%':>6} {'MEM%':>6}"
+CONTAINER_ROWS = 5
+_SORT_LABELS = {'cpu': "CPU", 'mem': "memory", 'pid': "PID", 'name': "name"}
+
+
+def header_lines(stats, limits, updated=None):
+    """Summary rows: health, CPU/RAM/SWAP bars and the memory breakdown."""
+    cpu_limit, mem_limit, swap_limit = limits
+    lag_state = "STRESSED" if stats.lag_risk else "HEALTHY"
+    clock = time.strftime('%H:%M:%S', time.localtime(updated)) if updated else "--:--:--"
+    lines = [
+        (f"MacMonitor v{__version__}  ·  {get_status_label(stats.pressure_status)} · {lag_state}"
+         f"  ·  {clock}", health_style(stats)),
+        (f"CPU   {get_progress_bar(stats.cpu, 20)}  {stats.cpu:5.1f}%", get_status(stats.cpu, cpu_limit)),
+        (f"RAM   {get_progress_bar(stats.mem, 20)}  {stats.mem:5.1f}%"
+         + (f"  of {stats.mem_total_gb:.1f} GB" if stats.mem_total_gb else ""),
+         get_status(stats.mem, mem_limit)),
+        (f"SWAP  {get_progress_bar(stats.swap, 20)}  {stats.swap:5.1f}%", get_status(stats.swap, swap_limit)),
+    ]
+    m = stats.macos_mem
+    if m:
+        lines.append((f"  Wired {m.wired:.2f} GB · Active {m.active:.2f} GB · "
+                      f"Compressed {m.compressed:.2f} GB · Cached {m.cached:.2f} GB", 'secondary'))
+    extra = []
+    if stats.lag:
+        extra.append(f"Lag p95 {stats.lag.p95:.1f} ms p99 {stats.lag.p99:.1f} ms")
+    if stats.paging:
+        extra.append(f"Thrash {stats.paging.thrash:.0f} · swap in {format_rate(stats.paging.swapins)}")
+    if stats.io:
+        io = stats.io
+        extra.append(f"Disk R {format_rate(io.disk_read_bps)} W {format_rate(io.disk_write_bps)}")
+        extra.append(f"Net ↓ {format_rate(io.net_recv_bps)} ↑ {format_rate(io.net_sent_bps)}")
+    if extra:
+        lines.append(("  " + " · ".join(extra), 'secondary'))
+    if stats.stale:
+        lines.append((f"  Stale: {', '.join(stats.stale)}", 'secondary'))
+    return lines
+
+
+def container_lines(containers):
+    """One row per container: CPU, memory and memory-pressure stall."""
+    lines = [(f"{'CONTAINER':<26} {'CPU%':>6} {'MEM':>9} {'PSI':>6}", 'tertiary')]
+    for c in containers:
+        lines.append((f"{c.name[:26]:<26} {c.cpu:6.1f} {c.mem / 1024 ** 3:7.2f} G {c.pressure:6.1f}",
+                      'HIGH' if c.pressure_full > 0 else None))
+    return lines
+
+
+def process_line(info, width=32):
+    name = info['name'] or f"PID {info['pid']}"
+    if len(name) > width:
+        name = name[:width - 1] + "…"
+    return (f"{info['pid']:>7}  {name:<{width}} {info['cpu_percent'] or 0.0:6.1f} "
+            f"{info['memory_percent'] or 0.0:6.1f}")
+
+
+# ── Application ───────────────────────────────────────────────────────────────
+
+class TuiApp:
+    """Terminal front-end over the ``core`` collectors."""
+
+    def __init__(self, refresh=TUI_REFRESH):
+        self.refresh = refresh
+        self.table = ProcessTable()
+        self.limits = load_thresholds()
+        self.stats = None
+        self.cgroups = CgroupCollector() if CgroupCollector.available() else None
+        self.containers = []
+        self.attribution = PressureAttribution()
+        self.updated = None
+        self.selected_pid = None
+        self.top = 0               # first visible row of the table
+        self.filtering = False
+        self.filter_text = ""
+        self.confirm = None        # (signal, pid, name) awaiting y/n
+        self.message = ""
+
+    # ── Data ──────────────────────────────────────────────────────────────
+
+    def sample(self):
+        self.stats = get_stats()
+        get_combined_process_info()     # fills the table and attribution through scan observers
+        self.attribution.observe_stats(self.stats)
+        if self.cgroups is not None:
+            self.cgroups.sample()
+            by = self.table.sort if self.table.sort in ('cpu', 'mem') else 'cpu'
+            self.containers = self.cgroups.top(by, n=CONTAINER_ROWS)
+        self.updated = time.time()
+
+    # ── Rendering ─────────────────────────────────────────────────────────
+
+    def _selected_index(self, rows):
+        for i, info in enumerate(rows):
+            if info['pid'] == self.selected_pid:
+                return i
+        return 0
+
+    def lines(self, height):
+        """Everything on screen, top to bottom, as ``[(text, style)]``."""
+        lines = header_lines(self.stats, self.limits, self.updated) if self.stats else [("Sampling…", None)]
+        if self.attribution.culprits:
+            lines.append(("  Likely culprits: " + ", ".join(map(str, self.attribution.culprits)), 'HIGH'))
+        if self.containers:
+            lines += [("", None)] + container_lines(self.containers)
+        rows = self.table.view()
+        order = "↓" if self.table.reverse else "↑"
+        summary = f"Processes {len(rows)}/{len(self.table)} · sort {_SORT_LABELS[self.table.sort]} {order}"
+        if self.table.filter or self.filtering:
+            summary += f" · filter \"{self.filter_text}\""
+        lines += [("", None), (summary, 'tertiary'), (_COLUMNS, 'tertiary')]
+
+        visible = max(0, height - len(lines) - 1)
+        if rows:
+            index = self._selected_index(rows)
+            self.selected_pid = rows[index]['pid']
+            if index < self.top:
+                self.top = index
+            elif index >= self.top + visible:
+                self.top = index - visible + 1
+            self.top = max(0, min(self.top, len(rows) - visible))
+        for i in range(self.top, min(len(rows), self.top + visible)):
+            info = rows[i]
+            lines.append((process_line(info), 'selected' if info['pid'] == self.selected_pid else None))
+        lines += [("", None)] * (height - 1 - len(lines))
+        lines.append((self.status_line(), 'status'))
+        return lines
+
+    def status_line(self):
+        if self.confirm:
+            sig, pid, name = self.confirm
+            return f"Send {signal.Signals(sig).name} to {name} (PID {pid})? [y/N]"
+        if self.filtering:
+            return f"Filter: {self.filter_text}_   (Enter to keep, Esc to clear)"
+        if self.message:
+            return self.message
+        return "c/m/p/n sort · / filter · ↑↓ select · k term · K kill · q quit"
+
+    # ── Input ─────────────────────────────────────────────────────────────
+
+    def _move(self, delta):
+        rows = self.table.view()
+        if rows:
+            index = max(0, min(len(rows) - 1, self._selected_index(rows) + delta))
+            self.selected_pid = rows[index]['pid']
+
+    def handle_key(self, key, page=10):
+        """Apply one key (a curses key code or character). Returns False to quit."""
+        import curses
+        # Special keys (KEY_UP is 259, ...) are not characters; getch() hands
+        # everything else over a byte at a time.
+        ch = chr(key) if 0 <= key < 256 else ""
+        self.message = ""
+        if self.confirm:
+            if ch in ("y", "Y"):
+                self.send_signal(*self.confirm)
+            self.confirm = None
+        elif self.filtering:
+            if key in (curses.KEY_ENTER, 10, 13):
+                self.filtering = False
+            elif key == 27:
+                self.filtering = False
+                self.filter_text = ""
+            elif key in (curses.KEY_BACKSPACE, 127, 8):
+                self.filter_text = self.filter_text[:-1]
+            elif 32 <= key < 127:
+                self.filter_text += ch
+            self.table.set_filter(self.filter_text)
+        elif ch == "q":
+            return False
+        elif ch in ("c", "m", "p", "n"):
+            self.table.set_sort({'c': 'cpu', 'm': 'mem', 'p': 'pid', 'n': 'name'}[ch])
+        elif ch == "/":
+            self.filtering = True
+        elif key == 27:
+            self.filter_text = ""
+            self.table.set_filter("")
+        elif ch in ("k", "K"):
+            rows = self.table.view()
+            if rows:
+                info = rows[self._selected_index(rows)]
+                self.selected_pid = info['pid']
+                sig = signal.SIGTERM if ch == "k" else signal.SIGKILL
+                self.confirm = (sig, info['pid'], info['name'] or f"PID {info['pid']}")
+        elif key == curses.KEY_UP:
+            self._move(-1)
+        elif key == curses.KEY_DOWN:
+            self._move(1)
+        elif key == curses.KEY_PPAGE:
+            self._move(-page)
+        elif key == curses.KEY_NPAGE:
+            self._move(page)
+        elif key == curses.KEY_HOME:
+            self._move(-len(self.table))
+        elif key == curses.KEY_END:
+            self._move(len(self.table))
+        return True
+
+    def send_signal(self, sig, pid, name):
+        try:
+            os.kill(pid, sig)
+            self.message = f"Sent {signal.Signals(sig).name} to {name} (PID {pid})"
+            logger.info(f"Sent {signal.Signals(sig).name} to {name} (PID: {pid})")
+        except Exception as e:
+            self.message = f"Failed to signal {name}: {e}"
+            logger.error(f"Error signalling process {pid}: {e}")
+
+    # ── Main loop ─────────────────────────────────────────────────────────
+
+    def main(self, stdscr):
+        import curses
+        curses.curs_set(0)
+        stdscr.keypad(True)
+        attrs = {'selected': curses.A_REVERSE, 'status': curses.A_REVERSE,
+                 'tertiary': curses.A_DIM, 'health_high': curses.A_BOLD}
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            for n, (style, colour) in enumerate((('OK', curses.COLOR_GREEN),
+                                                 ('WARN', curses.COLOR_YELLOW),
+                                                 ('HIGH', curses.COLOR_RED)), start=1):
+                curses.init_pair(n, colour, -1)
+                attrs[style] = curses.color_pair(n)
+            attrs['health_ok'] = attrs['OK'] | curses.A_BOLD
+            attrs['health_warn'] = attrs['WARN'] | curses.A_BOLD
+            attrs['health_high'] = attrs['HIGH'] | curses.A_BOLD
+        screen = Screen(stdscr, attrs)
+
+        add_scan_observer(self.table.update)
+        add_scan_observer(self.attribution.observe, PressureAttribution.ATTRS)
+        if load_latency_probe():
+            start_latency_probe()
+        try:
+            next_sample = 0.0
+            while True:
+                now = time.monotonic()
+                if now >= next_sample:
+                    self.sample()
+                    next_sample = now + self.refresh
+                screen.draw(self.lines(stdscr.getmaxyx()[0]))
+                curses.doupdate()
+                stdscr.timeout(max(1, int((next_sample - time.monotonic()) * 1000)))
+                key = stdscr.getch()
+                if key == curses.KEY_RESIZE or key == -1:
+                    continue
+                if not self.handle_key(key, page=max(1, stdscr.getmaxyx()[0] - 10)):
+                    break
+        finally:
+            stop_latency_probe()
+            remove_scan_observer(self.table.update)
+            remove_scan_observer(self.attribution.observe)
+
+
+def run(refresh=TUI_REFRESH):
+    """Run the terminal UI until ``q`` or Ctrl-C."""
+    import curses
+    setup_logging(log_to_console=False)
+    # Esc clears the filter; don't wait the default second for an escape sequence.
+    os.environ.setdefault('ESCDELAY', '25')
+    try:
+        curses.wrapper(TuiApp(refresh).main)
+    except KeyboardInterrupt:
+        pass